@@ -1,28 +1,115 @@
 import os
 import sys
-from clinic.cli.clinic_cli import ClinicCLI
-import clinic.gui.clinic_gui
+
+# Helper method- the command line: a command, plus profiling options for the
+# ones that run a session
+def parse_arguments():
+	import argparse
+	parser = argparse.ArgumentParser(prog='python -m clinic', \
+	                                 description='Medical clinic system.')
+	commands = parser.add_subparsers(dest='command', required=True, \
+	                                 metavar='command')
+	profiling = argparse.ArgumentParser(add_help=False)
+	profiling.add_argument('--profile', metavar='FILE', help='profile the ' \
+	                       'session, writing the profile to FILE on exit')
+	profiling.add_argument('--profiler', choices=['cprofile', 'sample'], \
+	                       default='cprofile', help='cprofile (exact, a ' \
+	                       'pstats file) or sample (low overhead, collapsed ' \
+	                       'stacks); default cprofile')
+	profiling.add_argument('--memprofile', metavar='FILE', help='trace ' \
+	                       'allocations, appending a report per subsystem ' \
+	                       'to FILE (- for stderr) at each logout and on exit')
+	commands.add_parser('cli', parents=[profiling], \
+	                    help='run the command-line interface')
+	commands.add_parser('gui', parents=[profiling], \
+	                    help='run the graphical interface')
+	serve = commands.add_parser('serve', parents=[profiling], \
+	                            help='keep the clinic loaded for CLI clients')
+	serve.add_argument('socket', nargs='?')
+	client = commands.add_parser('client', help='run the CLI against a ' \
+	                             'server; starts instantly')
+	client.add_argument('socket', nargs='?')
+	bulk_import = commands.add_parser('import', help='bulk import patients')
+	bulk_import.add_argument('file', help='patients.csv or patients.jsonl')
+	return parser.parse_args()
 
 def main():
 	# You can run either a command-line interface (CLI) 
 	# or a graphical user interface (GUI) to your clinic.
-	if len(sys.argv) != 2:
-		print('ERROR: wrong number of arguments')
-		print('\nCorrect Command usage:')
-		print('python -m clinic option')
-		print('where option is either cli or gui')
+	# Patients can also be bulk imported from a .csv or .jsonl file.
+	# Each option imports only what it needs, so the CLI starts quickly
+	# (and runs without PyQt6 installed).
+	arguments = parse_arguments()
+	if arguments.command == 'import':
+		import clinic.patient_importer
+		clinic.patient_importer.main(arguments.file)
 		sys.exit()
-
-	if sys.argv[1] == 'cli':
-		ClinicCLI()
-	elif sys.argv[1] == 'gui':
-		clinic.gui.clinic_gui.main()
+	# A server keeps the clinic loaded; CLI clients then start instantly.
+	if arguments.command == 'client':
+		from clinic.cli.clinic_cli import ClinicCLI
+		from clinic.server.clinic_client import ClinicClient
+		from clinic.server.protocol import DEFAULT_SOCKET
+		path = arguments.socket or DEFAULT_SOCKET
+		try:
+			client = ClinicClient(path)
+		except OSError:
+			print('ERROR: no clinic server at %s' % path)
+			print('Start one with: python -m clinic serve')
+			sys.exit()
+		ClinicCLI(client)
+		client.close()
+		sys.exit()
+	import atexit
+	# Set CLINIC_METRICS to a file (or '-' for the terminal) to collect
+	# per-operation metrics and export them on exit; see metrics.py.
+	if os.environ.get('CLINIC_METRICS'):
+		from clinic.metrics import metrics
+		target = os.environ['CLINIC_METRICS']
+		metrics.enable()
+		atexit.register(metrics.export, target, target.endswith('.prom'))
+	# User stories slower than their threshold are logged to clinic/slow.log
+	# (CLINIC_SLOW_LOG names another file, or 'off'); thresholds can be set
+	# with CLINIC_SLOW_THRESHOLDS, e.g. '0.5,update_patient=0.1'.
+	if os.environ.get('CLINIC_SLOW_LOG') != 'off':
+		from clinic.slow_log import SlowOperationLog, DEFAULT_THRESHOLD, \
+		                            DEFAULT_FILENAME, parse_thresholds
+		default, thresholds = parse_thresholds(os.environ.get(\
+		                      'CLINIC_SLOW_THRESHOLDS', str(DEFAULT_THRESHOLD)))
+		slow_log = SlowOperationLog(os.environ.get('CLINIC_SLOW_LOG', \
+		                            DEFAULT_FILENAME), DEFAULT_THRESHOLD if \
+		                            default is None else default, \
+		                            thresholds).start()
+		atexit.register(slow_log.close)
+	# --memprofile reports memory by subsystem at each logout; see
+	# profiling.py.
+	if arguments.memprofile is not None:
+		from clinic.profiling import MemoryProfiler
+		memory_profiler = MemoryProfiler(arguments.memprofile).start()
+		atexit.register(memory_profiler.close)
+	if arguments.command == 'cli':
+		def session():
+			from clinic.cli.clinic_cli import ClinicCLI
+			from clinic.controller import Controller
+			# A snapshot saved on the way out makes the next start quicker
+			controller = Controller(autosave=True, snapshot=True)
+			ClinicCLI(controller)
+			controller.shutdown()
+	elif arguments.command == 'gui':
+		def session():
+			import clinic.gui.clinic_gui
+			clinic.gui.clinic_gui.main()
 	else:
-		print('ERROR: Wrong argument')
-		print('\nCorrect Command usage:')
-		print('python -m clinic option')
-		print('where option is either cli or gui')
-
+		def session():
+			import clinic.server.clinic_server
+			from clinic.server.protocol import DEFAULT_SOCKET
+			clinic.server.clinic_server.main(arguments.socket or \
+			                                 DEFAULT_SOCKET)
+	# --profile runs the whole session under a profiler
+	if arguments.profile is not None:
+		from clinic.profiling import run_profiled
+		run_profiled(session, arguments.profile, arguments.profiler)
+	else:
+		session()
 
 if __name__ == '__main__':
 	main()
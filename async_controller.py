@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'async_controller.py':
+
+An asyncio front end to 'Controller', for embedding the clinic in an asyncio
+service. Every user story has an 'async' version which runs the matching
+Controller method in an executor thread, so disk reads and writes (loading a
+patient's notes, saving patients and notes) never block the event loop. The
+Controller still does all of the validation, and raises the same exceptions.
+
+The wrapped Controller is made with concurrent=True, since several executor
+threads use it at once, and, when persistent, with write_behind=True: changes
+are held in memory and written out by 'flush'. Each change awaits a flush
+before returning (unless durable=False), but changes made at the same time
+share one: a caller that arrives while a flush is under way waits for the
+next one, which covers every change made in the meantime. If that flush
+fails, every caller it covered gets its error.
+
+Long searches and listings are fetched a page at a time ('page_size'
+results), awaiting between pages. Cancelling the calling task therefore stops
+the search at the next page boundary; the page in progress finishes in its
+thread, and is discarded. Fetching everything (no limit), each page is twice
+the size of the last, up to PAGE_GROWTH times 'page_size', so a long listing
+takes a handful of steps rather than thousands. Ranked note searches and
+fuzzy searches must score every match first, so they run as a single step.
+
+A logged in AsyncController acts through its own session (see 'session.py'),
+and any method also accepts another one as 'session='.
+
+============================================================================ """
+
+# EXCEPTIONS:
+from clinic.exception.duplicate_login_exception import DuplicateLoginException
+from clinic.exception.invalid_logout_exception import InvalidLogoutException
+
+# IMPORTS:
+from clinic.controller import Controller
+from clinic.dao.rw_lock import NullLock
+import asyncio
+import functools
+
+# Unlimited listings grow their pages up to this many times 'page_size'
+PAGE_GROWTH = 64
+
+class AsyncController:
+    def __init__(self, controller = None, executor = None, page_size = 500, \
+                 durable = True, **options):
+        # Build a controller fit for several threads, unless one is supplied
+        if controller is None:
+            options.setdefault("concurrent", True)
+            if options.get("autosave") is True:
+                options.setdefault("write_behind", True)
+            controller = Controller(**options)
+        if isinstance(controller.lock, NullLock):
+            raise ValueError("Error: AsyncController needs a Controller " \
+                             "made with concurrent=True")
+        self.controller = controller
+        self.executor = executor            # None uses the loop's default
+        self.page_size = page_size
+        self.durable = durable
+        self.session = None
+        # Flushes run one at a time; counting them lets waiters share one
+        self.flush_lock = asyncio.Lock()
+        self.flushes_started = 0
+        self.flush_error = None             # How the last flush failed
+
+    def __str__(self):
+        return f"Controller: {self.controller}, Session: {self.session}, " \
+               f"Page size: {self.page_size}, Durable: {self.durable}"
+
+    # Helper method- runs a blocking Controller call in the executor
+    async def _run(self, method, *arguments, **keywords):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(\
+                                          method, *arguments, **keywords))
+
+    # Helper method- the session to act for
+    def _session(self, session):
+        return self.session if session is None else session
+
+    # Helper method- runs a change, then waits until it is on disk
+    async def _change(self, method, *arguments, session = None):
+        result = await self._run(method, *arguments, \
+                                 session=self._session(session))
+        if self.durable is True:
+            await self.flush()
+        return result
+
+    async def _paged(self, method, arguments, limit, cursor, session, \
+                     position):
+        """
+        Helper method- gathers up to 'limit' results (all of them if None)
+        of a paginated Controller method, a page at a time from 'cursor'.
+        'position' gives the cursor to resume after a result.
+        """
+        results = []
+        page_size = self.page_size
+        while limit is None or len(results) < limit:
+            size = page_size if limit is None else \
+                   min(page_size, limit - len(results))
+            page = await self._run(method, *arguments, size, cursor, \
+                                   session=self._session(session))
+            results.extend(page)
+            if len(page) < size:
+                break
+            cursor = position(page[-1])
+            if limit is None:
+                page_size = min(page_size * 2, self.page_size * PAGE_GROWTH)
+        return results
+
+    async def flush(self):
+        """
+        Writes out every change held back by write-behind mode. Returns True
+        once every change made before the call is on disk, or raises what
+        the flush that covered them raised.
+        """
+        arrival = self.flushes_started
+        async with self.flush_lock:
+            # A flush begun since we arrived already covers our changes, and
+            # the latest of them says whether they are on disk
+            if self.flushes_started == arrival:
+                self.flushes_started += 1
+                try:
+                    await self._run(self.controller.flush)
+                    self.flush_error = None
+                except Exception as error:
+                    self.flush_error = error
+            if self.flush_error is not None:
+                raise self.flush_error
+        return True
+
+    # Runs any other Controller method by name, e.g. "count_cohort"
+    async def call(self, name, *arguments, **keywords):
+        return await self._run(getattr(self.controller, name), *arguments, \
+                               **keywords)
+
+# ==============================================================================
+
+    # USER STORY 1
+    async def login(self, username, password):
+        """
+        Accepts 'username' and 'password' strings as input, and opens this
+        AsyncController's session. Returns True, or raises as 'login' does.
+        """
+        if self.session is not None:
+            raise DuplicateLoginException("Error: already logged in.")
+        self.session = await self._run(self.controller.open_session, \
+                                       username, password)
+        return True
+
+    # USER STORY 2
+    async def logout(self):
+        if self.session is None:
+            raise InvalidLogoutException("Error: not logged in, cannot log out")
+        await self.flush()
+        session, self.session = self.session, None
+        return await self._run(self.controller.close_session, session)
+
+    # Opens and closes further sessions on the same controller
+    async def open_session(self, username, password):
+        return await self._run(self.controller.open_session, username, \
+                               password)
+
+    async def close_session(self, session):
+        await self.flush()
+        return await self._run(self.controller.close_session, session)
+
+    # USER STORY 3
+    async def search_patient(self, phn, session = None):
+        return await self._run(self.controller.search_patient, phn, \
+                               session=self._session(session))
+
+    # USER STORY 4
+    async def create_patient(self, phn, name, birth_date, phone, email, \
+                             address, session = None):
+        return await self._change(self.controller.create_patient, phn, name, \
+                                  birth_date, phone, email, address, \
+                                  session=session)
+
+    # USER STORY 5
+    async def retrieve_patients(self, name, limit = None, cursor = None, \
+                                session = None):
+        return await self._paged(self.controller.retrieve_patients, (name,), \
+                                 limit, cursor, session, \
+                                 lambda patient: patient.get_phn())
+
+    async def retrieve_patients_fuzzy(self, name, limit = 20, session = None):
+        return await self._run(self.controller.retrieve_patients_fuzzy, name, \
+                               limit, session=self._session(session))
+
+    async def retrieve_patients_by_phone(self, phone, limit = None, \
+                                         session = None):
+        return await self._run(self.controller.retrieve_patients_by_phone, \
+                               phone, limit, session=self._session(session))
+
+    async def retrieve_patients_by_email(self, email, limit = None, \
+                                         session = None):
+        return await self._run(self.controller.retrieve_patients_by_email, \
+                               email, limit, session=self._session(session))
+
+    async def retrieve_patients_by_birth_date(self, start, end = None, \
+                                              limit = None, session = None):
+        return await self._run(self.controller.\
+                               retrieve_patients_by_birth_date, start, end, \
+                               limit, session=self._session(session))
+
+    # USER STORY 6
+    async def update_patient(self, old_phn, phn, name, birth_date, phone, \
+                             email, address, session = None):
+        return await self._change(self.controller.update_patient, old_phn, \
+                                  phn, name, birth_date, phone, email, \
+                                  address, session=session)
+
+    # USER STORY 7
+    async def delete_patient(self, phn, session = None):
+        return await self._change(self.controller.delete_patient, phn, \
+                                  session=session)
+
+    # USER STORY 8
+    async def list_patients(self, limit = None, cursor = None, session = None):
+        return await self._paged(self.controller.list_patients, (), limit, \
+                                 cursor, session, \
+                                 lambda patient: patient.get_phn())
+
+    async def get_current_patient(self, session = None):
+        return self.controller.get_current_patient(self._session(session))
+
+    # USER STORY 9 (loads the patient's notes in the executor)
+    async def set_current_patient(self, phn, session = None):
+        return await self._run(self.controller.set_current_patient, phn, \
+                               session=self._session(session))
+
+    async def unset_current_patient(self, session = None):
+        return self.controller.unset_current_patient(self._session(session))
+
+    # USER STORY 10
+    async def create_note(self, text, session = None):
+        return await self._change(self.controller.create_note, text, \
+                                  session=session)
+
+    # USER STORY 11
+    async def retrieve_notes(self, text, ranked = False, limit = None, \
+                             cursor = None, session = None):
+        if ranked is True:
+            return await self._run(self.controller.retrieve_notes, text, True, \
+                                   limit, cursor, \
+                                   session=self._session(session))
+        return await self._paged(functools.partial(self.controller.\
+                                 retrieve_notes, text, False), (), limit, \
+                                 cursor, session, lambda note: note.get_index())
+
+    async def search_note(self, note_index, session = None):
+        return await self._run(self.controller.search_note, note_index, \
+                               session=self._session(session))
+
+    # USER STORY 12
+    async def update_note(self, note_index, text, session = None):
+        return await self._change(self.controller.update_note, note_index, \
+                                  text, session=session)
+
+    # USER STORY 13
+    async def delete_note(self, note_index, session = None):
+        return await self._change(self.controller.delete_note, note_index, \
+                                  session=session)
+
+    # USER STORY 14
+    async def list_notes(self, limit = None, cursor = None, session = None):
+        return await self._paged(self.controller.list_notes, (), limit, \
+                                 cursor, session, lambda note: note.get_index())
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'async_controller.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_async.py':
+
+Compares two ways of serving many asyncio tasks that add notes and patients
+(with the journal fsyncing every patient change):
+
+    - blocking: the tasks call a plain 'Controller' directly, as an asyncio
+      service would without 'AsyncController'
+    - async:    the same work through 'AsyncController', whose changes are
+      written in executor threads and share their flushes
+
+While they run, a heartbeat task measures how late the event loop wakes it,
+which is how long every other request to the service would be stalled.
+Reports operations per second, flushes, and the heartbeat's worst and 99th
+percentile lag. Also times how quickly a long listing stops once cancelled.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_async [operations] [tasks]
+
+Defaults are 2000 operations, shared by 50 tasks.
+
+============================================================================ """
+
+# IMPORTS:
+import asyncio
+import os
+import shutil
+import sys
+import time
+from clinic.async_controller import AsyncController
+from clinic.benchmarks.stress_concurrency import make_scratch, PASSWORD
+from clinic.controller import Controller
+
+HEARTBEAT = 0.001
+
+# Sleeps in short steps until 'stop' is set, recording how late each wake is
+async def heartbeat(stop, lags):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(time.perf_counter() - start - HEARTBEAT)
+
+# Step 'step' of the workload: every tenth adds a patient, the rest notes
+async def work(clinic, session, step):
+    if step % 10 == 0:
+        await clinic.create_patient(1000 + step, f"Patient {step}", \
+                                    "1990-01-01", "250", "p@clinic.ca", \
+                                    "1 Main St", session=session)
+    else:
+        await clinic.set_current_patient(step % 10 * 10 + 1000, \
+                                         session=session)
+        await clinic.create_note(f"note {step}", session=session)
+
+# Wraps a plain Controller in coroutines that simply block the loop
+class Blocking:
+    def __init__(self, controller):
+        self.controller = controller
+        self.flushes_started = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.controller, name)
+        async def blocking(*arguments, **keywords):
+            return method(*arguments, **keywords)
+        return blocking
+
+async def scenario(clinic, operations, tasks):
+    # Patients for the notes to go to, then the timed work
+    for step in range(0, 100, 10):
+        await work(clinic, None, step)
+    flushes = clinic.flushes_started
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.ensure_future(heartbeat(stop, lags))
+    async def worker(number):
+        session = await clinic.open_session("stress", PASSWORD)
+        for step in range(100 + number, 100 + operations, tasks):
+            await work(clinic, session, step)
+        await clinic.close_session(session)
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(number) for number in range(tasks)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags.sort()
+    return elapsed, clinic.flushes_started - flushes, lags[-1], \
+           lags[int(len(lags) * 0.99)]
+
+async def run_blocking(operations, tasks):
+    controller = Controller(autosave=True, journal=True, fsync_policy="write")
+    controller.login("stress", PASSWORD)
+    results = await scenario(Blocking(controller), operations, tasks)
+    return results[:1] + (operations // 10,) + results[2:]
+
+async def run_async(operations, tasks):
+    clinic = AsyncController(autosave=True, journal=True, fsync_policy="write")
+    await clinic.login("stress", PASSWORD)
+    results = await scenario(clinic, operations, tasks)
+    # A listing of a patient's notes a page at a time, cancelled at once
+    clinic.page_size = 10
+    await clinic.set_current_patient(1000)
+    listing = asyncio.ensure_future(clinic.list_notes())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    listing.cancel()
+    try:
+        await listing
+    except asyncio.CancelledError:
+        pass
+    print(f"cancelled listing stopped in "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+    await clinic.logout()
+    await clinic.call("shutdown")
+    return results
+
+def run(operations, tasks):
+    print(f"{'':>9} {'ops/s':>8} {'flushes':>8} {'max lag (ms)':>13} "
+          f"{'p99 lag (ms)':>13}")
+    for label, coroutine in [("blocking", run_blocking), ("async", run_async)]:
+        directory = make_scratch()
+        try:
+            elapsed, flushes, worst, p99 = asyncio.run(coroutine(operations, \
+                                                                 tasks))
+        finally:
+            os.chdir(os.path.dirname(directory))
+            shutil.rmtree(directory)
+        print(f"{label:>9} {operations / elapsed:>8.0f} {flushes:>8} "
+              f"{worst * 1000:>13.2f} {p99 * 1000:>13.2f}")
+
+# ==============================================================================
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    run(operations, tasks)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_cohort.py':
+
+Times cohort reports over the columnar patient table (see
+'dao/patient_columns.py') against the same reports written as a loop over
+'Patient' objects. Both must agree. Patients are given random birth dates,
+note counts and latest-note times directly in the table, so no note files
+are needed.
+
+Then times 'Controller.count_cohort' on a generated clinic of the same size
+(see 'data_generator.py'), note files and all: the first query builds the
+table from the patients and the summaries in their note logs' headers, and
+must not write anything.
+
+Usage (from the directory that contains 'clinic/'; NumPy is required):
+    python -m clinic.benchmarks.bench_cohort [size size ...]
+
+Default sizes are 100k and 1M patients. The target is under 100 ms per query
+at 1M patients.
+
+============================================================================ """
+
+# IMPORTS:
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from clinic.benchmarks.data_generator import data_dir, USERNAME, PASSWORD
+from clinic.controller import Controller
+from clinic.dao.patient_columns import PatientColumns, to_stamp
+
+NOW = datetime(2026, 10, 18)
+YEAR_AGO = NOW.replace(year=NOW.year - 1)
+FILTERS = {"born before 1960, no notes in a year": \
+               {"born_before": "1960-01-01", "no_notes_since": YEAR_AGO}, \
+           "born in the 1980s, 5+ notes": \
+               {"born_after": "1979-12-31", "born_before": "1990-01-01", \
+                "min_notes": 5}, \
+           "everyone": {}}
+
+# Returns 'size' (phn, birth_date, note_count, last_note) rows
+def generate_rows(size, seed = 265):
+    rng = random.Random(seed)
+    start = date(1920, 1, 1).toordinal()
+    span = date(2025, 12, 31).toordinal() - start
+    now = to_stamp(NOW)
+    rows = []
+    for phn in range(size):
+        birth_date = date.fromordinal(start + rng.randrange(span)).isoformat()
+        note_count = rng.choice((0, 0, 1, 2, 3, 5, 8, 13))
+        last_note = now - rng.randrange(3 * 365 * 86400) * 1000000 \
+                    if note_count else 0
+        rows.append((phn, birth_date, note_count, last_note))
+    return rows
+
+# The same report written as a loop, for comparison
+def loop_count(rows, born_before = None, born_after = None, \
+               min_notes = None, no_notes_since = None):
+    count = 0
+    for phn, birth_date, note_count, last_note in rows:
+        if born_before is not None and not birth_date < born_before:
+            continue
+        if born_after is not None and not birth_date > born_after:
+            continue
+        if min_notes is not None and note_count < min_notes:
+            continue
+        if no_notes_since is not None and last_note >= to_stamp(no_notes_since):
+            continue
+        count += 1
+    return count
+
+# Times 'function' and returns (result, milliseconds)
+def timed(function, *arguments, **keywords):
+    start = time.perf_counter()
+    result = function(*arguments, **keywords)
+    return result, (time.perf_counter() - start) * 1000
+
+def run(sizes):
+    for size in sizes:
+        rows = generate_rows(size)
+        columns = PatientColumns()
+        build_time = timed(columns.load, rows)[1]
+        print(f"{size} patients (table built in {build_time:.0f} ms)")
+        for label, filters in FILTERS.items():
+            count, column_time = timed(columns.count, **filters)
+            expected, loop_time = timed(loop_count, rows, **filters)
+            assert count == expected, label
+            print(f"  {label:<40} {count:>8} {column_time:>8.1f} ms "
+                  f"(loop {loop_time:.0f} ms)")
+        histogram, histogram_time = timed(columns.birth_year_histogram)
+        print(f"  {'birth-year histogram':<40} {len(histogram):>8} "
+              f"{histogram_time:>8.1f} ms")
+        bands, bands_time = timed(columns.age_bands, 10, NOW)
+        print(f"  {'10-year age bands':<40} {len(bands):>8} "
+              f"{bands_time:>8.1f} ms")
+        run_controller(size)
+
+# Returns the names of every file under 'directory'
+def list_files(directory):
+    return {os.path.join(path, name) for path, _, names in \
+            os.walk(directory) for name in names}
+
+def run_controller(size):
+    """
+    Times 'Controller.count_cohort' on a copy of the generated clinic of
+    'size' patients: the first query, which builds the table, and a second.
+    Fails if building the table wrote any file.
+    """
+    directory = tempfile.mkdtemp(prefix="clinic-cohort-")
+    shutil.copytree(os.path.join(data_dir(size), "clinic"), \
+                    os.path.join(directory, "clinic"))
+    os.chdir(directory)
+    try:
+        # The Controller's own messages would only clutter the output
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = Controller(autosave=True, columnar=True)
+            controller.login(USERNAME, PASSWORD)
+        before = list_files("clinic")
+        filters = FILTERS["born before 1960, no notes in a year"]
+        count, first_time = timed(controller.count_cohort, **filters)
+        assert list_files("clinic") == before, "building the table wrote files"
+        _, second_time = timed(controller.count_cohort, **filters)
+        print(f"  {'count_cohort on a generated clinic':<40} {count:>8} "
+              f"{second_time:>8.1f} ms (first, building the table: "
+              f"{first_time:.0f} ms)")
+    finally:
+        os.chdir(os.path.dirname(directory))
+        shutil.rmtree(directory)
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100000, 1000000]
+    run(sizes)
+
+if __name__ == "__main__":
+    main()
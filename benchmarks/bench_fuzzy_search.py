@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_fuzzy_search.py':
+
+Times fuzzy name searches ('retrieve_patients_fuzzy') on registries of
+generated patients. Surnames are built from random syllables, giving a
+vocabulary of tens of thousands of distinct words, and the queries are
+misspelled or sound-alike versions of names that are known to be present.
+Reports the index build time, its size, and the time per query.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_fuzzy_search [size size ...]
+
+Default sizes are 100k and 500k patients.
+
+============================================================================ """
+
+# IMPORTS:
+import random
+import sys
+import time
+from clinic.dao.patient_dao_json import PatientDAOJSON
+
+FIRST_NAMES = ["John", "Jane", "Mary", "Michael", "Sarah", "David", "Emily", \
+               "Robert", "Linda", "James", "Olivia", "William", "Sophia", \
+               "Mohammed", "Wei", "Priya", "Carlos", "Aisha", "Liam", "Noah"]
+SYLLABLES = ["smi", "th", "son", "ber", "ger", "man", "ton", "ley", "wal", \
+             "ker", "mac", "don", "ald", "ros", "sen", "vic", "kov", "li", \
+             "ang", "chen", "ra", "mi", "rez", "gar", "cia", "an", "der"]
+QUERIES = ["Jon Smyth", "Jhon Smith", "Mery Berger", "Micheal Walker", \
+           "Sara Macdonald", "Wiliam Thompson", "Olivai Garcia", "Kaspar"]
+
+# Builds a DAO holding 'size' patients with generated names
+def build_dao(size, seed = 265):
+    rng = random.Random(seed)
+    patient_dao = PatientDAOJSON(autosave=False)
+    for phn in range(size):
+        surname = "".join(rng.choice(SYLLABLES) for _ in \
+                          range(rng.randint(2, 3))).capitalize()
+        patient_dao.create_patient(phn, f"{rng.choice(FIRST_NAMES)} {surname}",\
+                                   "2000-01-01", "250-555-0100", \
+                                   "patient@clinic.ca", "1 Main St")
+    return patient_dao
+
+def run(sizes, repeats = 5):
+    print(f"{'patients':>10} {'build (s)':>10} {'words':>8} {'deletes':>9} "
+          f"{'query (ms)':>11}")
+    for size in sizes:
+        start = time.perf_counter()
+        patient_dao = build_dao(size)
+        build_time = time.perf_counter() - start
+        fuzzy_index = patient_dao.fuzzy_index
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for query in QUERIES:
+                patient_dao.retrieve_patients_fuzzy(query)
+        query_time = (time.perf_counter() - start) / (repeats * len(QUERIES))
+        print(f"{size:>10} {build_time:>10.2f} {len(fuzzy_index.postings):>8} "
+              f"{len(fuzzy_index.deleted):>9} {query_time * 1000:>11.1f}")
+    for query in QUERIES:
+        names = [patient.get_name() for patient in \
+                 patient_dao.retrieve_patients_fuzzy(query, 3)]
+        print(f"  {query!r}: {names}")
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100000, 500000]
+    run(sizes)
+
+if __name__ == "__main__":
+    main()
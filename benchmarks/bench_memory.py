@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_memory.py':
+
+Measures the memory taken by each patient (with its record and one note) using
+'tracemalloc'. The 'before' figures come from copies of the original classes,
+which kept a per-instance __dict__, a duplicate 'autosave' flag on 'Patient',
+and a full 'datetime' on every 'Note'; the 'after' figures use the current
+slotted classes. Both sides get the same generated data.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_memory [size size ...]
+
+Default sizes are 10k, 100k and 1M patients.
+
+============================================================================ """
+
+# IMPORTS:
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+from clinic.note import Note
+from clinic.patient import Patient
+
+STREETS = ["Main St", "Oak Bay Ave", "Fort St", "Douglas St", "Cook St", \
+           "Shelbourne St", "Quadra St", "Blanshard St"]
+
+# The original classes, kept only as a baseline for comparison
+class LegacyNote:
+    def __init__(self, note_index, text):
+        self.note_index = note_index
+        self.text = text
+        self.timestamp = datetime.now()
+
+class LegacyRecord:
+    def __init__(self, phn, autosave = False):
+        self.phn = phn
+        self.autosave = autosave
+
+class LegacyPatient:
+    def __init__(self, phn, name, birth_date, phone, email, address, autosave = False):
+        self.phn = int(phn)
+        self.name = name
+        self.birth_date = birth_date
+        self.phone = phone
+        self.email = email
+        self.address = address
+        self.autosave = autosave
+        self.record = LegacyRecord(self.phn, self.autosave)
+
+# Yields the field tuples for 'size' generated patients
+def generate_rows(size, seed = 265):
+    rng = random.Random(seed)
+    for phn in range(size):
+        # Dates and addresses are rebuilt per row, as a decoder would do
+        birth_date = f"{rng.randrange(1930, 2020)}-{rng.randrange(1, 13):02}-{rng.randrange(1, 29):02}"
+        address = f"{rng.randrange(1, 2000)} {rng.choice(STREETS)}, Victoria"
+        yield (phn, f"Patient {phn}", birth_date, f"250-555-{phn % 10000:04}", \
+               f"patient{phn}@clinic.ca", address)
+
+# Builds every patient, plus one note each (held apart from any note store)
+def build(patient_class, note_class, rows):
+    patients = {}
+    notes = []
+    for row in rows:
+        patient = patient_class(*row)
+        patients[patient.phn] = patient
+        notes.append(note_class(1, "Initial visit"))
+    return patients, notes
+
+def build_legacy(rows):
+    return build(LegacyPatient, LegacyNote, rows)
+
+def build_slotted(rows):
+    return build(Patient, Note, rows)
+
+# Returns the bytes allocated by 'build' per patient
+def measure(build, size):
+    gc.collect()
+    tracemalloc.start()
+    # Rows are generated while tracing, so the strings kept are counted too
+    patients = build(generate_rows(size))
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del patients
+    return allocated / size
+
+def run(sizes):
+    print(f"{'patients':>10} {'before (B)':>11} {'after (B)':>10} {'saved':>7}")
+    for size in sizes:
+        before = measure(build_legacy, size)
+        after = measure(build_slotted, size)
+        print(f"{size:>10} {before:>11.0f} {after:>10.0f} "
+              f"{1 - after / before:>6.0%}")
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    run(sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_name_search.py':
+
+Compares 'retrieve_patients' name searches done by a full scan (the original
+approach) against the trigram index in 'PatientDAOJSON'. For each registry
+size, a set of random names is generated, and the same queries are timed both
+ways; both approaches must agree on every result.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_name_search [size size ...]
+
+Default sizes are 10k, 100k and 1M patients. The 1M case needs a few GB of
+memory, since every patient is a full 'Patient' object.
+
+============================================================================ """
+
+# IMPORTS:
+import random
+import sys
+import time
+from clinic.dao.patient_dao_json import PatientDAOJSON
+
+FIRST_NAMES = ["Ada", "Alan", "Barbara", "Charles", "Donald", "Edsger", \
+               "Frances", "Grace", "Hedy", "John", "Katherine", "Linus", \
+               "Margaret", "Niklaus", "Radia", "Shafi", "Tim", "Whitfield"]
+LAST_NAMES = ["Lovelace", "Turing", "Liskov", "Babbage", "Knuth", "Dijkstra",\
+              "Allen", "Hopper", "Lamarr", "Backus", "Johnson", "Torvalds", \
+              "Hamilton", "Wirth", "Perlman", "Goldwasser", "Berners-Lee", \
+              "Diffie"]
+QUERIES = ["Lovelace", "ace", "Grace Hopper", "Knuth", "rn", "Tim B", \
+           "Smith", "Hamilton7", "a"]
+
+# Builds a DAO holding 'size' patients with random names
+def build_dao(size, seed = 265):
+    rng = random.Random(seed)
+    patient_dao = PatientDAOJSON(autosave=False)
+    for phn in range(size):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.randrange(1000)}"
+        patient_dao.create_patient(phn, name, "2000-01-01", "250-555-0100", \
+                                   "patient@clinic.ca", "1 Main St")
+    return patient_dao
+
+# The original search: check every patient's name with 'find'
+def scan_search(patient_dao, name):
+    return [patient for patient in patient_dao.patient_data.values() \
+            if patient.get_name().find(name) != -1]
+
+# Times 'search' over every query, returning seconds per query
+def time_queries(search, patient_dao, repeats = 3):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in QUERIES:
+            search(patient_dao, query)
+    return (time.perf_counter() - start) / (repeats * len(QUERIES))
+
+def run(sizes):
+    print(f"{'patients':>10} {'build (s)':>10} {'scan (ms)':>10} {'index (ms)':>11} {'speedup':>8}")
+    for size in sizes:
+        start = time.perf_counter()
+        patient_dao = build_dao(size)
+        build_time = time.perf_counter() - start
+        # Both approaches must return identical results, in the same order
+        for query in QUERIES:
+            assert scan_search(patient_dao, query) == \
+                   patient_dao.retrieve_patients(query), query
+        scan_time = time_queries(scan_search, patient_dao)
+        index_time = time_queries(PatientDAOJSON.retrieve_patients, patient_dao)
+        print(f"{size:>10} {build_time:>10.2f} {scan_time * 1000:>10.2f} "
+              f"{index_time * 1000:>11.2f} {scan_time / index_time:>7.1f}x")
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    run(sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_server.py':
+
+Measures what 'python -m clinic serve' buys. In a scratch directory holding
+a generated registry, it times:
+
+    - startup: a fresh Python process that loads the clinic itself and logs
+      in, against one that connects to a running server and logs in
+    - latency: single calls, one round trip each, against the same calls
+      pipelined through 'call_many'
+    - throughput: many clients, each on its own thread and connection
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_server [patients] [clients]
+
+Defaults are 100k patients and 16 clients.
+
+============================================================================ """
+
+# IMPORTS:
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import clinic
+from clinic.benchmarks.stress_concurrency import make_scratch, PASSWORD
+from clinic.dao.patient_dao_json import PatientDAOJSON
+from clinic.server.clinic_client import ClinicClient
+from clinic.server.clinic_server import ClinicServer
+
+CALLS = 2000
+STARTUPS = 5
+LOCAL_STARTUP = ("from clinic.controller import Controller\n"
+                 "controller = Controller(autosave=True)\n"
+                 "controller.login('stress', %r)\n" % PASSWORD)
+CLIENT_STARTUP = ("from clinic.server.clinic_client import ClinicClient\n"
+                  "client = ClinicClient()\n"
+                  "client.login('stress', %r)\n" % PASSWORD)
+
+# Writes 'size' generated patients to the scratch registry
+def build_registry(size):
+    patient_dao = PatientDAOJSON(autosave=True)
+    patient_dao.create_patients((phn, f"Patient {phn}", "1990-01-01", "250", \
+                                 "p@clinic.ca", "1 Main St") for phn in \
+                                range(1, size + 1))
+
+# Runs the server on an event loop of its own, in a background thread
+def start_server():
+    server = ClinicServer()
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    async def serve():
+        await server.start()
+        ready.set()
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+    task = loop.create_task(serve())
+    thread = threading.Thread(target=loop.run_until_complete, \
+                              args=(task,), daemon=True)
+    thread.start()
+    ready.wait()
+    # Cancelling the task shuts the server down, as Ctrl-C would
+    def stop():
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+    return stop
+
+# Returns the fastest of several runs of 'source' in a fresh interpreter
+def time_process(source):
+    environment = dict(os.environ, PYTHONPATH=os.path.dirname(\
+                       os.path.dirname(os.path.abspath(clinic.__file__))))
+    best = None
+    for _ in range(STARTUPS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", source], env=environment, \
+                       check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(size, clients):
+    directory = make_scratch()
+    try:
+        build_registry(size)
+        print(f"{size} patients")
+        local = time_process(LOCAL_STARTUP)
+        stop_server = start_server()
+        remote = time_process(CLIENT_STARTUP)
+        print(f"  startup:    {local * 1000:>8.1f} ms loading locally, "
+              f"{remote * 1000:.1f} ms as a client")
+        client = ClinicClient()
+        client.login("stress", PASSWORD)
+        start = time.perf_counter()
+        for phn in range(1, CALLS + 1):
+            client.search_patient(phn)
+        single = (time.perf_counter() - start) / CALLS
+        start = time.perf_counter()
+        client.call_many([("search_patient", (phn,), {}) for phn in \
+                          range(1, CALLS + 1)])
+        pipelined = (time.perf_counter() - start) / CALLS
+        print(f"  latency:    {single * 1e6:>8.1f} us per call, "
+              f"{pipelined * 1e6:.1f} us pipelined")
+        client.close()
+        # Every client looks up its own stretch of patients
+        def work(number):
+            each = ClinicClient()
+            each.login("stress", PASSWORD)
+            for phn in range(number * CALLS + 1, (number + 1) * CALLS + 1):
+                each.search_patient(phn % size + 1)
+            each.close()
+        threads = [threading.Thread(target=work, args=(number,)) for \
+                   number in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"  throughput: {clients * CALLS / elapsed:>8.0f} calls/s "
+              f"from {clients} clients")
+        stop_server()
+    finally:
+        os.chdir(os.path.dirname(directory))
+        shutil.rmtree(directory)
+
+# ==============================================================================
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    run(size, clients)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_snapshot.py':
+
+Measures what a snapshot (see 'dao/patient_snapshot.py') saves on a restart.
+In a scratch directory holding a generated registry, it times:
+
+    - a start from 'patients.json', decoding and re-indexing every patient
+    - a clean shutdown that saves the snapshot, and the snapshot's size
+    - a start from the snapshot
+    - a start after a patient change, which must ignore the now stale
+      snapshot and load 'patients.json' again
+
+Each start is a login on a fresh Controller, which is when patients load.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_snapshot [patients]
+
+Defaults to 200k patients.
+
+============================================================================ """
+
+# IMPORTS:
+import os
+import shutil
+import sys
+import time
+from clinic.benchmarks.bench_server import build_registry
+from clinic.benchmarks.stress_concurrency import make_scratch, PASSWORD
+from clinic.controller import Controller
+
+# Logs in on a fresh controller. Returns it, and the seconds the login took
+def start():
+    controller = Controller(autosave=True, snapshot=True)
+    begin = time.perf_counter()
+    controller.login("stress", PASSWORD)
+    return controller, time.perf_counter() - begin
+
+def run(size):
+    directory = make_scratch()
+    try:
+        build_registry(size)
+        print(f"{size} patients")
+        controller, cold = start()
+        print(f"  from patients.json: {cold:>7.2f} s")
+        begin = time.perf_counter()
+        controller.shutdown()
+        saved = time.perf_counter() - begin
+        print(f"  saving snapshot:    {saved:>7.2f} s, "
+              f"{os.path.getsize('clinic/patients.snapshot') / 2**20:.1f} MiB")
+        controller, warm = start()
+        if controller.patient_dao.snapshot_loaded is not True:
+            raise RuntimeError("Error: the snapshot was not used")
+        print(f"  from snapshot:      {warm:>7.2f} s "
+              f"({cold / warm:.1f}x faster)")
+        controller.create_patient(size + 1, "Late Patient", "1990-01-01", \
+                                  "250", "p@clinic.ca", "1 Main St")
+        controller, stale = start()
+        if controller.patient_dao.snapshot_loaded is not False or \
+           controller.search_patient(size + 1) is None:
+            raise RuntimeError("Error: a stale snapshot was used")
+        print(f"  after a change:     {stale:>7.2f} s (snapshot ignored)")
+    finally:
+        os.chdir(os.path.dirname(directory))
+        shutil.rmtree(directory)
+
+# ==============================================================================
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    run(size)
+
+if __name__ == "__main__":
+    main()
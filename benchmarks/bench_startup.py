@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_startup.py':
+
+Measures how quickly 'python -m clinic cli' gets going, in a scratch
+directory holding a generated registry:
+
+    - imports: a '-X importtime' breakdown of what the CLI imports, largest
+      first, and whether it pulls in anything it should not (PyQt6, say)
+    - first prompt: wall time from launching the CLI until it asks for an
+      option, which should not depend on the size of the registry
+    - login: wall time until the main menu, which includes loading the
+      patients (deferred until login)
+
+The first run of each is reported separately, as the one with the coldest
+caches. Exits with status 1 if the first prompt is slower than the target or
+an unwanted module was imported, so it can guard against regressions.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_startup [patients] [target ms]
+
+Defaults are 100k patients and a 150 ms target.
+
+============================================================================ """
+
+# IMPORTS:
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import clinic
+from clinic.benchmarks.bench_server import build_registry
+from clinic.benchmarks.stress_concurrency import make_scratch, PASSWORD
+
+STARTUPS = 10
+SHOWN = 12
+# Modules the CLI has no use for at start up
+UNWANTED = ("PyQt6", "unittest", "numpy", "sqlite3")
+PROMPT = b"Choose your option: "
+MAIN_MENU = b"MAIN MENU"
+
+# Helper method- the environment a fresh interpreter needs to find 'clinic'
+def environment():
+    return dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(\
+                os.path.abspath(clinic.__file__))))
+
+def import_times():
+    """
+    Imports the CLI in a fresh interpreter with '-X importtime'. Returns a
+    list of (module, self us, cumulative us) tuples, in import order.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", \
+                             "import clinic.cli.clinic_cli"], \
+                            env=environment(), check=True, \
+                            capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        modules.append((fields[2].strip(), int(fields[0].split(":")[1]), \
+                        int(fields[1])))
+    return modules
+
+# Helper method- reads the process's output until 'marker' is seen
+def wait_for(process, output, marker):
+    while marker not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError("Error: the CLI exited before printing %r" % \
+                               marker)
+        output += chunk
+    return output[output.index(marker) + len(marker):]
+
+def time_cli():
+    """
+    Starts the CLI once, logs in and quits. Returns the seconds taken to
+    reach the first prompt, and to reach the main menu after logging in.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", "-m", "clinic", "cli"], \
+                               env=environment(), stdin=subprocess.PIPE, \
+                               stdout=subprocess.PIPE, \
+                               stderr=subprocess.DEVNULL)
+    try:
+        output = wait_for(process, b"", PROMPT)
+        prompt = time.perf_counter() - start
+        start = time.perf_counter()
+        process.stdin.write(f"1\nstress\n{PASSWORD}\n".encode())
+        process.stdin.flush()
+        wait_for(process, output, MAIN_MENU)
+        login = time.perf_counter() - start
+        # Log out, then quit
+        process.stdin.write(b"8\n\n2\n")
+        process.stdin.close()
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+    return prompt, login
+
+def run(size, target):
+    modules = import_times()
+    total = modules[-1][2]
+    print(f"importing the CLI: {total / 1000:.1f} ms, "
+          f"{len(modules)} modules")
+    print(f"  {'module':<40} {'self (ms)':>10} {'cumulative (ms)':>16}")
+    for name, own, cumulative in sorted(modules, key=lambda module: \
+                                        module[1], reverse=True)[:SHOWN]:
+        print(f"  {name:<40} {own / 1000:>10.2f} {cumulative / 1000:>16.2f}")
+    unwanted = sorted({name for name, own, cumulative in modules if \
+                       name.split(".")[0] in UNWANTED})
+    if unwanted:
+        print(f"  unwanted imports: {', '.join(unwanted)}")
+    directory = make_scratch()
+    try:
+        build_registry(size)
+        runs = [time_cli() for _ in range(STARTUPS)]
+    finally:
+        os.chdir(os.path.dirname(directory))
+        shutil.rmtree(directory)
+    print(f"\n{size} patients, {STARTUPS} runs")
+    print(f"  {'':<14} {'first (ms)':>11} {'median (ms)':>12} {'best (ms)':>10}")
+    for label, times in [("first prompt", [prompt for prompt, login in \
+                                           runs]), \
+                         ("login", [login for prompt, login in runs])]:
+        print(f"  {label:<14} {times[0] * 1000:>11.1f} "
+              f"{statistics.median(times) * 1000:>12.1f} "
+              f"{min(times) * 1000:>10.1f}")
+    passed = runs[0][0] * 1000 <= target and not unwanted
+    print(f"\n{'PASS' if passed else 'FAIL'}: first prompt within "
+          f"{target:.0f} ms{' with no unwanted imports' if passed else ''}")
+    return passed
+
+# ==============================================================================
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    target = float(sys.argv[2]) if len(sys.argv) > 2 else 150
+    if not run(size, target):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
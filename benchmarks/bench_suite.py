@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'bench_suite.py':
+
+Times every user story against generated clinics of growing size (see
+'data_generator.py'), with and without autosave, and prints the results as
+JSON so that two runs can be diffed.
+
+Each size and mode runs in a fresh Python process. With autosave, the process
+works on a scratch copy of the cached data directory (changing into it, as
+the program expects); without, the same clinic is built in memory first. The
+first login loads the patients and is reported as 'startup_seconds'. Then each
+scenario repeats one user story OPERATIONS times (or until it has run for
+BUDGET seconds) on random patients, notes and names, and reports:
+
+    - latency percentiles (p50, p90, p99), mean and max, in milliseconds
+    - bytes written, from the process's write count in /proc (Linux only;
+      null elsewhere), which covers every file the scenario wrote
+    - peak RSS of the process so far, in KiB
+
+The Controller's query cache is turned off (query_cache_size=0): the
+scenarios repeat the same searches and listings, so with it on nearly every
+timed step would be a hit, hiding the DAO cost that grows with the data.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.bench_suite [size size ...] > results.json
+
+Default sizes are 1k, 10k, 100k and 1M patients. Progress goes to stderr.
+
+============================================================================ """
+
+# IMPORTS:
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import clinic
+from clinic.benchmarks.data_generator import data_dir, populate, \
+                                             generate_note, USERNAME, \
+                                             PASSWORD, FIRST_PHN, \
+                                             FIRST_NAMES, LAST_NAMES, \
+                                             NOTE_WORDS
+from clinic.controller import Controller
+
+SIZES = [1000, 10000, 100000, 1000000]
+OPERATIONS = 200
+BUDGET = 10.0
+PERCENTILES = (50, 90, 99)
+CHILD = ("from clinic.benchmarks.bench_suite import run_child\n"
+         "run_child(%d, %r, %d)\n")
+
+# Returns the bytes this process has written so far, or None if unknown
+def bytes_written():
+    try:
+        with open("/proc/self/io") as raw_io:
+            for line in raw_io:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+# Returns the process's peak resident set size so far, in KiB
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+# Helper method- summarizes a list of latencies in seconds
+def summarize(latencies):
+    latencies = sorted(latencies)
+    summary = {"operations": len(latencies)}
+    if not latencies:
+        return summary
+    for percentile in PERCENTILES:
+        position = min(len(latencies) - 1, len(latencies) * percentile // 100)
+        summary[f"p{percentile}_ms"] = round(latencies[position] * 1000, 4)
+    summary["mean_ms"] = round(sum(latencies) / len(latencies) * 1000, 4)
+    summary["max_ms"] = round(latencies[-1] * 1000, 4)
+    return summary
+
+def timed(operation, prepare = None):
+    """
+    Accepts 'operation', a function of the step number to time, and
+    optionally 'prepare', an untimed function run before each step. Runs up
+    to OPERATIONS steps, stopping early after BUDGET seconds. Returns the
+    scenario's summary.
+    """
+    latencies = []
+    written = bytes_written()
+    deadline = time.perf_counter() + BUDGET
+    for step in range(OPERATIONS):
+        if prepare is not None:
+            prepare(step)
+        start = time.perf_counter()
+        operation(step)
+        latencies.append(time.perf_counter() - start)
+        if start > deadline:
+            break
+    summary = summarize(latencies)
+    after = bytes_written()
+    summary["bytes_written"] = None if written is None else after - written
+    summary["peak_rss_kib"] = peak_rss()
+    return summary
+
+def scenarios(controller, size, username, password, rng):
+    """
+    Yields (name, summary) for each user story in turn, run against
+    'controller' (logged in, holding 'size' generated patients).
+    """
+    phns = range(FIRST_PHN, FIRST_PHN + size)
+    created = []
+    next_phn = FIRST_PHN + size
+    # USER STORIES 1 and 2
+    yield "login", timed(lambda step: controller.login(username, password), \
+                         lambda step: controller.logout())
+    controller.logout()
+    yield "logout", timed(lambda step: controller.logout(), \
+                          lambda step: controller.login(username, password))
+    controller.login(username, password)
+    # USER STORY 3
+    yield "search_patient", timed(lambda step: controller.search_patient(\
+                                  rng.choice(phns)))
+    # USER STORY 4
+    def create(step):
+        phn = next_phn + step
+        controller.create_patient(phn, f"{rng.choice(FIRST_NAMES)} Newcomer", \
+                                  "1990-06-15", "250-555-0100", \
+                                  "new@example.ca", "1 Main St, Victoria")
+        created.append(phn)
+    yield "create_patient", timed(create)
+    # USER STORY 5
+    yield "retrieve_patients", timed(lambda step: controller.\
+                                     retrieve_patients(rng.choice(\
+                                     FIRST_NAMES + LAST_NAMES)))
+    # USER STORY 6
+    def update(step):
+        patient = controller.search_patient(rng.choice(phns))
+        controller.update_patient(patient.get_phn(), patient.get_phn(), \
+                                  patient.get_name(), patient.get_birthdate(),\
+                                  f"250-555-{step:04}", patient.get_email(), \
+                                  patient.get_address())
+    yield "update_patient", timed(update)
+    # USER STORY 7 (removing the patients added above)
+    yield "delete_patient", timed(lambda step: controller.delete_patient(\
+                                  created.pop()), lambda step: created or \
+                                  create(OPERATIONS + step))
+    # USER STORY 8
+    yield "list_patients", timed(lambda step: controller.list_patients())
+    # USER STORY 9 (loading the patient's notes)
+    yield "set_current_patient", timed(lambda step: controller.\
+                                       set_current_patient(rng.choice(phns)),\
+                                       lambda step: controller.\
+                                       unset_current_patient())
+    # USER STORIES 10 to 14, on one patient with a long history
+    controller.unset_current_patient()
+    controller.set_current_patient(busiest_patient(controller, phns, rng))
+    note_indexes = [note.get_index() for note in controller.list_notes()]
+    new_notes = []
+    yield "create_note", timed(lambda step: new_notes.append(controller.\
+                               create_note(generate_note(rng)).get_index()))
+    yield "retrieve_notes", timed(lambda step: controller.retrieve_notes(\
+                                  rng.choice(NOTE_WORDS)))
+    yield "update_note", timed(lambda step: controller.update_note(\
+                               rng.choice(note_indexes or new_notes), \
+                               generate_note(rng)))
+    yield "delete_note", timed(lambda step: controller.delete_note(\
+                               new_notes.pop()), lambda step: new_notes or \
+                               new_notes.append(controller.create_note(\
+                               generate_note(rng)).get_index()))
+    yield "list_notes", timed(lambda step: controller.list_notes())
+
+# Helper method- the patient with the most notes out of a random sample
+def busiest_patient(controller, phns, rng):
+    def note_count(phn):
+        return controller.search_patient(phn).record.note_summary()[0]
+    return max(rng.sample(phns, min(200, len(phns))), key=note_count)
+
+def run_child(size, autosave, seed = 265):
+    """
+    Runs every scenario for one size and mode in this process, and prints
+    the results as a line of JSON. Run by 'run' in a fresh interpreter.
+    """
+    rng = random.Random(seed)
+    directory = None
+    if autosave is True:
+        directory = tempfile.mkdtemp(prefix="clinic-bench-")
+        shutil.copytree(os.path.join(data_dir(size, seed), "clinic"), \
+                        os.path.join(directory, "clinic"))
+        os.chdir(directory)
+        username, password = USERNAME, PASSWORD
+    else:
+        username, password = "user", "123456"
+    result = {"patients": size, "autosave": autosave}
+    try:
+        # The Controller's own messages would only clutter the output
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = Controller(autosave=autosave, query_cache_size=0)
+            if autosave is not True:
+                result["build_seconds"] = round(timed_once(lambda: \
+                                                populate(controller, size, \
+                                                seed)), 4)
+            result["startup_seconds"] = round(timed_once(lambda: \
+                                              controller.login(username, \
+                                              password)), 4)
+            result["scenarios"] = {}
+            for name, summary in scenarios(controller, size, username, \
+                                           password, rng):
+                result["scenarios"][name] = summary
+                print(f"  {name}: {summary.get('p50_ms')} ms median", \
+                      file=sys.stderr)
+            controller.logout()
+        result["peak_rss_kib"] = peak_rss()
+    finally:
+        if directory is not None:
+            os.chdir(os.path.dirname(directory))
+            shutil.rmtree(directory)
+    print(json.dumps(result))
+
+# Returns the seconds 'function' takes to run once
+def timed_once(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def run(sizes):
+    environment = dict(os.environ, PYTHONPATH=os.path.dirname(\
+                       os.path.dirname(os.path.abspath(clinic.__file__))))
+    results = {"python": platform.python_version(), "platform": \
+               platform.platform(), "started": time.strftime(\
+               "%Y-%m-%dT%H:%M:%S"), "operations": OPERATIONS, "budget": \
+               BUDGET, "runs": []}
+    for size in sizes:
+        # Build (or find) the data directory up front, outside the timings
+        data_dir(size)
+        for autosave in (False, True):
+            print(f"{size} patients, autosave={autosave}", file=sys.stderr)
+            child = subprocess.run([sys.executable, "-c", CHILD % (size, \
+                                    autosave, 265)], env=environment, \
+                                   check=True, stdout=subprocess.PIPE, \
+                                   text=True)
+            results["runs"].append(json.loads(child.stdout))
+    return results
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(json.dumps(run(sizes), indent=2, sort_keys=True))
+
+if __name__ == "__main__":
+    main()
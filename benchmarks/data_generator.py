@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'data_generator.py':
+
+Generates synthetic clinics for the benchmark suite ('bench_suite.py'). Each
+patient gets a realistic name, birth date, phone number, email and address,
+and a number of notes drawn from a skewed (Pareto) distribution: most
+patients have none or a few, and a small number have hundreds, as in a real
+practice. Note lengths vary around twenty words of clinical vocabulary.
+
+The same size and seed always give the same clinic. It can be built either
+as a data directory (a 'clinic/' folder holding 'users.txt', 'patients.json'
+and 'records/<phn>.dat', exactly as the program writes them) or straight
+into a Controller without persistence.
+
+Data directories are cached under DATA_ROOT, since the larger ones take a
+while to build; delete a directory to have it built afresh.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.data_generator [size size ...]
+
+Default sizes are 1k, 10k, 100k and 1M patients.
+
+============================================================================ """
+
+# IMPORTS:
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from clinic.dao.note_log import NoteLog
+
+DATA_ROOT = os.path.join(tempfile.gettempdir(), "clinic-bench-data")
+GENERATOR_VERSION = 2
+USERNAME = "bench"
+PASSWORD = "bench"
+FIRST_PHN = 9000000001
+FIRST_NAMES = ["Olivia", "Liam", "Emma", "Noah", "Charlotte", "Oliver", \
+               "Amelia", "James", "Sophia", "William", "Ava", "Benjamin", \
+               "Isabella", "Lucas", "Mia", "Henry", "Evelyn", "Theodore", \
+               "Harper", "Jack", "Priya", "Arjun", "Mei", "Wei", "Fatima", \
+               "Omar", "Sofia", "Mateo", "Aiyana", "Koa", "Hana", "Kenji"]
+LAST_NAMES = ["Smith", "Brown", "Tremblay", "Martin", "Roy", "Wilson", \
+              "MacDonald", "Gagnon", "Johnson", "Taylor", "Campbell", \
+              "Anderson", "Leblanc", "Lee", "Wong", "Chen", "Singh", "Patel", \
+              "Nguyen", "Kim", "Li", "Gill", "Sandhu", "Thomas", "White", \
+              "Harris", "Clark", "Lewis", "Young", "Walker", "Scott", "Hall"]
+STREETS = ["Main St", "Oak Bay Ave", "Fort St", "Douglas St", "Cook St", \
+           "Shelbourne St", "Quadra St", "Blanshard St", "Richmond Rd", \
+           "Foul Bay Rd", "Hillside Ave", "Yates St"]
+CITIES = ["Victoria", "Saanich", "Esquimalt", "Langford", "Sidney"]
+NOTE_WORDS = ["patient", "reports", "mild", "severe", "pain", "headache", \
+              "fever", "cough", "fatigue", "dizziness", "nausea", "rash", \
+              "blood", "pressure", "elevated", "normal", "prescribed", \
+              "ibuprofen", "amoxicillin", "follow", "up", "in", "two", \
+              "weeks", "referred", "to", "physiotherapy", "x-ray", "ordered",\
+              "results", "unremarkable", "advised", "rest", "fluids", "and", \
+              "monitor", "symptoms", "improving", "since", "last", "visit", \
+              "no", "known", "allergies", "history", "of", "asthma", \
+              "diabetes", "hypertension", "the", "with", "left", "right", \
+              "knee", "shoulder", "back", "lower", "chest", "clear"]
+# Notes-per-patient tail: smaller means more patients with many notes
+NOTE_SKEW = 1.3
+MAX_NOTES = 500
+# Notes are dated over the last five years
+NOTE_SPAN = 5 * 365 * 24 * 3600 * 1000000
+
+# Returns a random note of around twenty words
+def generate_note(rng):
+    words = max(3, int(rng.lognormvariate(3.0, 0.6)))
+    text = " ".join(rng.choices(NOTE_WORDS, k=words))
+    return text[0].upper() + text[1:] + "."
+
+def generate(size, seed = 265):
+    """
+    Yields ((phn, name, birth_date, phone, email, address), notes) for each
+    of 'size' generated patients, where 'notes' is a list of note texts,
+    oldest first.
+    """
+    rng = random.Random(seed)
+    for phn in range(FIRST_PHN, FIRST_PHN + size):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        birth_date = f"{rng.randrange(1930, 2025)}-{rng.randrange(1, 13):02}-{rng.randrange(1, 29):02}"
+        phone = f"250-{rng.randrange(200, 1000)}-{rng.randrange(10000):04}"
+        email = f"{first}.{last}{rng.randrange(100)}@example.ca".lower()
+        address = f"{rng.randrange(1, 4000)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        # A Pareto draw is at least 1: about 60% of patients get no notes
+        count = min(MAX_NOTES, int(rng.paretovariate(NOTE_SKEW)) - 1)
+        notes = [generate_note(rng) for _ in range(count)]
+        yield (phn, f"{first} {last}", birth_date, phone, email, address), \
+              notes
+
+def build_data_dir(directory, size, seed = 265):
+    """
+    Writes a generated clinic of 'size' patients into 'directory', as the
+    folder 'clinic/' would be written by the program itself. Returns a
+    dictionary with the number of patients, notes and note files.
+    """
+    clinic_directory = os.path.join(directory, "clinic")
+    os.makedirs(os.path.join(clinic_directory, "records"))
+    with open(os.path.join(clinic_directory, "users.txt"), "w") as users:
+        users.write(USERNAME + "," + \
+                    hashlib.sha256(PASSWORD.encode()).hexdigest())
+    patients = {}
+    notes_written = 0
+    note_files = 0
+    stamp_rng = random.Random(seed + 1)
+    now = time.time_ns() // 1000
+    for (phn, name, birth_date, phone, email, address), notes in \
+        generate(size, seed):
+        # The same layout 'PatientEncoder' writes
+        patients[str(phn)] = {"__type__": "Patient", "phn": phn, "name": \
+                              name, "birth_date": birth_date, "phone": \
+                              phone, "email": email, "address": address, \
+                              "autosave": True}
+        if not notes:
+            continue
+        # A compacted note log, with stamps in order over the note span
+        stamps = sorted(now - stamp_rng.randrange(NOTE_SPAN) for _ in notes)
+        records = [("position", len(notes))]
+        for note_index, (text, stamp) in enumerate(zip(notes, stamps), 1):
+            records.append(("create", note_index, text, stamp))
+        NoteLog(os.path.join(clinic_directory, "records", \
+                             f"{phn}.dat")).rewrite(records)
+        notes_written += len(notes)
+        note_files += 1
+    with open(os.path.join(clinic_directory, "patients.json"), "w") as raw_json:
+        json.dump(patients, raw_json)
+    return {"patients": size, "notes": notes_written, "note_files": note_files}
+
+def data_dir(size, seed = 265):
+    """
+    Returns the cached data directory holding a generated clinic of 'size'
+    patients, building it first if needed.
+    """
+    directory = os.path.join(DATA_ROOT, f"v{GENERATOR_VERSION}-{size}-{seed}")
+    # The summary is written last, so its presence marks a finished build
+    summary_filename = os.path.join(directory, "summary.json")
+    if os.path.exists(summary_filename):
+        return directory
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    summary = build_data_dir(directory, size, seed)
+    with open(summary_filename, "w") as raw_summary:
+        json.dump(summary, raw_summary)
+    return directory
+
+def populate(controller, size, seed = 265):
+    """
+    Adds a generated clinic of 'size' patients and their notes to
+    'controller', which should not be persistent. Returns the number of
+    notes added.
+    """
+    patient_dao = controller.patient_dao
+    notes_added = 0
+    for row, notes in generate(size, seed):
+        patient_dao.create_patients([row])
+        record = patient_dao.search_patient(row[0]).record
+        for text in notes:
+            record.create_note(text)
+        notes_added += len(notes)
+    return notes_added
+
+# ==============================================================================
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000, 100000, \
+                                                      1000000]
+    for size in sizes:
+        start = time.perf_counter()
+        directory = data_dir(size)
+        with open(os.path.join(directory, "summary.json")) as raw_summary:
+            summary = json.load(raw_summary)
+        print(f"{size:>8} patients: {summary['notes']} notes in "
+              f"{summary['note_files']} files, {directory} "
+              f"({time.perf_counter() - start:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'replay.py':
+
+Replays a JSONL trace of Controller operations, as written by
+'trace_recorder.py', and reports how the clinic performed. Each line holds
+one operation:
+
+    {"op": "search_patient", "args": [9000000001], "kwargs": {},
+     "at": 0.25, "session": "a1", "digest": "...", "error": "..."}
+
+Only "op" is required. "at" (seconds from the start of the trace) sets the
+pace; "session" labels the session the operation acts for, opened by a
+'login' or 'open_session' with that label; "digest" (or "result", a literal
+value) and "error" are what the original run returned, and any difference is
+reported as a divergence. Every login uses the replay's own credentials.
+
+The trace can be played at its original pace, faster by some factor, or as
+fast as possible, against either backend. Given a data directory (one that
+holds 'clinic/'), a scratch copy of it is used with autosave on; otherwise
+the clinic starts empty and in memory. Reports throughput, latency
+percentiles per operation, how far behind schedule the replay fell, and the
+divergences.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.replay trace.jsonl [--speed N|max]
+           [--backend json|sqlite] [--data DIRECTORY] [--user NAME]
+           [--password PASSWORD] [--json REPORT]
+
+The default speed is 1 (the original pace).
+
+============================================================================ """
+
+# IMPORTS:
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from clinic.benchmarks.bench_suite import summarize
+from clinic.controller import Controller
+from clinic.trace_recorder import RECORDED, normalize, result_digest
+
+SHOWN_DIVERGENCES = 10
+
+def load_trace(filename):
+    """
+    Reads the trace in 'filename'. Returns a list of (line number,
+    operation) pairs, skipping blank lines. Raises a ValueError naming the
+    line if one is not valid JSON or names an unknown operation.
+    """
+    operations = []
+    with open(filename, "r") as raw_trace:
+        for line_number, line in enumerate(raw_trace, 1):
+            if not line.strip():
+                continue
+            try:
+                operation = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Error: line {line_number} is not valid JSON")
+            if operation.get("op") not in RECORDED:
+                raise ValueError(f"Error: line {line_number} has unknown operation {operation.get('op')!r}")
+            operations.append((line_number, operation))
+    return operations
+
+class Replay:
+    def __init__(self, controller, username, password, speed = 1.0):
+        self.controller = controller
+        self.username = username
+        self.password = password
+        self.speed = speed              # None replays as fast as possible
+        self.sessions = {}              # trace label -> Session
+        self.latencies = {}             # operation -> list of seconds
+        self.errors = {}                # operation -> count
+        self.divergences = []
+        self.max_lag = 0.0
+
+    def __str__(self):
+        return f"Speed: {self.speed}, Sessions: {len(self.sessions)}, Divergences: {len(self.divergences)}"
+
+    # Helper method- runs one traced operation, returning its result
+    def _perform(self, operation):
+        name = operation["op"]
+        label = operation.get("session")
+        arguments = list(operation.get("args", []))
+        keywords = dict(operation.get("kwargs", {}))
+        if name in ("login", "open_session"):
+            # A login that failed in the trace is made to fail again
+            password = self.password
+            if operation.get("error") == "InvalidLoginException":
+                password = ""
+            if label is None:
+                return self.controller.login(self.username, password)
+            self.sessions[label] = self.controller.open_session(\
+                                   self.username, password)
+            return None
+        if label is not None:
+            session = self.sessions.get(label)
+            if session is None:
+                raise KeyError(f"Error: session {label!r} was never opened")
+            if name in ("logout", "close_session"):
+                del self.sessions[label]
+                return self.controller.close_session(session)
+            keywords["session"] = session
+        return getattr(self.controller, name)(*arguments, **keywords)
+
+    # Helper method- notes any difference from what the trace expected
+    def _check(self, line_number, operation, result, error):
+        expected_error = operation.get("error")
+        actual_error = None if error is None else type(error).__name__
+        if expected_error != actual_error and (expected_error is not None or \
+           "digest" in operation or "result" in operation):
+            self.divergences.append({"line": line_number, "op": operation["op"],
+                                     "expected": expected_error, \
+                                     "actual": actual_error})
+            return
+        if error is not None or operation["op"] == "open_session":
+            return
+        if "result" in operation:
+            expected, actual = normalize(operation["result"]), normalize(result)
+        elif "digest" in operation:
+            expected, actual = operation["digest"], result_digest(result)
+        else:
+            return
+        if expected != actual:
+            self.divergences.append({"line": line_number, "op": \
+                                     operation["op"], "expected": expected, \
+                                     "actual": actual})
+
+    def run(self, operations):
+        """
+        Accepts a list of (line number, operation) pairs, as returned by
+        'load_trace', and replays them in order. Returns the seconds taken.
+        """
+        start = time.perf_counter()
+        for line_number, operation in operations:
+            # Wait for the operation's turn, unless replaying flat out
+            if self.speed is not None and "at" in operation:
+                due = start + operation["at"] / self.speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    self.max_lag = max(self.max_lag, -wait)
+            began = time.perf_counter()
+            result = error = None
+            try:
+                result = self._perform(operation)
+            except Exception as exception:
+                error = exception
+            elapsed = time.perf_counter() - began
+            self.latencies.setdefault(operation["op"], []).append(elapsed)
+            if error is not None:
+                self.errors[operation["op"]] = \
+                    self.errors.get(operation["op"], 0) + 1
+            self._check(line_number, operation, result, error)
+        return time.perf_counter() - start
+
+    # Returns the replay's results, as a dictionary ready for JSON
+    def report(self, elapsed):
+        count = sum(len(latencies) for latencies in self.latencies.values())
+        operations = {}
+        for name, latencies in sorted(self.latencies.items()):
+            operations[name] = summarize(latencies)
+            operations[name]["errors"] = self.errors.get(name, 0)
+        return {"operations": count, "seconds": round(elapsed, 4), \
+                "throughput": round(count / elapsed, 1) if elapsed else None,\
+                "speed": self.speed, "max_lag_ms": round(self.max_lag * \
+                                                         1000, 4), \
+                "by_operation": operations, "divergences": self.divergences}
+
+# Prints a report as a table
+def print_report(report):
+    print(f"{report['operations']} operations in {report['seconds']:.2f} s "
+          f"({report['throughput']} ops/s), at most "
+          f"{report['max_lag_ms']:.1f} ms behind schedule")
+    print(f"  {'operation':<32} {'count':>7} {'errors':>7} {'p50 (ms)':>9} "
+          f"{'p90 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    for name, summary in report["by_operation"].items():
+        print(f"  {name:<32} {summary['operations']:>7} "
+              f"{summary['errors']:>7} {summary['p50_ms']:>9.3f} "
+              f"{summary['p90_ms']:>9.3f} {summary['p99_ms']:>9.3f} "
+              f"{summary['max_ms']:>9.3f}")
+    divergences = report["divergences"]
+    print(f"{len(divergences)} divergences")
+    for divergence in divergences[:SHOWN_DIVERGENCES]:
+        print(f"  line {divergence['line']} ({divergence['op']}): expected "
+              f"{divergence['expected']!r}, got {divergence['actual']!r}")
+
+def replay_trace(filename, speed = 1.0, backend = "json", data = None, \
+                 username = "user", password = "123456"):
+    """
+    Replays the trace in 'filename' against a fresh Controller, on a scratch
+    copy of 'data' (a directory holding 'clinic/') if given. Returns the
+    report.
+    """
+    operations = load_trace(filename)
+    previous = os.getcwd()
+    directory = None
+    if data is not None:
+        directory = tempfile.mkdtemp(prefix="clinic-replay-")
+        shutil.copytree(os.path.join(data, "clinic"), \
+                        os.path.join(directory, "clinic"))
+        os.chdir(directory)
+    try:
+        # The Controller's own messages would only clutter the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller = Controller(autosave=data is not None, \
+                                    backend=backend)
+            replay = Replay(controller, username, password, speed)
+            elapsed = replay.run(operations)
+            controller.flush()
+    finally:
+        if directory is not None:
+            os.chdir(previous)
+            shutil.rmtree(directory)
+    return replay.report(elapsed)
+
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a trace of clinic operations.")
+    parser.add_argument("trace", help="JSONL trace, as written by TraceRecorder")
+    parser.add_argument("--speed", default="1", help="pace factor, or 'max' for as fast as possible")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"])
+    parser.add_argument("--data", help="directory holding 'clinic/' to replay against (a copy is used)")
+    parser.add_argument("--user", default="user", help="user every login replays as")
+    parser.add_argument("--password", default="123456")
+    parser.add_argument("--json", help="also write the report to this file")
+    arguments = parser.parse_args()
+    speed = None if arguments.speed == "max" else float(arguments.speed)
+    data = None if arguments.data is None else os.path.abspath(arguments.data)
+    report = replay_trace(arguments.trace, speed, arguments.backend, data, \
+                          arguments.user, arguments.password)
+    print_report(report)
+    if arguments.json is not None:
+        with open(arguments.json, "w") as raw_report:
+            json.dump(report, raw_report, indent=2, sort_keys=True)
+    sys.exit(1 if report["divergences"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'stress_concurrency.py':
+
+Stress test for 'Controller' in concurrent mode. Many threads share one
+persistent controller, working in a scratch directory:
+
+    - writer threads create, rename, renumber and delete their own patients
+    - note threads, each in its own session, all add, revise and delete
+      notes on a shared handful of patients, so that changes to the same
+      record contend for its lock
+    - reader threads search and list patients alongside them, checking that
+      every result they see is sound (matches, no repeated PHNs)
+
+Afterwards the registry is checked against what each writer expects, every
+shared patient's notes are checked (one note per successful create, note
+numbers never reused), and the files on disk are re-read by a fresh
+controller, which must see exactly the same patients and notes.
+
+The same workload runs against each storage configuration in CONFIGURATIONS:
+the JSON file with its journal, the JSON file with write-behind (and a note
+cache small enough that records holding unwritten changes are evicted all
+the time), and SQLite.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic.benchmarks.stress_concurrency [threads] [operations]
+                                                   [configuration]
+
+Defaults are 8 threads of each kind, 300 operations per thread, and every
+configuration in turn.
+
+============================================================================ """
+
+# IMPORTS:
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from clinic.controller import Controller
+
+SHARED_PATIENTS = 4
+PASSWORD = "stress"
+# Controller options for each storage configuration under test
+CONFIGURATIONS = {"journal": {"journal": True}, \
+                  "write-behind": {"write_behind": True, "flush_interval": \
+                                   0.01, "flush_threshold": 10, \
+                                   "note_cache_size": SHARED_PATIENTS // 2}, \
+                  "sqlite": {"backend": "sqlite"}}
+
+# Makes a scratch 'clinic/' directory with a single user, and moves into it
+def make_scratch():
+    directory = tempfile.mkdtemp(prefix="clinic-stress-")
+    os.makedirs(os.path.join(directory, "clinic", "records"))
+    with open(os.path.join(directory, "clinic", "users.txt"), "w") as users:
+        users.write("stress," + hashlib.sha256(PASSWORD.encode()).hexdigest())
+    os.chdir(directory)
+    return directory
+
+# Runs each of 'targets' in its own thread, re-raising the first failure
+def run_threads(targets):
+    failures = []
+    def guarded(target):
+        try:
+            target()
+        except BaseException as error:
+            failures.append(error)
+    threads = [threading.Thread(target=guarded, args=(target,)) \
+               for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+
+def writer(controller, number, operations, expected):
+    # Each writer owns its own band of PHNs, so it knows what to expect
+    rng = random.Random(number)
+    base = (number + 1) * 1000000
+    mine = {}
+    for step in range(operations):
+        action = rng.random()
+        if action < 0.5 or not mine:
+            phn = base + step
+            name = f"Writer{number} Patient{step}"
+            controller.create_patient(phn, name, "2000-01-01", "250", \
+                                      "w@clinic.ca", "1 Main St")
+            mine[phn] = name
+        elif action < 0.8:
+            old_phn = rng.choice(list(mine))
+            phn = old_phn if rng.random() < 0.5 else base + operations + step
+            name = f"Writer{number} Renamed{step}"
+            controller.update_patient(old_phn, phn, name, "2000-01-01", \
+                                      "250", "w@clinic.ca", "1 Main St")
+            del mine[old_phn]
+            mine[phn] = name
+        else:
+            phn = rng.choice(list(mine))
+            controller.delete_patient(phn)
+            del mine[phn]
+    expected.update(mine)
+
+def note_taker(controller, number, operations, created, created_lock):
+    # Each note taker works in a session of its own
+    rng = random.Random(1000 + number)
+    session = controller.open_session("stress", PASSWORD)
+    for step in range(operations):
+        phn = rng.randrange(1, SHARED_PATIENTS + 1)
+        controller.set_current_patient(phn, session=session)
+        action = rng.random()
+        if action < 0.6:
+            controller.create_note(f"thread {number} note {step}", \
+                                   session=session)
+            with created_lock:
+                created[phn] += 1
+        elif action < 0.8:
+            notes = controller.list_notes(1, session=session)
+            if notes:
+                controller.update_note(notes[0].get_index(), \
+                                       f"thread {number} revised {step}", \
+                                       session=session)
+        else:
+            notes = controller.list_notes(1, session=session)
+            if notes and controller.delete_note(notes[0].get_index(), \
+                                                session=session):
+                with created_lock:
+                    created[phn] -= 1
+    controller.close_session(session)
+
+def reader(controller, number, operations):
+    rng = random.Random(2000 + number)
+    queries = ["Writer", "Patient1", "Renamed", "er3 P", "Shared"]
+    for step in range(operations):
+        query = rng.choice(queries)
+        patients = controller.retrieve_patients(query)
+        assert all(query in patient.get_name() for patient in patients), query
+        phns = [patient.get_phn() for patient in controller.list_patients()]
+        assert len(phns) == len(set(phns)), "repeated PHN in listing"
+
+# Returns {phn: name} and {phn: sorted note indexes} as the controller sees them
+def snapshot(controller):
+    patients = {patient.get_phn(): patient.get_name() for patient in \
+                controller.list_patients()}
+    notes = {}
+    for phn in range(1, SHARED_PATIENTS + 1):
+        controller.set_current_patient(phn)
+        notes[phn] = sorted(note.get_index() for note in \
+                            controller.list_notes())
+    controller.unset_current_patient()
+    return patients, notes
+
+def run(threads, operations, configuration = "journal"):
+    if configuration not in CONFIGURATIONS:
+        raise ValueError(f"Error: configuration must be one of {tuple(CONFIGURATIONS)}")
+    options = CONFIGURATIONS[configuration]
+    directory = make_scratch()
+    try:
+        controller = Controller(autosave=True, concurrent=True, **options)
+        controller.login("stress", PASSWORD)
+        for phn in range(1, SHARED_PATIENTS + 1):
+            controller.create_patient(phn, f"Shared {phn}", "1990-01-01", \
+                                      "250", "s@clinic.ca", "2 Main St")
+        expected = {phn: f"Shared {phn}" for phn in \
+                    range(1, SHARED_PATIENTS + 1)}
+        created = {phn: 0 for phn in range(1, SHARED_PATIENTS + 1)}
+        created_lock = threading.Lock()
+        # Readers run a fixed number of queries too: spinning until the
+        # others finish would mostly measure contention for the GIL
+        start = time.perf_counter()
+        run_threads([lambda number=number: writer(controller, number, \
+                     operations, expected) for number in range(threads)] \
+                    + [lambda number=number: note_taker(controller, number, \
+                       operations, created, created_lock) for number in \
+                       range(threads)] \
+                    + [lambda number=number: reader(controller, number, \
+                       operations) for number in range(threads)])
+        elapsed = time.perf_counter() - start
+        # The registry holds exactly what the writers expect
+        patients, notes = snapshot(controller)
+        assert patients == expected, "registry does not match the writers"
+        for phn in range(1, SHARED_PATIENTS + 1):
+            assert len(notes[phn]) == created[phn], f"note count for {phn}: {len(notes[phn])} != {created[phn]}"
+            assert len(notes[phn]) == len(set(notes[phn])), f"reused index {phn}"
+        # Everything written to disk reads back the same
+        controller.shutdown()
+        controller.logout()
+        fresh = Controller(autosave=True, concurrent=True, **options)
+        fresh.login("stress", PASSWORD)
+        assert snapshot(fresh) == (patients, notes), "disk does not match memory"
+        print(f"{configuration}: {threads * 2} writers, {threads} readers, "
+              f"{operations} operations each: passed in {elapsed:.2f}s "
+              f"({len(patients)} patients, "
+              f"{sum(len(indexes) for indexes in notes.values())} notes)")
+    finally:
+        os.chdir(os.path.dirname(directory))
+        shutil.rmtree(directory)
+
+# ==============================================================================
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    for configuration in sys.argv[3:] or list(CONFIGURATIONS):
+        run(threads, operations, configuration)
+
+if __name__ == "__main__":
+    main()
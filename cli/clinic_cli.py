@@ -6,8 +6,11 @@ from getpass import getpass
 
 class ClinicCLI():
 
-	def __init__(self):
-		self.controller = Controller(autosave=True)
+	def __init__(self, controller=None):
+		# A 'ClinicClient' may stand in, to use a running clinic server
+		if controller is None:
+			controller = Controller(autosave=True)
+		self.controller = controller
 		self.main_menu_cli = MainMenuCLI(self.controller)
 		self.login_menu()
 
@@ -14,6 +14,44 @@ Controller handles the user login logic, as well as tracking the currently
 selected patient (if one exists). 
 
 Controller contains a PatientDAOJSON, which in turn contains patient objects.
+Alternatively, passing backend="sqlite" stores patients and notes in an SQLite
+database through a PatientDAOSQLite instead. Either way the patients are only
+loaded (and the backend's modules imported) on the first login or first use
+of 'patient_dao', so a user is shown the login prompt straight away. With
+snapshot=True (JSON backend), 'shutdown' saves a binary snapshot that the next
+start loads instead of 'patients.json', if that is unchanged (see
+'dao/patient_snapshot.py').
+
+With write_behind=True, patient and note changes are written to disk by a
+background thread (see 'dao/write_behind.py'); 'flush' forces them out, and
+logging out flushes as well.
+
+With columnar=True (JSON backend, NumPy required), cohort reports such as
+'count_cohort' and 'age_bands' run over a columnar copy of the registry (see
+'dao/patient_columns.py').
+
+Results of 'retrieve_patients', 'list_patients', 'retrieve_notes' and
+'list_notes' are kept in a bounded query cache (see 'dao/query_cache.py').
+Each change through 'Controller' drops just the cached results it could have
+affected; 'query_cache_stats' reports hits and misses for tuning. Changes made
+straight through a DAO bypass the cache, so call 'query_cache.clear' after.
+
+With concurrent=True, one Controller can serve several threads (for example,
+one per workstation). Searches share a reader/writer lock while patient
+changes take it exclusively, and note changes also lock just the patient
+being edited, so different patients' notes can be edited in parallel (see
+'dao/rw_lock.py'). Each thread then has its own current patient. Generators
+from 'iter_patients' and 'iter_notes' are not covered by the locks.
+
+Several users can share one Controller (and so one copy of the patients,
+notes and caches) through sessions: 'open_session' logs a user in and returns
+a Session holding their own current patient (see 'session.py'), and every
+user story accepts it as 'session='. Without one, the controller's default
+session is used, so 'login' and 'logout' work as they always have.
+
+Each user story is timed (and its file I/O counted) when metrics are enabled
+(see 'metrics.py') or slow stories are being logged (see 'slow_log.py');
+otherwise the instrumentation costs next to nothing.
 
 Note that the method 'get_password_hash' is borrowed from Lab 9.
 
@@ -28,18 +66,58 @@ from clinic.exception.illegal_operation_exception import IllegalOperationExcepti
 from clinic.exception.no_current_patient_exception import NoCurrentPatientException
 
 # IMPORTS:
-from clinic.dao.patient_dao_json import PatientDAOJSON
+from clinic.dao.note_cache import NoteCache
+from clinic.dao.query_cache import QueryCache
+from clinic.dao.write_behind import WriteBehind
+from clinic.dao.rw_lock import ReadWriteLock, KeyedLocks, NullLock
 from clinic.patient import Patient
-import unittest
+from clinic.session import Session
+from clinic.metrics import instrument
 import hashlib
+import threading
+from contextlib import contextmanager
 
 class Controller:
-    def __init__(self, autosave = False):
+    def __init__(self, autosave = False, journal = False, \
+                 fsync_policy = "checkpoint", note_cache_size = 256, \
+                 backend = "json", write_behind = False, flush_interval = 1.0,\
+                 flush_threshold = 100, columnar = False, \
+                 query_cache_size = 256, concurrent = False, \
+                 snapshot = False):
+        # Locks for serving several threads, or stand-ins that do nothing
+        if concurrent is True:
+            self.lock = ReadWriteLock()
+            self.patient_locks = KeyedLocks()
+        else:
+            self.lock = NullLock()
+            self.patient_locks = NullLock()
         # Standard controller initialization
         self.autosave = autosave
-        self.logged_in = False
-        self.current_patient = None
-        self.patient_dao = PatientDAOJSON(self.autosave)
+        # The default session, plus any opened with 'open_session'
+        self.session = Session(per_thread=concurrent is True)
+        self.sessions = {}                  # session_id -> Session
+        self.sessions_lock = threading.Lock()
+        # Hand disk writes over to a background flusher if requested. Both
+        # it and the note cache belong to this controller alone
+        self.flusher = None
+        if self.autosave is True and write_behind is True:
+            self.flusher = WriteBehind(flush_interval, flush_threshold)
+        # Bound how many patients' notes are held in memory at once
+        self.note_cache = NoteCache(note_cache_size, self.flusher)
+        # Remembers recent query results until a change affects them
+        self.query_cache = QueryCache(query_cache_size)
+        # Pick the storage backend for patients and their notes. It is only
+        # loaded on first use (see 'patient_dao'), so startup stays quick
+        if backend == "sqlite" and columnar is True:
+            raise ValueError("Error: the columnar table needs the 'json' backend")
+        elif backend == "sqlite" and snapshot is True:
+            raise ValueError("Error: snapshots need the 'json' backend")
+        elif backend not in ("json", "sqlite"):
+            raise ValueError("Error: backend must be 'json' or 'sqlite'")
+        self.backend = backend
+        self.dao_options = (journal, fsync_policy, columnar, snapshot)
+        self._patient_dao = None
+        self.dao_lock = threading.Lock()
         # Persistence handling for controller
         if self.autosave is False:
             # Placeholder users hardcoded in for testing
@@ -65,20 +143,102 @@ class Controller:
         except:
             return False
 
-    # Confirm whether or not the controller is logged in
-    def is_logged(self):
-        if self.logged_in is False:
+    # Login status and selected patient of the default session
+    @property
+    def logged_in(self):
+        return self.session.logged_in
+
+    @logged_in.setter
+    def logged_in(self, logged_in):
+        self.session.logged_in = logged_in
+
+    @property
+    def current_patient(self):
+        return self.session.current_patient
+
+    @current_patient.setter
+    def current_patient(self, patient):
+        self.session.current_patient = patient
+
+    # The patients, loaded when first needed (normally by a login)
+    @property
+    def patient_dao(self):
+        if self._patient_dao is None:
+            with self.dao_lock:
+                if self._patient_dao is None:
+                    self._patient_dao = self._load_patient_dao()
+        return self._patient_dao
+
+    # Helper method- builds the chosen backend. Its modules are imported
+    # here too, keeping them out of the start up path
+    def _load_patient_dao(self):
+        journal, fsync_policy, columnar, snapshot = self.dao_options
+        if self.backend == "sqlite":
+            from clinic.dao.patient_dao_sqlite import PatientDAOSQLite
+            return PatientDAOSQLite(self.autosave)
+        from clinic.dao.patient_dao_json import PatientDAOJSON
+        return PatientDAOJSON(self.autosave, journal, fsync_policy, \
+                              columnar=columnar, snapshot=snapshot, \
+                              note_cache=self.note_cache, \
+                              flusher=self.flusher)
+
+    # Loads the patients now, rather than when they are first needed
+    @instrument("controller.load")
+    def load(self):
+        return self.patient_dao is not None
+
+    @instrument("controller.shutdown")
+    def shutdown(self):
+        """
+        Call on a clean exit, once no more changes will be made. Writes out
+        anything write-behind mode is holding and stops its flusher (any
+        later change is written straight away) and, if snapshots are
+        enabled, saves one for a quick restart. Returns True.
+        """
+        with self.lock.write():
+            self.flush()
+            if self._patient_dao is not None and self.backend == "json":
+                self._patient_dao.save_snapshot()
+            if self.flusher is not None:
+                self.flusher.close()
+        return True
+
+    # Helper method- holds the shared lock plus 'patient's own lock, for
+    # reading or changing their notes
+    @contextmanager
+    def _note_lock(self, patient):
+        with self.lock.read(), self.patient_locks.get(patient.get_phn()):
+            yield
+
+    # Confirm whether or not the session (by default, the controller's own)
+    # is logged in. Returns the session to act for
+    def is_logged(self, session = None):
+        if session is None:
+            session = self.session
+        if session.logged_in is False:
             raise IllegalAccessException("Error: not logged in")
+        return session
         
-    # Confirm whether an operation tries to modify the current patient
-    def is_current_patient(self, phn):
-        if self.current_patient is self.search_patient(phn):
-            raise IllegalOperationException("Error: cannot update 'current_patient'")
+    # Confirm whether an operation tries to modify a current patient, of
+    # this session or of any other open one
+    def is_current_patient(self, phn, session = None):
+        with self.sessions_lock:
+            sessions = [self.session, *self.sessions.values()]
+        if session is not None:
+            sessions.append(session)
+        for open_session in sessions:
+            # PHNs are compared, since some backends build fresh Patients
+            for patient in open_session.current_patients():
+                if patient.get_phn() == phn:
+                    raise IllegalOperationException("Error: cannot update 'current_patient'")
         
-    # Confirm the existance of the current patient
-    def check_current_exists(self):
-        if self.current_patient is None:
+    # Confirm the existance of the session's current patient, returning it
+    def check_current_exists(self, session = None):
+        if session is None:
+            session = self.session
+        if session.current_patient is None:
             raise NoCurrentPatientException("Error: no patient selected")
+        return session.current_patient
         
     # Generates a list of all registered users (when autosave is True)
     def load_users(self):
@@ -92,6 +252,51 @@ class Controller:
                 users[user[0]] = user[1]
         return users
     
+    # Writes out any changes still held back by write-behind mode
+    @instrument("controller.flush")
+    def flush(self):
+        if self.flusher is not None:
+            self.flusher.flush()
+        return True
+
+    # Returns the query cache's hit, miss and invalidation counters
+    def query_cache_stats(self):
+        return self.query_cache.stats()
+
+    # Returns the number of patients, or None if they are not loaded yet
+    def patient_count(self):
+        if self._patient_dao is None:
+            return None
+        return self._patient_dao.count_patients()
+
+    # Helper method- drops cached results a patient change could affect.
+    # 'phns' and 'names' hold the changed patients' PHNs and names (old and
+    # new); name searches are only stale if they match one of those names
+    def _patients_changed(self, phns, names):
+        def affected(key):
+            if key[0] == "list_patients":
+                return True
+            elif key[0] == "retrieve_patients":
+                return key[3] in phns or any(key[1] in name for name in names)
+            # The notes of a removed or renumbered patient
+            return key[1] in phns
+        self.query_cache.invalidate(affected)
+
+    # Helper method- drops cached results a change to 'patient's notes
+    # could affect. 'texts' holds the changed notes' old and new text
+    def _notes_changed(self, patient, texts):
+        phn = patient.get_phn()
+        def affected(key):
+            if key[0] == "list_notes":
+                return key[1] == phn
+            # Ranked results depend on every note (through the BM25 scores)
+            elif key[0] == "retrieve_notes":
+                return key[1] == phn and (key[3] is True or \
+                       any(key[2] in text for text in texts))
+            return False
+        self.query_cache.invalidate(affected)
+        self.patient_dao.notes_changed(patient)
+
     # Decodes a user password: ** Borrowed from Lab 9 **
     def get_password_hash(self, password):
         encoded_password = password.encode('utf-8')     # Convert the password to bytes
@@ -102,6 +307,7 @@ class Controller:
 # ==============================================================================       
     
     # USER STORY 1
+    @instrument("controller.login")
     def login(self, username, password):
         """
         Accepts 'username' and 'password' strings as input. Outputs True if
@@ -112,139 +318,320 @@ class Controller:
         # Reject login if already logged in
         if self.logged_in == True:
             raise DuplicateLoginException("Error: already logged in.")
+        # Confirm the validity of the login attempt
+        elif self.check_login(username, password):
+            print("Logging in.")
+            # Load the patients now, rather than on the first search
+            self.load()
+            self.logged_in = True
+            self.session.username = username
+            return True
+        # Reject invalid user logins
+        raise InvalidLoginException("Error: invalid login information.") 
+
+    # Helper method- returns True if 'password' is 'username's password
+    def check_login(self, username, password):
         # Verify the existance of the username
-        elif self.users.get(username):
+        if self.users.get(username):
             # Get the stored password of 'username', compare to 'password'
             stored_password = self.users.get(username)
             # If autosave is True, then hash 'password' before comparison
             if self.autosave == True:
                 password = self.get_password_hash(password)
-            # Confirm the validity of the login attempt
-            if password == stored_password:
-                print("Logging in.")
-                self.logged_in = True
-                return True
-        # Reject invalid user logins
-        raise InvalidLoginException("Error: invalid login information.") 
+            return password == stored_password
+        return False
+
+    @instrument("controller.open_session")
+    def open_session(self, username, password):
+        """
+        Accepts 'username' and 'password' strings as input. Returns a new,
+        logged in Session for that user, which shares this controller's
+        patients and notes but has its own current patient. Raises an
+        InvalidLoginException if the login information is wrong.
+        """
+        if not self.check_login(username, password):
+            raise InvalidLoginException("Error: invalid login information.")
+        # Load the patients now, rather than on the first search
+        self.load()
+        session = Session(username)
+        with self.sessions_lock:
+            self.sessions[session.session_id] = session
+        return session
+
+    # Returns the open session with this 'session_id', or None
+    def get_session(self, session_id):
+        with self.sessions_lock:
+            return self.sessions.get(session_id)
+
+    @instrument("controller.close_session")
+    def close_session(self, session):
+        """
+        Accepts 'session', one returned by 'open_session', and logs it out.
+        Returns True, or raises an InvalidLogoutException if it was not open.
+        """
+        with self.sessions_lock:
+            closed = self.sessions.pop(session.session_id, None)
+        if closed is None:
+            raise InvalidLogoutException("Error: not logged in, cannot log out")
+        session.forget_patients()
+        session.logged_in = False
+        return True
     
     # USER STORY 2
-    def logout(self):
+    @instrument("controller.logout")
+    def logout(self, session = None):
         """
         No input required. Outputs True if the user was logged in, then logs
-        them out. Else, outputs False.
+        them out. Else, outputs False. Given a 'session', closes just that
+        session instead.
         """
+        if session is not None and session is not self.session:
+            return self.close_session(session)
         # Reject logout request from a logged out user
         if not self.logged_in == True:
             raise InvalidLogoutException("Error: not logged in, cannot log out")
         # Otherwise, log the user out
         print("Logging out.")
+        self.flush()
+        self.query_cache.clear()
         self.unset_current_patient()
+        self.session.forget_patients()
         self.logged_in = False
+        self.session.username = None
         return True
     
     # USER STORY 3
-    def search_patient(self, phn):
-        self.is_logged()
+    @instrument("controller.search_patient")
+    def search_patient(self, phn, session = None):
+        self.is_logged(session)
         if int(phn) != phn:
             raise IllegalOperationException("Error: PHNs must be integers")        
-        return self.patient_dao.search_patient(phn)
+        with self.lock.read():
+            return self.patient_dao.search_patient(phn)
 
     # USER STORY 4
-    def create_patient(self, phn, name, birth_date, phone, email, address):
-        self.is_logged()
+    @instrument("controller.create_patient")
+    def create_patient(self, phn, name, birth_date, phone, email, address, \
+                       session = None):
+        self.is_logged(session)
         if int(phn) != phn:
             raise IllegalOperationException("Error: PHNs must be integers")        
-        return self.patient_dao.create_patient(phn, name, birth_date, phone,\
-                                               email, address)
+        with self.lock.write():
+            patient = self.patient_dao.create_patient(phn, name, birth_date, \
+                                                      phone, email, address)
+            self._patients_changed({phn}, {name})
+            return patient
     
     # USER STORY 5
-    def retrieve_patients(self, name):
-        self.is_logged()
-        return self.patient_dao.retrieve_patients(name)
+    @instrument("controller.retrieve_patients")
+    def retrieve_patients(self, name, limit = None, cursor = None, \
+                          session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.query_cache.fetch(("retrieve_patients", name, limit, \
+                                           cursor), lambda: self.patient_dao.\
+                                          retrieve_patients(name, limit, \
+                                                            cursor))
     
+    # Typo-tolerant, sound-alike name search, best matches first
+    @instrument("controller.retrieve_patients_fuzzy")
+    def retrieve_patients_fuzzy(self, name, limit = 20, session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.retrieve_patients_fuzzy(name, limit)
+
+    # Reception lookups by phone number, email address, or birth date
+    @instrument("controller.retrieve_patients_by_phone")
+    def retrieve_patients_by_phone(self, phone, limit = None, session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.retrieve_patients_by_phone(phone, limit)
+
+    @instrument("controller.retrieve_patients_by_email")
+    def retrieve_patients_by_email(self, email, limit = None, session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.retrieve_patients_by_email(email, limit)
+
+    @instrument("controller.retrieve_patients_by_birth_date")
+    def retrieve_patients_by_birth_date(self, start, end = None, limit = None, \
+                                        session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.retrieve_patients_by_birth_date(start, \
+                                                                    end, limit)
+
     # USER STORY 6
+    @instrument("controller.update_patient")
     def update_patient(self, old_phn, phn, name, birth_date, phone, email,\
-                       address):
-        self.is_logged()
+                       address, session = None):
+        self.is_logged(session)
         if int(phn) != phn or int(old_phn) != old_phn:
             raise IllegalOperationException("Error: PHNs must be integers")        
-        self.is_current_patient(old_phn)
-        return self.patient_dao.update_patient(old_phn, phn, name, birth_date,\
-                                               phone, email, address)
+        with self.lock.write():
+            # Checked under the write lock, so that no session can select
+            # the patient between the check and the change
+            self.is_current_patient(old_phn, session)
+            old_patient = self.patient_dao.search_patient(old_phn)
+            old_name = None if old_patient is None else old_patient.get_name()
+            updated = self.patient_dao.update_patient(old_phn, phn, name, \
+                                                      birth_date, phone, \
+                                                      email, address)
+            self._patients_changed({old_phn, phn}, {old_name, name} - {None})
+            return updated
 
     # USER STORY 7
-    def delete_patient(self, phn):
-        self.is_logged()
-        self.is_current_patient(phn)
-        return self.patient_dao.delete_patient(phn)
+    @instrument("controller.delete_patient")
+    def delete_patient(self, phn, session = None):
+        self.is_logged(session)
+        with self.lock.write():
+            self.is_current_patient(phn, session)
+            patient = self.patient_dao.search_patient(phn)
+            deleted = self.patient_dao.delete_patient(phn)
+            self._patients_changed({phn}, {patient.get_name()})
+            self.patient_locks.discard(phn)
+            return deleted
 
     # USER STORY 8
-    def list_patients(self):
-        self.is_logged()
-        return self.patient_dao.list_patients()
+    @instrument("controller.list_patients")
+    def list_patients(self, limit = None, cursor = None, session = None):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.query_cache.fetch(("list_patients", limit, cursor), \
+                                          lambda: self.patient_dao.\
+                                          list_patients(limit, cursor))
+
+    # Generator version of 'list_patients', for walking large registries
+    def iter_patients(self, cursor = None, session = None):
+        self.is_logged(session)
+        return self.patient_dao.iter_patients(cursor)
     
-    def get_current_patient(self):
-        self.is_logged()
-        return self.current_patient
+    # Cohort reports over the columnar table. Filters are the keyword
+    # arguments of 'PatientColumns.mask', e.g. born_before="1960-01-01"
+    @instrument("controller.count_cohort")
+    def count_cohort(self, session = None, **filters):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.get_columns().count(**filters)
+
+    @instrument("controller.retrieve_cohort")
+    def retrieve_cohort(self, session = None, **filters):
+        self.is_logged(session)
+        with self.lock.read():
+            return [self.patient_dao.search_patient(phn) for phn in \
+                    self.patient_dao.get_columns().cohort(**filters)]
+
+    @instrument("controller.birth_year_histogram")
+    def birth_year_histogram(self, session = None, **filters):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.get_columns().\
+                   birth_year_histogram(**filters)
+
+    @instrument("controller.age_bands")
+    def age_bands(self, width = 10, on = None, session = None, **filters):
+        self.is_logged(session)
+        with self.lock.read():
+            return self.patient_dao.get_columns().age_bands(width, on, \
+                                                            **filters)
+
+    @instrument("controller.get_current_patient")
+    def get_current_patient(self, session = None):
+        return self.is_logged(session).current_patient
     
     # USER STORY 9
-    def set_current_patient(self, phn):
-        self.is_logged()
+    @instrument("controller.set_current_patient")
+    def set_current_patient(self, phn, session = None):
+        session = self.is_logged(session)
         if int(phn) != phn:
             raise IllegalOperationException("Error: PHNs must be integers")        
-        if self.patient_dao.patient_data.get(phn, None) is None:
-            raise IllegalOperationException("Error: specified patient does not exist")
-        else:
-            self.current_patient = self.patient_dao.search_patient(phn)
-            return self.current_patient
+        with self.lock.read():
+            patient = self.patient_dao.search_patient(phn)
+            if patient is None:
+                raise IllegalOperationException("Error: specified patient does not exist")
+            session.current_patient = patient
+            # Notes are loaded lazily: fetch them now, ahead of the appointment
+            with self.patient_locks.get(phn):
+                patient.record.load()
+            return patient
     
-    def unset_current_patient(self):
-        self.is_logged()
-        self.current_patient = None
+    @instrument("controller.unset_current_patient")
+    def unset_current_patient(self, session = None):
+        self.is_logged(session).current_patient = None
         return True
     
     # USER STORY 10
-    def create_note(self, text):
-        self.is_logged()
-        self.check_current_exists()
-        return self.current_patient.record.create_note(text)
+    @instrument("controller.create_note")
+    def create_note(self, text, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
+        with self._note_lock(patient):
+            note = patient.record.create_note(text)
+            self._notes_changed(patient, {text})
+            return note
 
     # USER STORY 11
-    def retrieve_notes(self, text):
-        self.is_logged()
-        self.check_current_exists()
-        return self.current_patient.record.retrieve_notes(text)
+    @instrument("controller.retrieve_notes")
+    def retrieve_notes(self, text, ranked = False, limit = None, cursor = None,\
+                       session = None):
+        patient = self.check_current_exists(self.is_logged(session))
+        record = patient.record
+        phn = patient.get_phn()
+        with self._note_lock(patient):
+            return self.query_cache.fetch(("retrieve_notes", phn, text, \
+                                           ranked, limit, cursor), lambda: \
+                                          record.retrieve_notes(text, ranked, \
+                                                                limit, cursor))
     
-    def search_note(self, note_index):
-        self.is_logged()
-        self.check_current_exists()
+    @instrument("controller.search_note")
+    def search_note(self, note_index, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
         if int(note_index) != note_index:
             raise IllegalOperationException("Error: note indexes must be integers")          
-        return self.current_patient.record.search_note(note_index)
+        with self._note_lock(patient):
+            return patient.record.search_note(note_index)
         
     # USER STORY 12
-    def update_note(self, note_index, text):
-        self.is_logged()
-        self.check_current_exists()
+    @instrument("controller.update_note")
+    def update_note(self, note_index, text, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
         if int(note_index) != note_index:
             raise IllegalOperationException("Error: note indexes must be integers")        
-        return self.current_patient.record.update_note(note_index, text)
+        with self._note_lock(patient):
+            note = patient.record.search_note(note_index)
+            old_text = "" if note is None else note.get_text()
+            updated = patient.record.update_note(note_index, text)
+            if updated:
+                self._notes_changed(patient, {old_text, text})
+            return updated
     
     # USER STORY 13
-    def delete_note(self, note_index):
-        self.is_logged()
-        self.check_current_exists()
+    @instrument("controller.delete_note")
+    def delete_note(self, note_index, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
         if int(note_index) != note_index:
             raise IllegalOperationException("Error: note indexes must be integers")        
-        patient = self.get_current_patient()
-        return self.current_patient.record.delete_note(note_index)
+        with self._note_lock(patient):
+            note = patient.record.search_note(note_index)
+            deleted = patient.record.delete_note(note_index)
+            if deleted:
+                self._notes_changed(patient, {note.get_text()})
+            return deleted
     
     # USER STORY 14
-    def list_notes(self):
-        self.is_logged()
-        self.check_current_exists()
-        patient = self.get_current_patient()
-        return self.current_patient.record.list_notes()    
+    @instrument("controller.list_notes")
+    def list_notes(self, limit = None, cursor = None, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
+        record = patient.record
+        phn = patient.get_phn()
+        with self._note_lock(patient):
+            return self.query_cache.fetch(("list_notes", phn, limit, \
+                                           cursor), lambda: record.\
+                                          list_notes(limit, cursor))
+
+    # Generator version of 'list_notes', for walking long records
+    def iter_notes(self, cursor = None, session = None):
+        patient = self.check_current_exists(self.is_logged(session))
+        return patient.record.iter_notes(cursor)
 
 # ==============================================================================
 
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'field_index.py':
+
+Exact-match indexes used by 'PatientDAOJSON' for reception lookups ("who has
+this phone number / email", "who was born on this date") so that they do not
+need to scan every patient.
+
+'ExactIndex' is a hash index from a normalized key to the set of PHNs holding
+it. Phone numbers are normalized to their digits alone, so '250-555-0100' and
+'(250) 555 0100' are the same key, and email addresses are compared without
+surrounding whitespace or case. The same normalizers are used to fill the
+matching key columns of the SQLite backend.
+
+'SortedIndex' keeps the same hash of key -> PHNs, plus a sorted list of the
+distinct keys, so that ranges (such as birth dates in 'YYYY-MM-DD' form) can
+be answered with a binary search. Birth dates repeat a great deal, so the
+sorted list stays short even for very large registries.
+
+============================================================================ """
+
+# IMPORTS:
+from bisect import bisect_left, bisect_right, insort
+
+# Returns only the digits of a phone number
+def normalize_phone(phone):
+    return "".join(character for character in str(phone) \
+                   if character.isdigit())
+
+# Returns an email address without surrounding whitespace, in lower case
+def normalize_email(email):
+    return str(email).strip().casefold()
+
+# Returns a birth date as a string key
+def normalize_date(birth_date):
+    return str(birth_date).strip()
+
+class ExactIndex:
+    def __init__(self, normalize):
+        self.normalize = normalize
+        self.postings = {}          # normalized key -> set of PHNs
+
+    def __str__(self):
+        return f"Keys: {len(self.postings)}"
+
+    # Helper method- indexes 'phn' under an already normalized key
+    def _add_key(self, phn, key):
+        phns = self.postings.get(key)
+        if phns is None:
+            self.postings[key] = {phn}
+            return True
+        phns.add(phn)
+        return False
+
+    # Helper method- unindexes 'phn' from an already normalized key
+    def _remove_key(self, phn, key):
+        phns = self.postings.get(key)
+        if phns is not None:
+            phns.discard(phn)
+            if not phns:
+                del self.postings[key]
+                return True
+        return False
+
+    # Indexes 'phn' under the normalized form of 'value'
+    def add(self, phn, value):
+        self._add_key(phn, self.normalize(value))
+
+    # Removes 'phn' from under 'value', the value it was indexed with
+    def remove(self, phn, value):
+        self._remove_key(phn, self.normalize(value))
+
+    # Returns the set of PHNs whose value normalizes to the same key
+    def lookup(self, value):
+        return self.postings.get(self.normalize(value), set())
+
+    # Empties the index
+    def clear(self):
+        self.postings.clear()
+
+class SortedIndex(ExactIndex):
+    def __init__(self, normalize):
+        super().__init__(normalize)
+        self.keys = []              # Distinct keys, in sorted order
+        self.keys_sorted = True     # False while a bulk load is unsorted
+
+    def __str__(self):
+        return f"Keys: {len(self.keys)}"
+
+    def add(self, phn, value):
+        key = self.normalize(value)
+        if self._add_key(phn, key):
+            # During a rebuild, sort once at the end rather than per key
+            if self.keys_sorted:
+                insort(self.keys, key)
+            else:
+                self.keys.append(key)
+
+    def remove(self, phn, value):
+        key = self.normalize(value)
+        if self._remove_key(phn, key):
+            self._sort()
+            del self.keys[bisect_left(self.keys, key)]
+
+    # Helper method- restores the sorted order after a bulk load
+    def _sort(self):
+        if not self.keys_sorted:
+            self.keys.sort()
+            self.keys_sorted = True
+
+    # Starts a bulk load: keys are appended, then sorted on first use
+    def begin_rebuild(self):
+        self.clear()
+        self.keys_sorted = False
+
+    def range(self, start, end):
+        """
+        Accepts the first and last keys wanted (either may be None, for an
+        open end). Returns a list of (key, set of PHNs) pairs for every key
+        in the range, in key order.
+        """
+        self._sort()
+        low = 0 if start is None else bisect_left(self.keys, \
+                                                  self.normalize(start))
+        high = len(self.keys) if end is None else bisect_right(self.keys, \
+                                                   self.normalize(end))
+        return [(key, self.postings[key]) for key in self.keys[low:high]]
+
+    def clear(self):
+        super().clear()
+        self.keys = []
+        self.keys_sorted = True
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'field_index.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'fuzzy_index.py':
+
+A typo-tolerant, phonetic index over patient names, used for fuzzy searches
+such as "Jon Smyth" finding "John Smith". Names are split into lower case
+words, and each distinct word is indexed two ways:
+
+    - by its Soundex code, so words that sound alike ("Smyth", "Smith") meet
+    - by SymSpell-style deletes: every string reachable by deleting up to
+      'max_distance' letters. Two words within that edit distance always
+      share a delete, so a query word only has to look up its own deletes
+      to find every close word, which is then confirmed with a real
+      (Damerau) edit distance.
+
+Only distinct words are expanded, and names reuse a small vocabulary, so the
+index grows with the number of distinct words rather than with patients.
+
+Each query word is scored against every patient word it reaches (1 for an
+exact match, less for each edit, a fixed score for a sound-alike), patients
+add up their best score per query word, and results come back best first.
+
+============================================================================ """
+
+# IMPORTS:
+import re
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+SOUNDEX_CODES = {letter: str(code) for code, letters in enumerate(["aeiouy",\
+                 "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for letter in \
+                 letters}
+PHONETIC_SCORE = 0.6
+
+# Splits a name into its lower case words
+def name_words(name):
+    return WORD_PATTERN.findall(name.casefold())
+
+# Returns the edit distance allowed for a word of this length
+def max_distance(word):
+    if len(word) <= 2:
+        return 0
+    elif len(word) <= 5:
+        return 1
+    return 2
+
+def soundex(word):
+    """
+    Accepts a lower case word, and returns its four character Soundex code
+    (a letter and three digits), or the word itself if it is not ASCII.
+    """
+    if not word.isascii():
+        return word
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0])
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        # 'h' and 'w' do not separate letters that share a code
+        if digit is None:
+            continue
+        if digit != previous and digit != "0":
+            code += digit
+            if len(code) == 4:
+                break
+        previous = digit
+    return code.ljust(4, "0")
+
+# Returns every string made by deleting up to 'distance' letters of 'word'
+def deletes(word, distance):
+    found = {word}
+    edge = {word}
+    for _ in range(distance):
+        edge = {shorter[:i] + shorter[i + 1:] for shorter in edge \
+                for i in range(len(shorter))} - found
+        found |= edge
+    return found
+
+def edit_distance(first, second, limit):
+    """
+    Returns the optimal string alignment distance between two words (the
+    Levenshtein distance, counting a swap of neighbours as one edit), or
+    'limit' + 1 as soon as it must exceed 'limit'.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, \
+                             previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and \
+               first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+class FuzzyNameIndex:
+    def __init__(self):
+        self.postings = {}          # word -> set of PHNs
+        self.phonetic = {}          # Soundex code -> set of words
+        self.deleted = {}           # delete string -> set of words
+
+    def __str__(self):
+        return f"Words: {len(self.postings)}, Deletes: {len(self.deleted)}"
+
+    def add(self, phn, name):
+        """
+        Accepts a patient's PHN and name as input, and indexes each word of
+        the name under that PHN.
+        """
+        for word in set(name_words(name)):
+            phns = self.postings.get(word)
+            if phns is not None:
+                phns.add(phn)
+                continue
+            # A new word: expand it once for every patient who shares it
+            self.postings[word] = {phn}
+            self.phonetic.setdefault(soundex(word), set()).add(word)
+            for variant in deletes(word, max_distance(word)):
+                self.deleted.setdefault(variant, set()).add(word)
+
+    def remove(self, phn, name):
+        """
+        Accepts a patient's PHN and the name they were indexed under, and
+        removes them. Words no patient uses any more are dropped entirely.
+        """
+        for word in set(name_words(name)):
+            phns = self.postings.get(word)
+            if phns is None:
+                continue
+            phns.discard(phn)
+            if phns:
+                continue
+            del self.postings[word]
+            self._discard(self.phonetic, soundex(word), word)
+            for variant in deletes(word, max_distance(word)):
+                self._discard(self.deleted, variant, word)
+
+    # Helper method- removes 'word' from a set-valued entry of 'table'
+    def _discard(self, table, key, word):
+        words = table.get(key)
+        if words is not None:
+            words.discard(word)
+            if not words:
+                del table[key]
+
+    def word_matches(self, query_word):
+        """
+        Accepts a lower case query word. Returns a dictionary of indexed word
+        -> score (at most 1) for every word close to it in spelling or sound.
+        """
+        scores = {}
+        limit = max_distance(query_word)
+        for variant in deletes(query_word, limit):
+            for word in self.deleted.get(variant, ()):
+                if word in scores:
+                    continue
+                # Both words must allow the distance found
+                allowed = min(limit, max_distance(word))
+                distance = edit_distance(query_word, word, allowed)
+                if distance <= allowed:
+                    scores[word] = 1 - distance / max(len(query_word), \
+                                                      len(word))
+        for word in self.phonetic.get(soundex(query_word), ()):
+            scores[word] = max(scores.get(word, 0), PHONETIC_SCORE)
+        return scores
+
+    def search(self, name):
+        """
+        Accepts 'name', a search string, as input. Returns a dictionary of
+        PHN -> score for every patient with a name word close to any word of
+        'name'; each query word adds the best score it reached.
+        """
+        totals = {}
+        for query_word in set(name_words(name)):
+            best = {}
+            for word, score in self.word_matches(query_word).items():
+                for phn in self.postings[word]:
+                    if score > best.get(phn, 0):
+                        best[phn] = score
+            for phn, score in best.items():
+                totals[phn] = totals.get(phn, 0) + score
+        return totals
+
+    # Empties the index
+    def clear(self):
+        self.postings.clear()
+        self.phonetic.clear()
+        self.deleted.clear()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'fuzzy_index.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'note_cache.py':
+
+A bounded, least-recently-used cache of loaded note stores. 'PatientRecord'
+no longer unpickles its notes when a patient is created or decoded; instead
+the 'NoteDAOPickle' is built the first time a note operation needs it, and the
+record registers itself here. Once more than 'capacity' stores are loaded, the
+idle ones are dropped and will simply be re-read from disk if touched again.
+
+Only persistent records are tracked: without autosave a record's notes exist
+nowhere but in memory, so they can never be evicted.
+
+Each 'Controller' has a cache of its own, sized by its note_cache_size, and
+the write-behind 'flusher' (or None) that the stores loaded through it hand
+their changes to. Records made without one share 'note_cache' below.
+
+The cache may be touched from several threads at once, so its bookkeeping is
+done under a lock; records are unloaded outside of it.
+
+============================================================================ """
+
+# IMPORTS:
+import threading
+from collections import OrderedDict
+
+class NoteCache:
+    def __init__(self, capacity = 256, flusher = None):
+        self.capacity = capacity
+        self.flusher = flusher              # For the stores loaded through it
+        self.records = OrderedDict()        # id(record) -> PatientRecord
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"Capacity: {self.capacity}, Loaded: {len(self.records)}"
+
+    def __len__(self):
+        return len(self.records)
+
+    def touch(self, record):
+        """
+        Accepts 'record', a PatientRecord whose notes were just used, and marks
+        it as the most recently used. Evicts idle records if over capacity.
+        """
+        key = id(record)
+        with self.lock:
+            if key in self.records:
+                self.records.move_to_end(key)
+                return
+            self.records[key] = record
+        self.evict()
+
+    # Removes 'record' from the cache without unloading it
+    def forget(self, record):
+        with self.lock:
+            self.records.pop(id(record), None)
+
+    # Helper method- unload the least recently used records until in bounds
+    def evict(self):
+        while True:
+            with self.lock:
+                if len(self.records) <= self.capacity:
+                    return
+                key, record = self.records.popitem(last=False)
+            record.unload()
+
+    # Changes the capacity, evicting straight away if it shrank
+    def resize(self, capacity):
+        self.capacity = capacity
+        self.evict()
+
+    # Unloads every cached record
+    def clear(self):
+        while True:
+            with self.lock:
+                if not self.records:
+                    return
+                key, record = self.records.popitem(last=False)
+            record.unload()
+
+# Shared by every 'PatientRecord' unless another cache is supplied
+note_cache = NoteCache()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'note_cache.py'")
+
+if __name__ == "__main__":
+    main()
@@ -13,30 +13,84 @@ main purpose is to store and manipulate a collection of note objects. That is,
 each 'Patient' object has a 'PatientRecord', and each record contains a 
 'NoteDAOPickle' to contain notes. 
 
-For the sake of simplicity, the class saves note information after each update. 
-This would not be optimal for a large, performance-intense system, but it
-works great here.
+Note information is saved after each update by appending a single record to
+the patient's note log (see 'note_log.py'), so a change never rewrites the
+whole record. Once enough of the log is made up of dead records (revised or
+deleted notes), it is compacted back down to one record per note. In
+write-behind mode (see 'write_behind.py') records are held in memory and
+appended by the background flusher instead.
+
+Searches go through a per-patient inverted index ('note_index.py'), kept up to
+date by every create, update, and delete and saved beside the .dat file.
 
 ============================================================================ """
 
 # IMPORTS:
 from clinic.dao.note_dao import *
+from clinic.dao.note_index import NoteIndex
+from clinic.dao.note_log import NoteLog
 from clinic.note import Note
+from itertools import dropwhile, islice
+from clinic.metrics import instrument
 import hashlib
 import pickle
+import threading
+
+# Re-save the search index once this many records had to be re-applied to it
+INDEX_REPLAY_LIMIT = 32
+
+# Returns the name of the note log of the patient with 'phn'
+def note_filename(phn):
+    return "clinic/records/" + str(phn) + ".dat"
 
 class NoteDAOPickle:
-    def __init__(self, phn, autosave = False):
+    def __init__(self, phn, autosave = False, compact_threshold = 64, \
+                 flusher = None):
         # Standard intialization of NoteDAOPickle
-        self.filename = "clinic/records/" + str(phn) + ".dat"
+        self.filename = note_filename(phn)
+        self.index_filename = "clinic/records/" + str(phn) + ".idx"
         self.autosave = autosave
         self.autocounter = 0        # Represents current note count
         self.position = 0           # Counts total notes created
         self.notes = {}
+        self.index = NoteIndex()
+        self.log = NoteLog(self.filename)
+        # Compact once at least this many dead records are in the log
+        self.compact_threshold = compact_threshold
+        # Records held back by write-behind mode. The lock keeps changes and
+        # the background flusher from interleaving
+        self.pending_records = []
+        self.lock = threading.RLock()
+        self.flusher = flusher              # None writes every change at once
+        # Set once the note cache drops this store. A caller still holding it
+        # then writes straight through, so a fresh load never misses a change
+        self.retired = False
         # When persistence is enabled, load patient note file
         if self.autosave is True:
             self.load_notes()
             
+    # Locks cannot be pickled, so a fresh one is made on unpickling. The
+    # flusher is handed back by whichever record restores the store
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        state.pop("flusher", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        self.flusher = None
+        self.retired = False
+        # Stores pickled before the log format lack its newer attributes
+        if "log" not in state:
+            self.index_filename = self.filename[:-len(".dat")] + ".idx"
+            self.index = NoteIndex()
+            self.log = NoteLog(self.filename)
+            self.compact_threshold = 64
+            self.pending_records = []
+            self._rebuild_index()
+
     def __str__(self):
         return f"Autosave: {self.autosave}, Autocounter: {self.autocounter}, Position: {self.position}, Notes: {self.notes}"
     
@@ -52,23 +106,151 @@ class NoteDAOPickle:
         except:
             return False
         
-    # Helper method: when persistence is enabled, saves the note dictionary   
+    # Helper method: when persistence is enabled, saves the note dictionary
+    # as a freshly compacted log
+    @instrument("note_dao.save_notes")
     def save_notes(self):
         if self.autosave is True:
-            with open(self.filename, "wb") as raw_notes:
-                pickle.dump(self.notes, raw_notes)
+            with self.lock:
+                # A compacted log already includes any held back records
+                self.pending_records = []
+                records = [("position", self.position)]
+                for note in self.notes.values():
+                    records.append(("create", note.get_index(), \
+                                    note.get_text(), note.get_stamp()))
+                self.log.rewrite(records)
+                self.save_index()
+
+    # Helper method: saves the search index, stamped with the log it covers
+    def save_index(self):
+        if self.autosave is True and self.log.is_appendable():
+            self.index.save(self.index_filename, (self.log.log_id, \
+                                                  self.log.size))
+
+    # Helper method: persists a single change by appending it to the log
+    def _log_change(self, record):
+        if self.autosave is not True:
+            return
+        # In write-behind mode, just remember the record for the flusher
+        flusher = self.flusher
+        if flusher is not None and self.retired is False:
+            self.pending_records.append(record)
+            flusher.mark_dirty(self)
+            return
+        self._write_records([record])
+
+    @instrument("note_dao.flush")
+    def flush(self):
+        """
+        Appends any records held back by write-behind mode to the log, in a
+        single write.
+        """
+        with self.lock:
+            records = self.pending_records
+            if not records or self.autosave is not True:
+                return
+            self.pending_records = []
+            try:
+                self._write_records(records)
+            except:
+                # Put the records back ahead of any newer ones, so they are
+                # written (in order) by the next flush
+                self.pending_records = records + self.pending_records
+                raise
+
+    # Helper method: appends records to the log, compacting if needed
+    def _write_records(self, records):
+        # Old pickled records are upgraded by writing them out as a log
+        if not self.log.is_appendable():
+            self.save_notes()
+            return
+        self.log.append(records, self.note_summary())
+        # Every record beyond one per note (and the position) is dead weight
+        dead_records = self.log.records - len(self.notes) - 1
+        if dead_records >= self.compact_threshold and \
+           dead_records > len(self.notes):
+            self.save_notes()
         
-    # Helper method: if some 'this_phn.dat' exists, unpickle it
-    def load_notes(self):
+    # Helper method: if some 'this_phn.dat' exists, fold its log into notes.
+    # With 'read_only', for copying the notes elsewhere, nothing is written:
+    # the log is not repaired and no search index is loaded or saved
+    @instrument("note_dao.load_notes")
+    def load_notes(self, read_only = False):
+        records = self.log.read(repair=not read_only)
+        if records is None:
+            # Records from before the log format hold a pickled dictionary
+            if self.log.legacy is True:
+                self._load_legacy()
+            if not read_only:
+                self._rebuild_index()
+            return
+        if read_only:
+            for offset, record in records:
+                self._apply_record(record)
+            self.autocounter = len(self.notes)
+            return
+        # A saved index can be reused if it covers a prefix of this log
+        fingerprint = self.index.load(self.index_filename)
+        covered = None
+        if fingerprint is not None and fingerprint[0] == self.log.log_id \
+           and fingerprint[1] <= self.log.size:
+            covered = fingerprint[1]
+        replayed = 0
+        for offset, record in records:
+            # Records the index has not seen yet are applied to it as well
+            update_index = covered is not None and offset >= covered
+            self._apply_record(record, update_index)
+            replayed += update_index
+        self.autocounter = len(self.notes)
+        if covered is None:
+            self._rebuild_index()
+            self.save_index()
+        elif replayed >= INDEX_REPLAY_LIMIT:
+            self.save_index()
+
+    # Helper method: unpickles a note dictionary in the original format
+    def _load_legacy(self):
         try:
             with open(self.filename, "rb") as pickled_notes:
                 self.notes = pickle.load(pickled_notes)
             # Set 'autocounter' and 'position' using the dictionary
             self.autocounter = len(self.notes)          # Note count
             self.position = next(reversed(self.notes))  # Final key
-        # If no .dat exists, use the pre-set values
         except:
             pass
+
+    # Helper method: re-applies one log record, optionally to the index too
+    def _apply_record(self, record, update_index = False):
+        operation = record[0]
+        if operation == "create":
+            operation, note_index, text, timestamp = record
+            note = Note(note_index, text)
+            note.timestamp = timestamp
+            self.notes[note_index] = note
+            self.position = max(self.position, note_index)
+            if update_index:
+                self.index.add(note_index, text)
+        elif operation == "revise":
+            operation, note_index, text, timestamp = record
+            note = self.notes.get(note_index)
+            if note is not None:
+                if update_index:
+                    self.index.remove(note_index, note.get_text())
+                    self.index.add(note_index, text)
+                note.text = text
+                note.timestamp = timestamp
+        elif operation == "delete":
+            note = self.notes.pop(record[1], None)
+            if update_index and note is not None:
+                self.index.remove(record[1], note.get_text())
+        elif operation == "position":
+            self.position = max(self.position, record[1])
+
+    # Helper method: re-indexes every note from scratch
+    def _rebuild_index(self):
+        self.index.clear()
+        for note_index, note in self.notes.items():
+            self.index.add(note_index, note.get_text())
     
     def create_note(self, text):
         """
@@ -76,27 +258,53 @@ class NoteDAOPickle:
         object, which is then appended to the 'notes' dictionary. Returns
         the resulting note.
         """
-        # Increment the note counters
-        self.autocounter += 1
-        self.position += 1           
-        # Create the note, save it if persistence is enabled, return it
-        self.notes[self.position] = Note(self.position, text)
-        self.save_notes()     
-        return self.notes[self.position]
+        with self.lock:
+            # Increment the note counters
+            self.autocounter += 1
+            self.position += 1           
+            # Create the note, save it if persistence is enabled, return it
+            note = Note(self.position, text)
+            self.notes[self.position] = note
+            self.index.add(self.position, text)
+            self._log_change(("create", self.position, text, \
+                              note.get_stamp()))
+        return note
     
-    def retrieve_notes(self, text):
+    def retrieve_notes(self, text, ranked = False, limit = None, cursor = None):
         """
         Accepts 'text', a string to search the existing notes for, as input. 
         Returns an empty list if no matches are found, or a populated list 
-        containing matching notes if one or more match is found.
+        containing matching notes if one or more match is found. Matches are
+        in note order, or by BM25 relevance if 'ranked' is True. Given a
+        'limit', returns at most that many, resuming after the note index in
+        'cursor' (the last note of the previous page).
         """
+        # Narrow the search down to the notes the index says could match
+        candidates = self.index.candidates(text)
+        if candidates is None:
+            candidates = self.notes
+        else:
+            candidates = sorted(candidates)
+        # Unranked pages are in note order, so they can skip ahead and stop
+        # early; ranked pages need every match to be scored first
+        if ranked is not True and cursor is not None:
+            candidates = [note for note in candidates if note > cursor]
         # Return all notes containing 'text'
         matching_notes = []
-        for note in self.notes:
+        for note in candidates:
             current_note = self.notes[note].get_text()
             # If there is a match, 'find' returns a positive integer
             if current_note.find(text) != (-1):
                 matching_notes.append(self.notes[note])
+                if ranked is not True and limit is not None and \
+                   len(matching_notes) >= limit:
+                    break
+        if ranked is True:
+            order = self.index.rank(text, [note.get_index() for note in \
+                                           matching_notes])
+            if cursor is not None and cursor in order:
+                order = order[order.index(cursor) + 1:]
+            matching_notes = [self.notes[note] for note in islice(order, limit)]
         return matching_notes
     
     # Returns a note if it's index is stored, else returns None
@@ -115,8 +323,13 @@ class NoteDAOPickle:
             return False
         # Otherwise, update the note
         else:
-            self.notes[note_index].revise_note(text)
-            self.save_notes()
+            with self.lock:
+                note = self.notes[note_index]
+                self.index.remove(note_index, note.get_text())
+                note.revise_note(text)
+                self.index.add(note_index, text)
+                self._log_change(("revise", note_index, text, \
+                                  note.get_stamp()))
             return True
     
     def delete_note(self, note_index):
@@ -131,20 +344,36 @@ class NoteDAOPickle:
             return False
         # Delete the note
         else:
-            self.autocounter -= 1            
-            del self.notes[note_index]
-            self.save_notes()
+            with self.lock:
+                self.autocounter -= 1            
+                self.index.remove(note_index, self.notes[note_index].get_text())
+                del self.notes[note_index]
+                self._log_change(("delete", note_index))
             return True
     
-    def list_notes(self):
+    # Returns (note count, latest note stamp), with 0 for no notes
+    def note_summary(self):
+        with self.lock:
+            return (len(self.notes), max((note.get_stamp() for note in \
+                                          self.notes.values()), default=0))
+
+    def list_notes(self, limit = None, cursor = None):
         """
         Creates, populates, and returns a list of all the notes associated
-        with a particular Patient.
+        with a particular Patient, newest first. Given a 'limit', returns at
+        most that many, starting after the note index in 'cursor'.
+        """
+        return list(islice(self.iter_notes(cursor), limit))
+
+    def iter_notes(self, cursor = None):
+        """
+        Yields the patient's notes newest first, without building a list. If
+        'cursor' (a note index) is given, starts just after that note.
         """
-        patient_note = []
-        for note in reversed(self.notes):
-            patient_note.append(self.notes[note])
-        return patient_note
+        notes = (self.notes[note] for note in reversed(self.notes))
+        if cursor is None:
+            return notes
+        return dropwhile(lambda note: note.get_index() >= cursor, notes)
 
 # ==============================================================================
 
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'note_dao_sqlite.py':
+
+The SQLite counterpart to 'NoteDAOPickle'. Each 'PatientDAOSQLite' patient
+gets one of these in their 'PatientRecord'; it reads and writes the patient's
+rows in the shared 'notes' table rather than holding a dictionary in memory,
+so creating or revising a note only ever writes that single note.
+
+Note numbering matches 'NoteDAOPickle': 'position' counts every note ever
+created for the patient (stored alongside the patient row), while
+'autocounter' is the number of notes that currently exist.
+
+Every DAO on a connection shares one 'transaction_lock', and every statement
+that writes takes it, so that one thread's explicit transaction never
+swallows another thread's changes (committing or rolling them back with its
+own).
+
+============================================================================ """
+
+# IMPORTS:
+import threading
+from datetime import datetime
+from clinic.dao.note_dao import NoteDAO
+from clinic.dao.sqlite_database import fts_phrase, TRIGRAM_LENGTH
+from clinic.note import Note
+from clinic.metrics import instrument
+
+class NoteDAOSQLite(NoteDAO):
+    def __init__(self, connection, phn, autosave = False, has_fts = False, \
+                 transaction_lock = None):
+        # Standard initialization of NoteDAOSQLite
+        self.connection = connection
+        if transaction_lock is None:
+            transaction_lock = threading.RLock()
+        self.transaction_lock = transaction_lock
+        self.phn = phn
+        self.autosave = autosave
+        self.has_fts = has_fts
+
+    def __str__(self):
+        return f"Autosave: {self.autosave}, Autocounter: {self.autocounter}, Position: {self.position}, Notes: {self.list_notes()}"
+
+    # Considers two note DAOs equal if they hold the same notes
+    def __eq__(self, other):
+        try:
+            if self.list_notes() == other.list_notes() and self.autocounter\
+               == other.autocounter and self.position == other.position:
+                return True
+            else:
+                return False
+        except:
+            return False
+
+    # Represents the current note count
+    @property
+    def autocounter(self):
+        return self.connection.execute("SELECT COUNT(*) FROM notes WHERE " \
+                                       "phn = ?", (self.phn,)).fetchone()[0]
+
+    # Counts the total notes created
+    @property
+    def position(self):
+        row = self.connection.execute("SELECT note_position FROM patients " \
+                                      "WHERE phn = ?", (self.phn,)).fetchone()
+        return row[0] if row else 0
+
+    # Helper method- rebuilds a Note, keeping its stored timestamp
+    def _make_note(self, row):
+        note_index, text, timestamp = row
+        note = Note(note_index, text)
+        note.timestamp = datetime.fromisoformat(timestamp)
+        return note
+
+    # Helper method- runs a note query and converts each row
+    def _query_notes(self, sql, parameters = ()):
+        rows = self.connection.execute(sql, parameters).fetchall()
+        return [self._make_note(row) for row in rows]
+
+    @instrument("note_dao_sqlite.create_note")
+    def create_note(self, text):
+        """
+        Accepts a text string as input. This text is used to create a Note
+        object, which is then stored in the database. Returns the resulting
+        note.
+        """
+        connection = self.connection
+        with self.transaction_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Claim the next note number, then store the note under it
+                connection.execute("UPDATE patients SET note_position = " \
+                                   "note_position + 1 WHERE phn = ?", \
+                                   (self.phn,))
+                position = self.position
+                note = Note(position, text)
+                connection.execute("INSERT INTO notes (phn, note_index, " \
+                                   "text, timestamp) VALUES (?, ?, ?, ?)", \
+                                   (self.phn, position, text, \
+                                    note.timestamp.isoformat()))
+                connection.execute("COMMIT")
+            except:
+                connection.execute("ROLLBACK")
+                raise
+        return note
+
+    def retrieve_notes(self, text, ranked = False, limit = None, cursor = None):
+        """
+        Accepts 'text', a string to search the existing notes for, as input.
+        Returns an empty list if no matches are found, or a populated list
+        containing matching notes if one or more match is found. Matches are
+        in note order, or by FTS5's BM25 relevance if 'ranked' is True. Given
+        a 'limit', returns at most that many, after the note in 'cursor'.
+        """
+        if self.has_fts and len(text) >= TRIGRAM_LENGTH and ranked is True:
+            # Relevance order has no key to resume from, so slice in python
+            notes = self._query_notes("SELECT n.note_index, n.text, " \
+                                      "n.timestamp FROM notes_fts f JOIN " \
+                                      "notes n ON n.id = f.rowid WHERE " \
+                                      "notes_fts MATCH ? AND n.phn = ? AND " \
+                                      "instr(n.text, ?) > 0 ORDER BY " \
+                                      "bm25(notes_fts), n.note_index", \
+                                      (fts_phrase(text), self.phn, text))
+            indexes = [note.get_index() for note in notes]
+            if cursor is not None and cursor in indexes:
+                notes = notes[indexes.index(cursor) + 1:]
+            return notes[:limit]
+        page = (-1 if cursor is None else cursor, -1 if limit is None else limit)
+        if self.has_fts and len(text) >= TRIGRAM_LENGTH:
+            # The trigram index is case-insensitive, so confirm with 'instr'
+            return self._query_notes("SELECT n.note_index, n.text, " \
+                                     "n.timestamp FROM notes_fts f JOIN " \
+                                     "notes n ON n.id = f.rowid WHERE " \
+                                     "notes_fts MATCH ? AND n.phn = ? AND " \
+                                     "instr(n.text, ?) > 0 AND n.note_index " \
+                                     "> ? ORDER BY n.note_index LIMIT ?", \
+                                     (fts_phrase(text), self.phn, text) + page)
+        return self._query_notes("SELECT note_index, text, timestamp FROM " \
+                                 "notes WHERE phn = ? AND instr(text, ?) > 0 "\
+                                 "AND note_index > ? ORDER BY note_index " \
+                                 "LIMIT ?", (self.phn, text) + page)
+
+    # Returns a note if it's index is stored, else returns None
+    def search_note(self, note_index):
+        notes = self._query_notes("SELECT note_index, text, timestamp FROM " \
+                                  "notes WHERE phn = ? AND note_index = ?", \
+                                  (self.phn, note_index))
+        return notes[0] if notes else None
+
+    @instrument("note_dao_sqlite.update_note")
+    def update_note(self, note_index, text):
+        """
+        Accepts 'note_index', a specific note position in the patient's
+        record, and 'text', a new string to replace the old one with, as
+        inputs. Outputs False if the note does not exist, else outputs True.
+        """
+        with self.transaction_lock:
+            cursor = self.connection.execute("UPDATE notes SET text = ?, " \
+                                             "timestamp = ? WHERE phn = ? " \
+                                             "AND note_index = ?", (text, \
+                                             datetime.now().isoformat(), \
+                                             self.phn, note_index))
+        if cursor.rowcount == 0:
+            print("Error: note does not exist")
+            return False
+        return True
+
+    @instrument("note_dao_sqlite.delete_note")
+    def delete_note(self, note_index):
+        """
+        Accepts 'note_index', a specific note position in the patient's
+        record, as input. Outputs False if the note does not exist, else
+        outputs True.
+        """
+        with self.transaction_lock:
+            cursor = self.connection.execute("DELETE FROM notes WHERE phn = " \
+                                             "? AND note_index = ?", \
+                                             (self.phn, note_index))
+        if cursor.rowcount == 0:
+            print("Error: note does not exist")
+            return False
+        return True
+
+    # Returns (note count, latest note stamp), with 0 for no notes
+    def note_summary(self):
+        count, latest = self.connection.execute("SELECT COUNT(*), MAX(" \
+                                                "timestamp) FROM notes WHERE "\
+                                                "phn = ?", (self.phn,)).fetchone()
+        if latest is None:
+            return (0, 0)
+        note = Note(0, "")
+        note.timestamp = datetime.fromisoformat(latest)
+        return (count, note.get_stamp())
+
+    def list_notes(self, limit = None, cursor = None):
+        """
+        Returns a list of all the notes associated with a particular Patient,
+        newest first. Given a 'limit', returns at most that many, starting
+        after the note index in 'cursor'.
+        """
+        return self._query_notes("SELECT note_index, text, timestamp FROM " \
+                                 "notes WHERE phn = ? AND note_index < ? " \
+                                 "ORDER BY note_index DESC LIMIT ?", \
+                                 (self.phn, self._upper_bound(cursor), \
+                                  -1 if limit is None else limit))
+
+    def iter_notes(self, cursor = None):
+        """
+        Yields the patient's notes newest first, reading rows from the
+        database as it goes. If 'cursor' is given, starts after that note.
+        """
+        rows = self.connection.execute("SELECT note_index, text, timestamp " \
+                                       "FROM notes WHERE phn = ? AND " \
+                                       "note_index < ? ORDER BY note_index " \
+                                       "DESC", (self.phn, \
+                                       self._upper_bound(cursor)))
+        for row in rows:
+            yield self._make_note(row)
+
+    # Helper method- the exclusive upper note index for a newest-first page
+    def _upper_bound(self, cursor):
+        if cursor is None:
+            return self.position + 1
+        return cursor
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'note_dao_sqlite.py'")
+
+if __name__ == "__main__":
+    main()
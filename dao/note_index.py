@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'note_index.py':
+
+A positional inverted index over one patient's notes, kept by 'NoteDAOPickle'
+so that 'retrieve_notes' does not need to scan every note. Note text is split
+into word tokens; each token maps to the notes containing it, along with the
+token's positions within each note.
+
+Searches keep the original substring semantics. Every word inside the search
+string must sit inside some word of a matching note, so the notes holding any
+indexed word that contains each search word are intersected to get candidates,
+and each candidate is then confirmed with 'find'. Search strings with no word
+characters at all cannot be narrowed down this way, and are scanned instead.
+
+Matches can optionally be ranked with BM25. The index is pickled next to the
+patient's .dat file (as .idx), stamped with the log id and offset of the .dat
+it describes, so only the records written since then need to be re-applied.
+
+============================================================================ """
+
+# IMPORTS:
+import math
+import pickle
+import re
+import time
+from clinic.metrics import instrument, record_io, record_serialization
+
+TOKEN_PATTERN = re.compile(r"\w+")
+INDEX_VERSION = 2
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Splits 'text' into its word tokens
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text)
+
+class NoteIndex:
+    def __init__(self):
+        self.postings = {}          # token -> {note_index: [positions]}
+        self.lengths = {}           # note_index -> token count
+
+    def __str__(self):
+        return f"Tokens: {len(self.postings)}, Notes: {len(self.lengths)}"
+
+    def add(self, note_index, text):
+        """
+        Accepts a note's index and text as input, and indexes every token of
+        the text along with its position.
+        """
+        tokens = tokenize(text)
+        self.lengths[note_index] = len(tokens)
+        for position, token in enumerate(tokens):
+            notes = self.postings.get(token)
+            if notes is None:
+                self.postings[token] = {note_index: [position]}
+            elif note_index in notes:
+                notes[note_index].append(position)
+            else:
+                notes[note_index] = [position]
+
+    def remove(self, note_index, text):
+        """
+        Accepts a note's index and the text it was indexed with, and removes
+        the note from the index.
+        """
+        self.lengths.pop(note_index, None)
+        for token in set(tokenize(text)):
+            notes = self.postings.get(token)
+            if notes is not None:
+                notes.pop(note_index, None)
+                if not notes:
+                    del self.postings[token]
+
+    # Helper method- every indexed token that contains 'fragment'
+    def _expand(self, fragment):
+        if fragment in self.postings:
+            expanded = [fragment]
+        else:
+            expanded = []
+        for token in self.postings:
+            if fragment in token and token != fragment:
+                expanded.append(token)
+        return expanded
+
+    def candidates(self, text):
+        """
+        Accepts 'text', a search string, as input. Returns the set of note
+        indexes that may contain 'text' (a superset of the real matches), or
+        None if 'text' has no words and so cannot be looked up.
+        """
+        fragments = set(tokenize(text))
+        if not fragments:
+            return None
+        matches = None
+        # Search the longest (usually rarest) fragments first
+        for fragment in sorted(fragments, key=len, reverse=True):
+            found = set()
+            for token in self._expand(fragment):
+                found.update(self.postings[token])
+            matches = found if matches is None else matches & found
+            if not matches:
+                return set()
+        return matches
+
+    def rank(self, text, note_indexes):
+        """
+        Accepts a search string and a collection of matching note indexes.
+        Returns the indexes ordered by BM25 score (best first), with ties
+        broken by note index.
+        """
+        note_count = len(self.lengths)
+        if note_count == 0:
+            return list(note_indexes)
+        average_length = sum(self.lengths.values()) / note_count or 1
+        scores = dict.fromkeys(note_indexes, 0.0)
+        for fragment in set(tokenize(text)):
+            # Term frequency counts every indexed word containing the fragment
+            frequencies = {}
+            for token in self._expand(fragment):
+                for note_index, positions in self.postings[token].items():
+                    frequencies[note_index] = frequencies.get(note_index, 0) \
+                                              + len(positions)
+            idf = math.log(1 + (note_count - len(frequencies) + 0.5) / \
+                           (len(frequencies) + 0.5))
+            for note_index in scores:
+                frequency = frequencies.get(note_index, 0)
+                if frequency:
+                    length = self.lengths.get(note_index, 0)
+                    scores[note_index] += idf * frequency * (BM25_K1 + 1) / \
+                        (frequency + BM25_K1 * (1 - BM25_B + BM25_B * \
+                         length / average_length))
+        return sorted(scores, key=lambda note_index: (-scores[note_index], \
+                                                      note_index))
+
+    # Empties the index
+    def clear(self):
+        self.postings.clear()
+        self.lengths.clear()
+
+    # Pickles the index to 'filename', stamped with 'fingerprint'
+    @instrument("note_index.save")
+    def save(self, filename, fingerprint):
+        started = time.perf_counter()
+        data = pickle.dumps((INDEX_VERSION, fingerprint, self.postings, \
+                             self.lengths), pickle.HIGHEST_PROTOCOL)
+        encoded = time.perf_counter()
+        record_serialization(encoded - started, len(data))
+        with open(filename, "wb") as raw_index:
+            raw_index.write(data)
+        record_io(bytes_written=len(data), file_opens=1, seconds=\
+                  time.perf_counter() - encoded)
+
+    @instrument("note_index.load")
+    def load(self, filename):
+        """
+        Loads a pickled index from 'filename'. Returns the fingerprint it was
+        saved with, or None if the file is missing, unreadable, or from
+        another index version (in which case nothing changes).
+        """
+        try:
+            started = time.perf_counter()
+            with open(filename, "rb") as raw_index:
+                data = raw_index.read()
+            read = time.perf_counter()
+            record_io(bytes_read=len(data), file_opens=1, seconds=read - \
+                      started)
+            version, fingerprint, postings, lengths = pickle.loads(data)
+            record_serialization(time.perf_counter() - read, len(data))
+        except Exception:
+            return None
+        if version != INDEX_VERSION:
+            return None
+        self.postings = postings
+        self.lengths = lengths
+        return fingerprint
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'note_index.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'note_log.py':
+
+The on-disk format for a patient's notes ('clinic/records/<phn>.dat'). Rather
+than pickling the whole note dictionary after every change, 'NoteDAOPickle'
+appends one framed record per operation:
+
+    ("create", note_index, text, stamp)
+    ("revise", note_index, text, stamp)
+    ("delete", note_index)
+    ("position", position)
+
+The file starts with a magic string, a random log id and a summary (the size
+of the file, the number of notes and the stamp of the latest one), and each
+record is a 4-byte length followed by the pickled tuple. The summary is
+rewritten in place after every append, so 'summary' can answer for a patient
+by reading a few bytes; one whose size disagrees with the file (an append cut
+short) is ignored, and the records are counted instead. Loading folds the
+records back into a dictionary. Compaction rewrites the file with one
+'create' per living note (plus a 'position' record, so note numbering
+survives) under a fresh log id; the id lets a saved search index tell which
+version of the log it covers.
+
+Files written before this format (a plain pickled dictionary) are detected and
+reported as legacy so they can still be read, then rewritten on first change.
+Logs from before the summary ('CLINOTE1') are read the same way, and are
+likewise rewritten with one on their first change.
+Stamps are microseconds since the epoch; older logs holding datetimes still
+load, since 'Note.timestamp' accepts either.
+
+============================================================================ """
+
+# IMPORTS:
+import os
+import pickle
+import struct
+import time
+from datetime import datetime
+from clinic.metrics import record_io, record_serialization
+
+MAGIC = b"CLINOTE2"
+OLD_MAGIC = b"CLINOTE1"                     # Logs without a summary
+LOG_ID_SIZE = 8
+FRAME = struct.Struct(">I")
+SUMMARY = struct.Struct(">QQQ")             # File size, notes, latest stamp
+SUMMARY_OFFSET = len(MAGIC) + LOG_ID_SIZE
+HEADER_SIZE = SUMMARY_OFFSET + SUMMARY.size
+
+# Returns a note stamp, converting the datetimes of older logs
+def as_stamp(value):
+    if isinstance(value, datetime):
+        return round(value.timestamp() * 1000000)
+    return value
+
+def summarize(records):
+    """
+    Accepts an iterable of log records, in the order written, and returns a
+    (note count, latest note stamp) tuple for the notes they leave, with 0
+    for no notes.
+    """
+    stamps = {}
+    for record in records:
+        if record[0] in ("create", "revise"):
+            if record[0] == "create" or record[1] in stamps:
+                stamps[record[1]] = as_stamp(record[3])
+        elif record[0] == "delete":
+            stamps.pop(record[1], None)
+    return (len(stamps), max(stamps.values(), default=0))
+
+class NoteLog:
+    def __init__(self, filename):
+        self.filename = filename
+        self.log_id = None          # Identifies the current compacted log
+        self.size = 0               # Bytes of complete records in the file
+        self.records = 0            # Number of records in the file
+        self.legacy = False         # True if the file is an old pickled dict
+        self.summarized = False     # True if the header holds a summary
+
+    def __str__(self):
+        return f"Log: {self.filename}, Records: {self.records}, " \
+               f"Size: {self.size}"
+
+    def read(self, repair = True):
+        """
+        Returns a list of (offset, record) tuples for every complete record
+        in the log, in the order written. Returns None if the file does not
+        exist or is in the legacy format. A torn final record is left out
+        and, if 'repair' is True, trimmed from the file.
+        """
+        self.legacy = False
+        started = time.perf_counter()
+        try:
+            with open(self.filename, "rb") as raw_log:
+                data = raw_log.read()
+        except FileNotFoundError:
+            self.log_id = None
+            self.size = 0
+            self.records = 0
+            return None
+        read = time.perf_counter()
+        record_io(bytes_read=len(data), file_opens=1, seconds=read - started)
+        header_size = self._header_size(data)
+        if header_size is None:
+            self.legacy = True
+            return None
+        self.log_id = data[len(MAGIC):len(MAGIC) + LOG_ID_SIZE]
+        self.summarized = header_size == HEADER_SIZE
+        records, offset = self._parse(data, header_size)
+        record_serialization(time.perf_counter() - read, offset)
+        # Remove any partial record so later appends stay framed correctly
+        if offset != len(data) and repair is True:
+            with open(self.filename, "r+b") as raw_log:
+                raw_log.truncate(offset)
+            record_io(file_opens=1)
+        self.size = offset
+        self.records = len(records)
+        return records
+
+    # Helper method- the size of the header 'data' starts with, or None if
+    # it is not a log at all
+    def _header_size(self, data):
+        if data.startswith(MAGIC) and len(data) >= HEADER_SIZE:
+            return HEADER_SIZE
+        if data.startswith(OLD_MAGIC) and len(data) >= SUMMARY_OFFSET:
+            return SUMMARY_OFFSET
+        return None
+
+    # Helper method- unframes the complete records after the header. Returns
+    # a list of (offset, record) tuples, and the offset where they stop
+    def _parse(self, data, offset):
+        records = []
+        while offset + FRAME.size <= len(data):
+            (length,) = FRAME.unpack_from(data, offset)
+            end = offset + FRAME.size + length
+            # A frame running past the end of the file was never finished
+            if end > len(data):
+                break
+            try:
+                records.append((offset, pickle.loads(data[offset + \
+                                                          FRAME.size:end])))
+            except Exception:
+                break
+            offset = end
+        return records, offset
+
+    def summary(self):
+        """
+        Returns a (note count, latest note stamp) tuple for the log on disk,
+        with 0 for no notes, without keeping or changing anything. Only the
+        header is read, unless it holds no summary that can be trusted.
+        """
+        started = time.perf_counter()
+        try:
+            with open(self.filename, "rb") as raw_log:
+                data = raw_log.read(HEADER_SIZE)
+                if data.startswith(MAGIC) and len(data) == HEADER_SIZE:
+                    size, count, latest = SUMMARY.unpack_from(data, \
+                                                              SUMMARY_OFFSET)
+                    if size == os.fstat(raw_log.fileno()).st_size:
+                        record_io(bytes_read=len(data), file_opens=1, \
+                                  seconds=time.perf_counter() - started)
+                        return (count, latest)
+                data += raw_log.read()
+        except FileNotFoundError:
+            return (0, 0)
+        record_io(bytes_read=len(data), file_opens=1, seconds=\
+                  time.perf_counter() - started)
+        header_size = self._header_size(data)
+        if header_size is not None:
+            return summarize(record for offset, record in \
+                             self._parse(data, header_size)[0])
+        # A legacy file holds the pickled note dictionary itself
+        try:
+            notes = pickle.loads(data)
+            return (len(notes), max((note.get_stamp() for note in \
+                                     notes.values()), default=0))
+        except Exception:
+            return (0, 0)
+
+    # Helper method- frames a single record
+    def _frame(self, record):
+        payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        return FRAME.pack(len(payload)) + payload
+
+    def append(self, records, summary):
+        """
+        Accepts a list of records and appends them to the log in one write,
+        then updates the header to 'summary', the (note count, latest note
+        stamp) tuple they leave. The log must already exist in the current
+        format.
+        """
+        started = time.perf_counter()
+        data = b"".join(self._frame(record) for record in records)
+        encoded = time.perf_counter()
+        record_serialization(encoded - started, len(data))
+        with open(self.filename, "r+b") as raw_log:
+            end = raw_log.seek(0, os.SEEK_END) + len(data)
+            raw_log.write(data)
+            # Written after the records, so it never covers missing ones
+            raw_log.seek(SUMMARY_OFFSET)
+            raw_log.write(SUMMARY.pack(end, *summary))
+        record_io(bytes_written=len(data) + SUMMARY.size, file_opens=1, \
+                  seconds=time.perf_counter() - encoded)
+        self.size += len(data)
+        self.records += len(records)
+
+    def rewrite(self, records):
+        """
+        Accepts a list of records and atomically replaces the whole log with
+        them, under a new log id. Used for compaction and format upgrades.
+        """
+        self.log_id = os.urandom(LOG_ID_SIZE)
+        started = time.perf_counter()
+        body = b"".join(self._frame(record) for record in records)
+        data = MAGIC + self.log_id + SUMMARY.pack(HEADER_SIZE + len(body), \
+                                                  *summarize(records)) + body
+        encoded = time.perf_counter()
+        record_serialization(encoded - started, len(data))
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, "wb") as raw_log:
+            raw_log.write(data)
+        os.replace(temp_filename, self.filename)
+        record_io(bytes_written=len(data), file_opens=1, seconds=\
+                  time.perf_counter() - encoded)
+        self.size = len(data)
+        self.records = len(records)
+        self.legacy = False
+        self.summarized = True
+
+    # Returns True if records can be appended to the file as it stands
+    def is_appendable(self):
+        return self.log_id is not None and self.legacy is False and \
+               self.summarized is True
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'note_log.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'patient_columns.py':
+
+An optional columnar mirror of 'PatientDAOJSON.patient_data', used for
+reporting. Each patient is one row across a handful of NumPy arrays (PHN,
+birth date as an ordinal plus its year and month/day, note count, and the
+timestamp of the latest note), so cohort filters and aggregations such as
+"born before 1960 with no notes in a year" or a birth-year histogram are
+evaluated as whole-array operations instead of a loop over 'Patient' objects.
+
+The table is built from the DAO on first use, and after that is refreshed
+row by row: the DAO reports every create, update, and delete, and 'Controller'
+reports note changes for the current patient. Deleted rows are recycled.
+
+Birth dates that are not valid 'YYYY-MM-DD' strings are stored as missing,
+and never match a birth date filter. Timestamps are microseconds since the
+epoch, as in 'Note'; a patient without notes has a latest note time of 0.
+
+NumPy is optional: everything else in the clinic works without it, and the
+table can only be switched on where it is installed.
+
+============================================================================ """
+
+# IMPORTS:
+from datetime import date, datetime
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MISSING = -1                    # Ordinal/year stored for unreadable dates
+INITIAL_CAPACITY = 1024
+
+# Returns True if NumPy is available
+def has_numpy():
+    return numpy is not None
+
+# Returns the date held by 'value' (a date, datetime or ISO string), or None
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+# Returns a datetime, date, ISO string or stamp as microseconds since epoch
+def to_stamp(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(parse_date(value), datetime.min.time())
+    return round(value.timestamp() * 1000000)
+
+class PatientColumns:
+    def __init__(self, capacity = INITIAL_CAPACITY):
+        if numpy is None:
+            raise ImportError("Error: the columnar patient table needs NumPy")
+        self.rows = {}              # PHN -> row number
+        self.free_rows = []         # Rows left behind by deleted patients
+        self.size = 0               # Rows in use, counting freed ones
+        self._allocate(capacity)
+
+    def __str__(self):
+        return f"Patients: {len(self.rows)}, Capacity: {len(self.phn)}"
+
+    # Helper method- (re)allocates every column, keeping rows in use
+    def _allocate(self, capacity):
+        old = getattr(self, "phn", None)
+        columns = {"phn": numpy.int64, "birth_ordinal": numpy.int32, \
+                   "birth_year": numpy.int16, "birth_monthday": numpy.int16, \
+                   "note_count": numpy.int32, "last_note": numpy.int64}
+        for name, dtype in columns.items():
+            column = numpy.zeros(capacity, dtype=dtype)
+            if old is not None:
+                column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        alive = numpy.zeros(capacity, dtype=bool)
+        if old is not None:
+            alive[:self.size] = self.alive[:self.size]
+        self.alive = alive
+
+    # Helper method- returns a row for 'phn', growing the columns if needed
+    def _row(self, phn):
+        row = self.rows.get(phn)
+        if row is not None:
+            return row
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == len(self.phn):
+                self._allocate(len(self.phn) * 2)
+            row = self.size
+            self.size += 1
+        self.rows[phn] = row
+        return row
+
+    def set_patient(self, phn, birth_date, note_count = 0, last_note = 0):
+        """
+        Accepts a patient's PHN and birth date, plus their note count and
+        latest note stamp, and stores them as the patient's row (adding one
+        if the patient is new).
+        """
+        row = self._row(phn)
+        self.phn[row] = phn
+        self.alive[row] = True
+        parsed = parse_date(birth_date)
+        if parsed is None:
+            self.birth_ordinal[row] = MISSING
+            self.birth_year[row] = MISSING
+            self.birth_monthday[row] = MISSING
+        else:
+            self.birth_ordinal[row] = parsed.toordinal()
+            self.birth_year[row] = parsed.year
+            self.birth_monthday[row] = parsed.month * 100 + parsed.day
+        self.note_count[row] = note_count
+        self.last_note[row] = last_note
+
+    def load(self, patients):
+        """
+        Accepts an iterable of (phn, birth_date, note_count, last_note)
+        tuples, and replaces the table's contents with them in one pass.
+        """
+        phns = []
+        birth_dates = []
+        note_counts = []
+        last_notes = []
+        for phn, birth_date, note_count, last_note in patients:
+            phns.append(phn)
+            birth_dates.append(parse_date(birth_date))
+            note_counts.append(note_count)
+            last_notes.append(last_note)
+        self.rows = {phn: row for row, phn in enumerate(phns)}
+        self.free_rows = []
+        # Nothing is kept from before, so allocate while the table is empty
+        self.size = 0
+        self._allocate(max(len(phns), INITIAL_CAPACITY))
+        self.size = len(phns)
+        self.phn[:self.size] = phns
+        self.alive[:self.size] = True
+        self.birth_ordinal[:self.size] = [MISSING if parsed is None else \
+                                          parsed.toordinal() for parsed in \
+                                          birth_dates]
+        self.birth_year[:self.size] = [MISSING if parsed is None else \
+                                       parsed.year for parsed in birth_dates]
+        self.birth_monthday[:self.size] = [MISSING if parsed is None else \
+                                           parsed.month * 100 + parsed.day \
+                                           for parsed in birth_dates]
+        self.note_count[:self.size] = note_counts
+        self.last_note[:self.size] = last_notes
+
+    # Updates just the note columns of an existing patient's row
+    def set_notes(self, phn, note_count, last_note):
+        row = self.rows.get(phn)
+        if row is not None:
+            self.note_count[row] = note_count
+            self.last_note[row] = last_note
+
+    # Removes a patient's row, leaving it free for the next new patient
+    def remove_patient(self, phn):
+        row = self.rows.pop(phn, None)
+        if row is not None:
+            self.alive[row] = False
+            self.free_rows.append(row)
+
+    def mask(self, born_before = None, born_after = None, min_notes = None, \
+             max_notes = None, no_notes_since = None):
+        """
+        Accepts any mix of filters, and returns a boolean array over the rows
+        in use, True for each living patient who passes all of them:
+            born_before / born_after - birth dates, exclusive
+            min_notes / max_notes    - note counts, inclusive
+            no_notes_since           - no note written on or after this time
+        """
+        size = self.size
+        mask = self.alive[:size].copy()
+        if born_before is not None or born_after is not None:
+            ordinals = self.birth_ordinal[:size]
+            mask &= ordinals != MISSING
+            if born_before is not None:
+                mask &= ordinals < parse_date(born_before).toordinal()
+            if born_after is not None:
+                mask &= ordinals > parse_date(born_after).toordinal()
+        if min_notes is not None:
+            mask &= self.note_count[:size] >= min_notes
+        if max_notes is not None:
+            mask &= self.note_count[:size] <= max_notes
+        if no_notes_since is not None:
+            mask &= self.last_note[:size] < to_stamp(no_notes_since)
+        return mask
+
+    # Returns the number of patients passing the filters
+    def count(self, **filters):
+        return int(numpy.count_nonzero(self.mask(**filters)))
+
+    # Returns the PHNs of the patients passing the filters, in PHN order
+    def cohort(self, **filters):
+        return numpy.sort(self.phn[:self.size][self.mask(**filters)]).tolist()
+
+    def birth_year_histogram(self, **filters):
+        """
+        Accepts the same filters as 'mask'. Returns a dictionary of birth
+        year -> number of matching patients, skipping unreadable dates.
+        """
+        years = self.birth_year[:self.size][self.mask(**filters)]
+        years = years[years != MISSING]
+        values, counts = numpy.unique(years, return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def age_bands(self, width = 10, on = None, **filters):
+        """
+        Accepts a band 'width' in years and the date ages are taken 'on'
+        (today by default), plus the same filters as 'mask'. Returns a
+        dictionary of band start (0, 10, 20, ...) -> number of patients.
+        """
+        on = date.today() if on is None else parse_date(on)
+        mask = self.mask(**filters) & (self.birth_year[:self.size] != MISSING)
+        years = self.birth_year[:self.size][mask].astype(numpy.int32)
+        monthdays = self.birth_monthday[:self.size][mask]
+        # Knock a year off anyone whose birthday is still to come
+        ages = on.year - years - (monthdays > on.month * 100 + on.day)
+        bands, counts = numpy.unique(ages // width * width, \
+                                     return_counts=True)
+        return dict(zip(bands.tolist(), counts.tolist()))
+
+    # Empties the table
+    def clear(self):
+        self.rows.clear()
+        self.free_rows.clear()
+        self.size = 0
+        self.alive[:] = False
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'patient_columns.py'")
+
+if __name__ == "__main__":
+    main()
@@ -17,23 +17,109 @@ For the sake of simplicity, the class saves note information after each update.
 This would not be optimal for a large, performance-intense system, but it
 works great here.
 
+For larger clinics, a journaled mode is available: each change is appended to
+'patients.journal' (see 'patient_journal.py') and the full JSON snapshot is
+only rewritten every 'checkpoint_every' changes, or when 'checkpoint' is
+called directly.
+
+With write-behind enabled (see 'write_behind.py'), changes are only noted in
+memory, and a background thread writes them out through 'flush'.
+
+Name searches are served by a trigram index (see 'trigram_index.py'), fuzzy
+name searches by a phonetic and edit-distance index (see 'fuzzy_index.py'),
+phone, email and birth date lookups by exact-match indexes (see
+'field_index.py'). All of them are kept up to date on every create, update,
+and delete. With 'columnar' enabled (and NumPy installed), a columnar copy of
+the registry is kept for reporting queries as well (see 'patient_columns.py').
+
+With 'snapshot' enabled, 'save_snapshot' (called on a clean shutdown) writes
+the patients, indexes and loaded note stores to a binary snapshot, which the
+next start loads instead, as long as 'patients.json' and the journal are
+unchanged since (see 'patient_snapshot.py').
+
 ============================================================================ """
 
 # EXCEPTIONS:
 from clinic.exception.illegal_operation_exception import IllegalOperationException
 
 # IMPORTS:
+import gc
+import heapq
 import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from itertools import islice
 from clinic.patient import Patient
 from clinic.dao.patient_dao import *
 from clinic.dao.patient_encoder import PatientEncoder
 from clinic.dao.patient_decoder import PatientDecoder
+from clinic.dao.patient_journal import PatientJournal
+from clinic.dao.trigram_index import TrigramIndex, GRAM_SIZE
+from clinic.dao.fuzzy_index import FuzzyNameIndex
+from clinic.dao.field_index import ExactIndex, SortedIndex, normalize_phone, \
+                                   normalize_email, normalize_date
+from clinic.dao.patient_columns import PatientColumns, has_numpy
+from clinic.metrics import instrument, record_io, record_serialization
+from clinic.dao.patient_snapshot import file_stamp, save_snapshot, \
+                                        load_snapshot
+
+# A name matching at least one patient in this many is searched in order
+DENSE_MATCHES = 8
 
 class PatientDAOJSON:
-    def __init__(self, autosave = False):
+    def __init__(self, autosave = False, journal = False, \
+                 fsync_policy = "checkpoint", checkpoint_every = 1000, \
+                 columnar = False, snapshot = False, note_cache = None, \
+                 flusher = None):
+        # The columnar table cannot be offered without NumPy
+        if columnar is True and not has_numpy():
+            raise ImportError("Error: the columnar patient table needs NumPy")
         # Standard initialization of PatientDAOJSON
         self.autosave = autosave
         self.patient_data = {}
+        self.filename = "clinic/patients.json"
+        self.journal_filename = "clinic/patients.journal"
+        self.snapshot_filename = "clinic/patients.snapshot"
+        self.snapshot = snapshot
+        self.snapshot_loaded = False        # True if started from a snapshot
+        # Search indexes, plus each PHN's insertion order so that indexed
+        # searches return patients in the same order as a full scan would
+        self.name_index = TrigramIndex()
+        self.fuzzy_index = FuzzyNameIndex()
+        self.phone_index = ExactIndex(normalize_phone)
+        self.email_index = ExactIndex(normalize_email)
+        self.birth_date_index = SortedIndex(normalize_date)
+        self.sequence = {}
+        self.next_sequence = 0
+        # Every PHN indexed so far and its sequence number, in order, so a
+        # page cursor is found by bisection. Entries whose patient has since
+        # gone stay behind ('stale' counts them) until the lists are compacted.
+        # 'departed' keeps the sequence numbers of removed PHNs, so a cursor
+        # on a deleted patient still resumes where it was
+        self.order_phns = []
+        self.order_sequences = []
+        self.stale = 0
+        self.departed = {}
+        # The columnar table is only built once a report first needs it
+        self.columnar = columnar
+        self.columns = None
+        self.checkpoint_every = checkpoint_every
+        # Journal lines held back by write-behind mode, and the locks that
+        # keep the background flusher and the caller from colliding
+        self.pending_lines = []
+        self.buffer_lock = threading.Lock()
+        self.write_lock = threading.RLock()
+        # The write-behind flusher (None writes every change at once), and
+        # the note cache the patients' records use (None for the shared one)
+        self.flusher = flusher
+        self.note_cache = note_cache
+        # Journaling only makes sense when persistence is enabled
+        self.journal = None
+        if self.autosave is True and journal is True:
+            self.journal = PatientJournal(self.journal_filename, \
+                                          fsync_policy)
         # When persistence is enabled, load patient data from a JSON
         if self.autosave is True:
             self.load_patients()
@@ -53,25 +139,297 @@ class PatientDAOJSON:
             return False
         
     # Helper method- when persistence is enabled, saves patient data as a JSON
+    @instrument("patient_dao.save_patients")
     def save_patients(self):
         if self.autosave is True:
-            with open("clinic/patients.json", "w") as raw_json:
-                json.dump(self.patient_data, raw_json, cls=PatientEncoder)
+            with self.write_lock:
+                # The snapshot covers any journal lines still held back
+                with self.buffer_lock:
+                    patient_data = dict(self.patient_data)
+                    self.pending_lines = []
+                # Encoding in one go is quicker than 'json.dump', and keeps
+                # the time spent encoding apart from the time spent writing
+                started = time.perf_counter()
+                data = json.dumps(patient_data, cls=PatientEncoder).encode()
+                encoded = time.perf_counter()
+                record_serialization(encoded - started, len(data))
+                # Write to a temporary file first, so a crash never leaves a
+                # half-written snapshot behind
+                temp_filename = self.filename + ".tmp"
+                with open(temp_filename, "wb") as raw_json:
+                    raw_json.write(data)
+                    if self.journal is not None:
+                        raw_json.flush()
+                        os.fsync(raw_json.fileno())
+                record_io(bytes_written=len(data), file_opens=1, fsyncs=\
+                          self.journal is not None, seconds=\
+                          time.perf_counter() - encoded)
+                os.replace(temp_filename, self.filename)
+                # The snapshot now covers everything in the journal
+                if self.journal is not None:
+                    self.journal.truncate()
     
     # Helper method- if a JSON exists, convert it into a patient dictionary    
-    def load_patients(self):
+    @instrument("patient_dao.load_patients")
+    # With 'read_only', for copying the patients elsewhere, nothing is
+    # written: a leftover journal is replayed but neither trimmed nor folded
+    def load_patients(self, read_only = False):
+        # A snapshot from a clean shutdown is much quicker, if still current
+        if self.snapshot is True and self._load_snapshot():
+            return
         try:
-            with open("clinic/patients.json", "r") as raw_json:
-                # Decode the JSON file into a dictionary
-                raw_patients = json.load(raw_json, object_hook=\
-                                         PatientDecoder().object_hook)
-                # Convert each PHN back into an integer
-                for phn, patient in raw_patients.items():
-                    int_phn = int(phn)
-                    self.patient_data[int_phn] = patient
+            started = time.perf_counter()
+            with open(self.filename, "rb") as raw_json:
+                data = raw_json.read()
+            read = time.perf_counter()
+            record_io(bytes_read=len(data), file_opens=1, seconds=read - \
+                      started)
+            # Decode the JSON file into a dictionary
+            raw_patients = json.loads(data, object_hook=PatientDecoder(\
+                                      cache=self.note_cache).object_hook)
+            record_serialization(time.perf_counter() - read, len(data))
+            # Convert each PHN back into an integer
+            for phn, patient in raw_patients.items():
+                int_phn = int(phn)
+                self.patient_data[int_phn] = patient
         # If no JSON exists, use the pre-made empty dictionary
         except (FileNotFoundError):
             pass
+        # Replay any changes made since the last checkpoint. A journal left
+        # over from a journaled run is folded in even if journaling is now off
+        journal = self.journal
+        if journal is None and os.path.exists(self.journal_filename):
+            journal = PatientJournal(self.journal_filename)
+        if journal is not None:
+            for record in journal.replay(PatientDecoder(cache=\
+                                         self.note_cache).object_hook, \
+                                         repair=not read_only):
+                self._apply_record(record)
+            if self.journal is None and not read_only:
+                self.save_patients()
+                journal.truncate()
+        self._rebuild_indexes()
+
+    # Helper method- the source files a snapshot must match, and their stamps
+    def _source_stamps(self):
+        return {filename: file_stamp(filename) for filename in \
+                (self.filename, self.journal_filename)}
+
+    @instrument("patient_dao.save_snapshot")
+    def save_snapshot(self):
+        """
+        Writes the patients, search indexes and loaded note stores to the
+        snapshot file, for a quick restart. Call on a clean shutdown, once
+        nothing else is changing patients. Returns True if it was written.
+        """
+        if self.autosave is not True or self.snapshot is not True:
+            return False
+        # Everything held back must be on disk, or the stamps would be wrong
+        if self.flusher is not None:
+            self.flusher.flush()
+        with self.write_lock:
+            if self.journal is not None:
+                self.journal.close()
+            # Persisted note stores are kept with the stamp of their file
+            note_stores = {}
+            for phn, patient in self.patient_data.items():
+                record = patient.record
+                if record.is_loaded() and record.autosave is True:
+                    note_dao = record.load()
+                    if not note_dao.pending_records:
+                        note_stores[phn] = (file_stamp(note_dao.filename), \
+                                            note_dao)
+            # Patients are saved as plain rows, which unpickle far faster
+            save_snapshot(self.snapshot_filename, {
+                "sources": self._source_stamps(),
+                "patients": [(patient.get_phn(), patient.get_name(), \
+                              patient.get_birthdate(), patient.get_phone(), \
+                              patient.get_email(), patient.get_address()) \
+                             for patient in self.patient_data.values()],
+                "sequence": self.sequence,
+                "next_sequence": self.next_sequence,
+                "name_index": self.name_index,
+                "fuzzy_index": self.fuzzy_index,
+                "phone_index": self.phone_index,
+                "email_index": self.email_index,
+                "birth_date_index": self.birth_date_index,
+                "journal_pending": 0 if self.journal is None else \
+                                   self.journal.pending,
+                "note_stores": note_stores})
+        return True
+
+    # Helper method- restores the state saved by 'save_snapshot'. Returns
+    # False, changing nothing, if there is no current snapshot
+    def _load_snapshot(self):
+        # Garbage collection would only keep rescanning the new objects
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            state = load_snapshot(self.snapshot_filename)
+            if state is None or state["sources"] != self._source_stamps():
+                return False
+            # A leftover journal must be folded in by the usual route
+            if self.journal is None and state["journal_pending"] > 0:
+                return False
+            self.patient_data = {row[0]: Patient(*row, self.autosave, \
+                                 cache=self.note_cache) for row in \
+                                 state["patients"]}
+        finally:
+            if collecting:
+                gc.enable()
+        self.sequence = state["sequence"]
+        self.next_sequence = state["next_sequence"]
+        # 'patient_data' is always kept in sequence order
+        self.order_phns = list(self.patient_data)
+        self.order_sequences = [self.sequence[phn] for phn in \
+                                self.order_phns]
+        self.stale = 0
+        self.departed = {}
+        self.name_index = state["name_index"]
+        self.fuzzy_index = state["fuzzy_index"]
+        self.phone_index = state["phone_index"]
+        self.email_index = state["email_index"]
+        self.birth_date_index = state["birth_date_index"]
+        if self.journal is not None:
+            self.journal.pending = state["journal_pending"]
+        # Note stores whose files have since changed are read afresh instead
+        for phn, (stamp, note_dao) in state["note_stores"].items():
+            patient = self.patient_data.get(phn)
+            if patient is not None and file_stamp(note_dao.filename) == stamp:
+                patient.record.restore(note_dao)
+        self.snapshot_loaded = True
+        return True
+
+    # Helper method- adds a patient to the search indexes
+    def _index_patient(self, patient):
+        phn = patient.get_phn()
+        self.sequence[phn] = self.next_sequence
+        self.order_phns.append(phn)
+        self.order_sequences.append(self.next_sequence)
+        self.departed.pop(phn, None)
+        self.next_sequence += 1
+        self.name_index.add(phn, patient.get_name())
+        self.fuzzy_index.add(phn, patient.get_name())
+        self.phone_index.add(phn, patient.get_phone())
+        self.email_index.add(phn, patient.get_email())
+        self.birth_date_index.add(phn, patient.get_birthdate())
+        if self.columns is not None:
+            self.columns.set_patient(phn, patient.get_birthdate(), \
+                                     *patient.record.note_summary())
+
+    # Helper method- removes a patient from the search indexes
+    def _unindex_patient(self, patient):
+        phn = patient.get_phn()
+        self.departed[phn] = self.sequence.pop(phn)
+        self.stale += 1
+        if self.stale > len(self.order_phns) // 2:
+            self._compact_order()
+        self.name_index.remove(phn, patient.get_name())
+        self.fuzzy_index.remove(phn, patient.get_name())
+        self.phone_index.remove(phn, patient.get_phone())
+        self.email_index.remove(phn, patient.get_email())
+        self.birth_date_index.remove(phn, patient.get_birthdate())
+        if self.columns is not None:
+            self.columns.remove_patient(phn)
+
+    # Helper method- rebuilds every search index from 'patient_data'
+    def _rebuild_indexes(self):
+        self.name_index.clear()
+        self.fuzzy_index.clear()
+        self.phone_index.clear()
+        self.email_index.clear()
+        self.birth_date_index.begin_rebuild()
+        self.columns = None
+        self.sequence.clear()
+        self.next_sequence = 0
+        self.order_phns = []
+        self.order_sequences = []
+        self.stale = 0
+        self.departed.clear()
+        for patient in self.patient_data.values():
+            self._index_patient(patient)
+
+    # Helper method- drops the stale entries from the ordered PHN lists
+    def _compact_order(self):
+        live = [position for position, phn in enumerate(self.order_phns) if \
+                self.sequence.get(phn) == self.order_sequences[position]]
+        self.order_phns = [self.order_phns[position] for position in live]
+        self.order_sequences = [self.order_sequences[position] for position \
+                                in live]
+        self.stale = 0
+
+    # Helper method- re-applies a single journal record to 'patient_data'
+    def _apply_record(self, record):
+        if record["op"] == "create":
+            patient = record["patient"]
+            self.patient_data[patient.get_phn()] = patient
+        elif record["op"] == "update":
+            patient = record["patient"]
+            self.patient_data.pop(record["old_phn"], None)
+            self.patient_data[patient.get_phn()] = patient
+        elif record["op"] == "delete":
+            self.patient_data.pop(record["phn"], None)
+
+    # Helper method- persists a single change, either by journaling it or by
+    # rewriting the whole snapshot
+    def _log_change(self, record):
+        if self.autosave is not True:
+            return
+        # In write-behind mode, just remember the change for the flusher
+        flusher = self.flusher
+        if flusher is not None:
+            if self.journal is not None:
+                line = json.dumps(record, cls=PatientEncoder, \
+                                  separators=(",", ":"))
+                with self.buffer_lock:
+                    self.pending_lines.append(line)
+            flusher.mark_dirty(self)
+            return
+        # Journal appends and snapshots must never interleave
+        with self.write_lock:
+            if self.journal is None:
+                self.save_patients()
+                return
+            self.journal.append(json.dumps(record, cls=PatientEncoder, \
+                                           separators=(",", ":")))
+            # Fold the journal into a fresh snapshot once it grows long enough
+            if self.journal.pending >= self.checkpoint_every:
+                self.save_patients()
+
+    @instrument("patient_dao.flush")
+    def flush(self):
+        """
+        Writes out any changes held back by write-behind mode: either the
+        buffered journal lines, or a full snapshot if there is no journal.
+        """
+        if self.autosave is not True:
+            return
+        with self.write_lock:
+            if self.journal is None:
+                self.save_patients()
+                return
+            with self.buffer_lock:
+                lines = self.pending_lines
+                self.pending_lines = []
+            if lines:
+                try:
+                    self.journal.append_many(lines)
+                except:
+                    # Put the lines back ahead of any newer ones, so they are
+                    # written (in order) by the next flush
+                    with self.buffer_lock:
+                        self.pending_lines = lines + self.pending_lines
+                    raise
+            if self.journal.pending >= self.checkpoint_every:
+                self.save_patients()
+
+    def checkpoint(self):
+        """
+        Writes a full snapshot of 'patient_data' and empties the journal.
+        Without a journal, this is the same as 'save_patients'.
+        """
+        self.save_patients()
+        return True
     
     # Returns a patient if their PHN exists in 'patient_data'
     def search_patient(self, phn):
@@ -89,25 +447,149 @@ class PatientDAOJSON:
         # Otherwise, create the patient, append them to 'patient_data'
         else:
             self.patient_data[phn] = Patient(phn, name, birth_date, phone, \
-                                             email, address, self.autosave)
+                                             email, address, self.autosave, \
+                                             cache=self.note_cache)
+            self._index_patient(self.patient_data[phn])
             # Update the patient JSON to reflect the addition
-            self.save_patients()
+            self._log_change({"op": "create", "patient": \
+                              self.patient_data[phn]})
             return self.patient_data[phn]
 
-    def retrieve_patients(self, name):
+    def create_patients(self, patients):
+        """
+        Accepts an iterable of (phn, name, birth_date, phone, email, address)
+        tuples, and creates every patient in it. Unlike 'create_patient', the
+        patient JSON is only written once, after the last patient. Returns
+        the number of patients created. The whole batch is checked first, so
+        a PHN already in use (or repeated in the batch) creates none of them.
+        """
+        patients = list(patients)
+        phns = set()
+        for phn, name, birth_date, phone, email, address in patients:
+            if phn in self.patient_data or phn in phns:
+                raise IllegalOperationException("Error: PHN already in use")
+            phns.add(phn)
+        created = 0
+        for phn, name, birth_date, phone, email, address in patients:
+            patient = Patient(phn, name, birth_date, phone, email, address, \
+                              self.autosave, cache=self.note_cache)
+            self.patient_data[phn] = patient
+            self._index_patient(patient)
+            created += 1
+        # One snapshot covers the whole batch (and empties any journal)
+        self.save_patients()
+        return created
+
+    # Returns the number of patients
+    def count_patients(self):
+        return len(self.patient_data)
+
+    # Returns the subset of 'phns' that already belong to a patient
+    def existing_phns(self, phns):
+        return {phn for phn in phns if phn in self.patient_data}
+
+    def retrieve_patients(self, name, limit = None, cursor = None):
         """
         Accepts 'name', a string, as input. Returns a list of any and all
         stored patients whose name matches the search string. If no patients
-        match, returns an empty list.
+        match, returns an empty list. Given a 'limit', stops once that many
+        matches are found; 'cursor', the last PHN of the previous page,
+        resumes the search just after that patient.
         """
+        # Strings shorter than a trigram cannot use the index, and common
+        # names are found quicker by a scan, which stops with the page
+        if len(name) < GRAM_SIZE or self.name_index.match_bound(name) * \
+           DENSE_MATCHES >= len(self.patient_data):
+            entries = self.iter_patients(cursor)
+        else:
+            phns = self.name_index.candidates(name)
+            if cursor is not None:
+                after = self._cursor_sequence(cursor)
+                phns = [phn for phn in phns if self.sequence[phn] > after]
+            phns = sorted(phns, key=self.sequence.__getitem__)
+            entries = (self.patient_data[phn] for phn in phns)
         patient_match = []
-        for entry in self.patient_data.values():
+        for entry in entries:
             patient = entry.get_name()
             # Matches cause 'find' to return a positive integer: append
             if patient.find(name) != (-1):
                 patient_match.append(entry)     
+                # Stop as soon as the page is full
+                if limit is not None and len(patient_match) >= limit:
+                    break
         return patient_match
     
+    def retrieve_patients_fuzzy(self, name, limit = 20):
+        """
+        Accepts 'name', a string, as input. Returns a list of the patients
+        whose names are closest to it in spelling or sound, best match first
+        (ties in insertion order). Returns at most 'limit' patients.
+        """
+        scores = self.fuzzy_index.search(name)
+        rank = lambda phn: (-scores[phn], self.sequence[phn])
+        if limit is None:
+            phns = sorted(scores, key=rank)
+        else:
+            phns = heapq.nsmallest(limit, scores, key=rank)
+        return [self.patient_data[phn] for phn in phns]
+
+    # Helper method- the patients for a set of PHNs, in insertion order
+    def _ordered_patients(self, phns, limit = None):
+        phns = sorted(phns, key=self.sequence.__getitem__)[:limit]
+        return [self.patient_data[phn] for phn in phns]
+
+    def retrieve_patients_by_phone(self, phone, limit = None):
+        """
+        Accepts 'phone', a phone number in any format, as input. Returns a
+        list of the patients whose phone number has the same digits. Given a
+        'limit', returns at most that many.
+        """
+        return self._ordered_patients(self.phone_index.lookup(phone), limit)
+
+    def retrieve_patients_by_email(self, email, limit = None):
+        """
+        Accepts 'email', an email address, as input. Returns a list of the
+        patients with that address, ignoring case and surrounding spaces.
+        Given a 'limit', returns at most that many.
+        """
+        return self._ordered_patients(self.email_index.lookup(email), limit)
+
+    def retrieve_patients_by_birth_date(self, start, end = None, limit = None):
+        """
+        Accepts 'start', a birth date, and optionally 'end', a later one.
+        Returns a list of the patients born on 'start', or between 'start'
+        and 'end' inclusive, ordered by birth date. Given a 'limit', returns
+        at most that many.
+        """
+        patient_match = []
+        for birth_date, phns in self.birth_date_index.range(start, \
+                                     start if end is None else end):
+            patient_match.extend(self._ordered_patients(phns))
+            if limit is not None and len(patient_match) >= limit:
+                return patient_match[:limit]
+        return patient_match
+
+    def get_columns(self):
+        """
+        Returns the columnar table of the registry, building it on first use.
+        Raises an error if the table was not enabled.
+        """
+        if self.columnar is not True:
+            raise IllegalOperationException("Error: the columnar table is not enabled")
+        if self.columns is None:
+            columns = PatientColumns()
+            columns.load((patient.get_phn(), patient.get_birthdate(), \
+                          *patient.record.note_summary()) for patient in \
+                         self.patient_data.values())
+            self.columns = columns
+        return self.columns
+
+    # Refreshes the columnar table after a patient's notes have changed
+    def notes_changed(self, patient):
+        if self.columns is not None:
+            self.columns.set_notes(patient.get_phn(), \
+                                   *patient.record.note_summary())
+
     def update_patient(self, old_phn, phn, name, birth_date, phone, email, address):
         """
         Accepts two PHNs and several patient information strings as input.
@@ -124,11 +606,14 @@ class PatientDAOJSON:
         else:
             # Find, change, delete, then replace the patient
             patient = self.search_patient(old_phn)
+            self._unindex_patient(patient)
             patient.change_patient(phn, name, birth_date, phone, email, address)
             del self.patient_data[old_phn]            
             self.patient_data[phn] = patient
+            self._index_patient(patient)
             # Update the patient JSON to reflect the changes
-            self.save_patients()
+            self._log_change({"op": "update", "old_phn": old_phn, \
+                              "patient": patient})
             return True
     
     def delete_patient(self, phn):
@@ -141,20 +626,50 @@ class PatientDAOJSON:
         if self.search_patient(phn) is None:
             raise IllegalOperationException("Error: patient does not exist")
         else:
+            self._unindex_patient(self.patient_data[phn])
             del self.patient_data[phn]
             # Update the patient JSON to reflect the removal
-            self.save_patients()
+            self._log_change({"op": "delete", "phn": phn})
             return True
     
-    def list_patients(self):
+    def list_patients(self, limit = None, cursor = None):
         """
         Returns a list of all Patient objects that exist inside patient_data.
-        If there are no patients, returns an empty list.
+        If there are no patients, returns an empty list. Given a 'limit',
+        returns at most that many, starting after the PHN in 'cursor'.
+        """
+        return list(islice(self.iter_patients(cursor), limit))
+
+    def iter_patients(self, cursor = None):
         """
-        patient_list =  []
-        for patient in self.patient_data:
-            patient_list.append(self.patient_data[patient])
-        return patient_list
+        Yields each stored patient in turn, without building a list. If
+        'cursor' (a PHN) is given, starts just after that patient, found by
+        bisection rather than by walking the patients before it. The store
+        should not be changed while the generator is in use.
+        """
+        if cursor is None:
+            return iter(self.patient_data.values())
+        return self._iter_after(self._cursor_sequence(cursor))
+
+    # Helper method- yields the patients after sequence number 'after'
+    def _iter_after(self, after):
+        phns = self.order_phns
+        sequences = self.order_sequences
+        for position in range(bisect_right(sequences, after), len(phns)):
+            phn = phns[position]
+            # Skip the entries of patients since removed or re-indexed
+            if self.sequence.get(phn) == sequences[position]:
+                yield self.patient_data[phn]
+
+    # Helper method- finds where a page cursor sits in the patient ordering.
+    # A patient deleted since the page was served keeps their old place
+    def _cursor_sequence(self, cursor):
+        after = self.sequence.get(cursor)
+        if after is None:
+            after = self.departed.get(cursor)
+        if after is None:
+            raise IllegalOperationException("Error: cursor patient does not exist")
+        return after
 
 # ==============================================================================
 
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'patient_dao_sqlite.py':
+
+An alternative to 'PatientDAOJSON' backed by an SQLite database (stdlib
+'sqlite3'). Instead of holding every patient in memory and rewriting a JSON
+file after each change, every create, update, and delete touches a single row.
+Patients are keyed by PHN (the table's primary key), and names carry both a
+regular index and, where SQLite supports it, an FTS5 trigram index so that
+substring searches do not need to scan the whole table. Phone, email and
+birth date lookups use indexed columns as well. Fuzzy name searches use the
+same in-memory index as 'PatientDAOJSON' (see 'fuzzy_index.py'), built from
+the names column on first use and kept up to date after that.
+
+Notes for each patient live in the same database and are handled by
+'NoteDAOSQLite'. When autosave is disabled, an in-memory database is used.
+
+============================================================================ """
+
+# EXCEPTIONS:
+from clinic.exception.illegal_operation_exception import IllegalOperationException
+
+# IMPORTS:
+import heapq
+import sqlite3
+import threading
+from clinic.patient import Patient
+from clinic.patient_record import PatientRecord
+from clinic.dao.patient_dao import PatientDAO
+from clinic.dao.note_dao_sqlite import NoteDAOSQLite
+from clinic.dao.sqlite_database import open_database, fts_phrase, \
+     patient_row, TRIGRAM_LENGTH, INSERT_PATIENT
+from clinic.dao.fuzzy_index import FuzzyNameIndex
+from clinic.metrics import instrument
+from clinic.dao.field_index import normalize_phone, normalize_email, \
+                                   normalize_date
+
+# The columns every patient query selects, in 'Patient' argument order
+PATIENT_COLUMNS = "phn, name, birth_date, phone, email, address"
+
+class PatientDAOSQLite(PatientDAO):
+    def __init__(self, autosave = False, filename = "clinic/clinic.db"):
+        # Standard initialization of PatientDAOSQLite
+        self.autosave = autosave
+        self.filename = filename if self.autosave is True else ":memory:"
+        self.connection, self.has_fts = open_database(self.filename)
+        # Taken by every write on the connection, and shared with every
+        # NoteDAOSQLite, see 'note_dao_sqlite.py'
+        self.transaction_lock = threading.RLock()
+        # Built by the first fuzzy search, see 'retrieve_patients_fuzzy'
+        self.fuzzy_index = None
+
+    def __str__(self):
+        return f"Autosave: {self.autosave}, Database: {self.filename}"
+
+    # Considers autosave and the stored patients in comparing DAOs
+    def __eq__(self, other):
+        try:
+            if self.autosave == other.autosave and\
+               self.list_patients() == other.list_patients():
+                return True
+            else:
+                return False
+        except:
+            return False
+
+    # Helper method- builds a Patient whose notes are read from the database
+    def _make_patient(self, row):
+        phn, name, birth_date, phone, email, address = row
+        note_dao = NoteDAOSQLite(self.connection, phn, self.autosave, \
+                                 self.has_fts, self.transaction_lock)
+        record = PatientRecord(phn, self.autosave, note_dao=note_dao)
+        return Patient(phn, name, birth_date, phone, email, address, \
+                       self.autosave, record)
+
+    # Helper method- runs a patient query and converts each row
+    def _query_patients(self, sql, parameters = ()):
+        rows = self.connection.execute(sql, parameters).fetchall()
+        return [self._make_patient(row) for row in rows]
+
+    # Returns a patient if their PHN exists in the database
+    def search_patient(self, phn):
+        rows = self._query_patients("SELECT phn, name, birth_date, phone, " \
+                                    "email, address FROM patients WHERE " \
+                                    "phn = ?", (phn,))
+        return rows[0] if rows else None
+
+    @instrument("patient_dao_sqlite.create_patient")
+    def create_patient(self, phn, name, birth_date, phone, email, address):
+        """
+        Accepts PHN, an integer, and a series of strings as input. Outputs
+        the created patient. Raises an error if the PHN is already in use.
+        """
+        with self.transaction_lock:
+            try:
+                self.connection.execute(INSERT_PATIENT, patient_row(phn, \
+                                        name, birth_date, phone, email, \
+                                        address))
+            except sqlite3.IntegrityError:
+                raise IllegalOperationException("Error: PHN already in use")
+            if self.fuzzy_index is not None:
+                self.fuzzy_index.add(phn, name)
+        return self.search_patient(phn)
+
+    @instrument("patient_dao_sqlite.create_patients")
+    def create_patients(self, patients):
+        """
+        Accepts an iterable of (phn, name, birth_date, phone, email, address)
+        tuples, and creates every patient in it inside a single transaction.
+        Returns the number of patients created.
+        """
+        connection = self.connection
+        with self.transaction_lock:
+            connection.execute("BEGIN")
+            try:
+                cursor = connection.executemany(INSERT_PATIENT, \
+                                                (patient_row(*patient) for \
+                                                 patient in patients))
+                connection.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                connection.execute("ROLLBACK")
+                raise IllegalOperationException("Error: PHN already in use")
+            except:
+                connection.execute("ROLLBACK")
+                raise
+        # Simpler to rebuild the fuzzy index on its next use than to track
+        # every row of the batch
+        self.fuzzy_index = None
+        return cursor.rowcount
+
+    # Returns the number of patients
+    def count_patients(self):
+        return self.connection.execute("SELECT COUNT(*) FROM patients").\
+               fetchone()[0]
+
+    # Returns the subset of 'phns' that already belong to a patient
+    def existing_phns(self, phns):
+        existing = set()
+        phns = list(phns)
+        # Stay well under SQLite's limit on query parameters
+        for start in range(0, len(phns), 500):
+            chunk = phns[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute("SELECT phn FROM patients WHERE " \
+                                           f"phn IN ({placeholders})", chunk)
+            existing.update(row[0] for row in rows)
+        return existing
+
+    def retrieve_patients(self, name, limit = None, cursor = None):
+        """
+        Accepts 'name', a string, as input. Returns a list of any and all
+        stored patients whose name contains the search string. Long enough
+        strings are narrowed down through the trigram index first. Given a
+        'limit', returns at most that many, after the PHN in 'cursor'.
+        """
+        columns = "p.phn, p.name, p.birth_date, p.phone, p.email, p.address"
+        page = (-1 if cursor is None else cursor, \
+                -1 if limit is None else limit)
+        if self.has_fts and len(name) >= TRIGRAM_LENGTH:
+            # The trigram index is case-insensitive, so confirm with 'instr'
+            return self._query_patients(f"SELECT {columns} FROM patients_fts "\
+                                        "f JOIN patients p ON p.phn = " \
+                                        "f.rowid WHERE patients_fts MATCH ? " \
+                                        "AND instr(p.name, ?) > 0 AND p.phn " \
+                                        "> ? ORDER BY p.phn LIMIT ?", \
+                                        (fts_phrase(name), name) + page)
+        return self._query_patients(f"SELECT {columns} FROM patients p " \
+                                    "WHERE instr(p.name, ?) > 0 AND p.phn > " \
+                                    "? ORDER BY p.phn LIMIT ?", (name,) + page)
+
+    def retrieve_patients_fuzzy(self, name, limit = 20):
+        """
+        Accepts 'name', a string, as input. Returns a list of the patients
+        whose names are closest to it in spelling or sound, best match first
+        (ties by PHN). Returns at most 'limit' patients.
+        """
+        if self.fuzzy_index is None:
+            fuzzy_index = FuzzyNameIndex()
+            for phn, patient_name in self.connection.execute("SELECT phn, " \
+                                                             "name FROM " \
+                                                             "patients"):
+                fuzzy_index.add(phn, patient_name)
+            self.fuzzy_index = fuzzy_index
+        scores = self.fuzzy_index.search(name)
+        rank = lambda phn: (-scores[phn], phn)
+        if limit is None:
+            phns = sorted(scores, key=rank)
+        else:
+            phns = heapq.nsmallest(limit, scores, key=rank)
+        return [self.search_patient(phn) for phn in phns]
+
+    def retrieve_patients_by_phone(self, phone, limit = None):
+        """
+        Accepts 'phone', a phone number in any format, as input. Returns a
+        list of the patients whose phone number has the same digits, ordered
+        by PHN. Given a 'limit', returns at most that many.
+        """
+        return self._query_patients(f"SELECT {PATIENT_COLUMNS} FROM " \
+                                    "patients WHERE phone_key = ? ORDER BY " \
+                                    "phn LIMIT ?", (normalize_phone(phone), \
+                                    -1 if limit is None else limit))
+
+    def retrieve_patients_by_email(self, email, limit = None):
+        """
+        Accepts 'email', an email address, as input. Returns a list of the
+        patients with that address, ignoring case and surrounding spaces,
+        ordered by PHN. Given a 'limit', returns at most that many.
+        """
+        return self._query_patients(f"SELECT {PATIENT_COLUMNS} FROM " \
+                                    "patients WHERE email_key = ? ORDER BY " \
+                                    "phn LIMIT ?", (normalize_email(email), \
+                                    -1 if limit is None else limit))
+
+    def retrieve_patients_by_birth_date(self, start, end = None, limit = None):
+        """
+        Accepts 'start', a birth date, and optionally 'end', a later one.
+        Returns a list of the patients born on 'start', or between 'start'
+        and 'end' inclusive, ordered by birth date and then PHN. Given a
+        'limit', returns at most that many.
+        """
+        return self._query_patients(f"SELECT {PATIENT_COLUMNS} FROM " \
+                                    "patients WHERE birth_date BETWEEN ? AND "\
+                                    "? ORDER BY birth_date, phn LIMIT ?", \
+                                    (normalize_date(start), normalize_date(\
+                                    start if end is None else end), -1 if \
+                                    limit is None else limit))
+
+    @instrument("patient_dao_sqlite.update_patient")
+    def update_patient(self, old_phn, phn, name, birth_date, phone, email, address):
+        """
+        Accepts two PHNs and several patient information strings as input.
+        Outputs True if the update succeeds, else raises an error. Notes
+        follow the patient to their new PHN.
+        """
+        with self.transaction_lock:
+            # Ensure any PHN changes do not cause conflicts
+            if phn != old_phn and self.search_patient(phn) is not None:
+                raise IllegalOperationException("Error: in-use PHN")
+            # Confirm the existance of the original patient
+            old_patient = self.search_patient(old_phn)
+            if old_patient is None:
+                raise IllegalOperationException("Error: patient not in the record")
+            self.connection.execute("UPDATE patients SET phn = ?, name = ?, "\
+                                    "birth_date = ?, phone = ?, email = ?, " \
+                                    "address = ?, phone_key = ?, email_key " \
+                                    "= ? WHERE phn = ?", patient_row(phn, \
+                                    name, birth_date, phone, email, address) \
+                                    + (old_phn,))
+            if self.fuzzy_index is not None:
+                self.fuzzy_index.remove(old_phn, old_patient.get_name())
+                self.fuzzy_index.add(phn, name)
+        return True
+
+    # Note changes need no extra bookkeeping here (see 'PatientDAOJSON')
+    def notes_changed(self, patient):
+        pass
+
+    @instrument("patient_dao_sqlite.delete_patient")
+    def delete_patient(self, phn):
+        """
+        Accepts phn, a patient identifier, as input. Raises an error if the
+        patient does not exist, otherwise deletes the patient (and their
+        notes) and returns True.
+        """
+        with self.transaction_lock:
+            patient = self.search_patient(phn)
+            if patient is None:
+                raise IllegalOperationException("Error: patient does not exist")
+            self.connection.execute("DELETE FROM patients WHERE phn = ?", \
+                                    (phn,))
+            if self.fuzzy_index is not None:
+                self.fuzzy_index.remove(phn, patient.get_name())
+        return True
+
+    def list_patients(self, limit = None, cursor = None):
+        """
+        Returns a list of all stored Patient objects, ordered by PHN. If there
+        are no patients, returns an empty list. Given a 'limit', returns at
+        most that many, starting after the PHN in 'cursor'.
+        """
+        return self._query_patients("SELECT phn, name, birth_date, phone, " \
+                                    "email, address FROM patients WHERE phn " \
+                                    "> ? ORDER BY phn LIMIT ?", (-1 if cursor \
+                                    is None else cursor, -1 if limit is None \
+                                    else limit))
+
+    def iter_patients(self, cursor = None):
+        """
+        Yields each stored patient in PHN order, reading rows from the
+        database as it goes. If 'cursor' is given, starts after that PHN.
+        """
+        rows = self.connection.execute("SELECT phn, name, birth_date, phone, "\
+                                       "email, address FROM patients WHERE " \
+                                       "phn > ? ORDER BY phn", (-1 if cursor \
+                                       is None else cursor,))
+        for row in rows:
+            yield self._make_patient(row)
+
+    # Closes the database connection
+    def close(self):
+        self.connection.close()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'patient_dao_sqlite.py'")
+
+if __name__ == "__main__":
+    main()
@@ -21,15 +21,17 @@ from clinic.patient import Patient
 from json import JSONDecoder
 
 # Closely follows the formatting of the Lab 9 product decoder
+# Decoded patients keep their notes in 'cache' (see 'Patient')
 class PatientDecoder(JSONDecoder):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, cache = None, **kwargs):
+        self.cache = cache
         super().__init__(object_hook=self.object_hook, *args, **kwargs)
         
     def object_hook(self, dct):
         if '__type__' in dct and dct['__type__'] == 'Patient':
             return Patient(dct['phn'], dct['name'], dct['birth_date'],\
                            dct['phone'], dct['email'], dct['address'],\
-                           dct['autosave'])
+                           dct['autosave'], cache=self.cache)
         return dct
 
 # ==============================================================================
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'patient_journal.py':
+
+An append-only write-ahead journal for 'PatientDAOJSON'. Rather than rewriting
+all of 'patients.json' after every change, each create, update, or delete is
+appended to the journal as a single compact JSON line. The full snapshot is
+only rebuilt at checkpoints, after which the journal is emptied.
+
+On startup the snapshot is loaded first, then the journal 'tail' is replayed
+on top of it. If the final line was only partially written (for example, the
+program was killed mid-write), it is discarded and trimmed from the file.
+
+The fsync policy trades durability against write latency:
+    'write'      - fsync after every appended record
+    'group'      - fsync once every 'group_size' records
+    'checkpoint' - only fsync when a snapshot is written
+
+============================================================================ """
+
+# IMPORTS:
+import json
+import os
+import time
+from clinic.metrics import instrument, record_io
+
+FSYNC_POLICIES = ("write", "group", "checkpoint")
+
+class PatientJournal:
+    def __init__(self, filename, fsync_policy = "checkpoint", group_size = 64):
+        # Reject unknown fsync policies up front
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Error: fsync policy must be one of {FSYNC_POLICIES}")
+        self.filename = filename
+        self.fsync_policy = fsync_policy
+        self.group_size = group_size
+        self.pending = 0            # Records appended since last checkpoint
+        self.unsynced = 0           # Records appended since last fsync
+        self.journal_file = None
+
+    def __str__(self):
+        return f"Journal: {self.filename}, Policy: {self.fsync_policy}, Pending: {self.pending}"
+
+    # Helper method- lazily open the journal for appending
+    def _open(self):
+        if self.journal_file is None:
+            self.journal_file = open(self.filename, "ab")
+            record_io(file_opens=1)
+        return self.journal_file
+
+    # Helper method- flush python's buffer, then force the data to disk
+    def _sync(self):
+        if self.journal_file is not None:
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            record_io(fsyncs=1)
+        self.unsynced = 0
+
+    def append(self, line):
+        """
+        Accepts 'line', a single JSON encoded record, as input. The record is
+        appended to the journal and synced to disk according to the policy.
+        """
+        self.append_many([line])
+
+    @instrument("patient_journal.append_many")
+    def append_many(self, lines):
+        """
+        Accepts a list of JSON encoded records, and appends them all to the
+        journal in a single write, syncing according to the policy.
+        """
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        started = time.perf_counter()
+        journal_file = self._open()
+        journal_file.write(data)
+        journal_file.flush()
+        self.pending += len(lines)
+        self.unsynced += len(lines)
+        # Decide whether this write needs to hit the disk right away
+        if self.fsync_policy == "write":
+            self._sync()
+        elif self.fsync_policy == "group" and self.unsynced >= self.group_size:
+            self._sync()
+        record_io(bytes_written=len(data), seconds=time.perf_counter() - \
+                  started)
+
+    @instrument("patient_journal.replay")
+    def replay(self, object_hook = None, repair = True):
+        """
+        Returns a list of the decoded records currently in the journal, in
+        the order they were written. 'object_hook' is handed to the decoder
+        so that embedded patients come back as 'Patient' objects. A torn
+        final record is dropped and, if 'repair' is True, the file is trimmed
+        back to the last complete record.
+        """
+        records = []
+        good_offset = 0
+        try:
+            with open(self.filename, "rb") as raw_journal:
+                for raw_line in raw_journal:
+                    # A record without its newline was never fully written
+                    if not raw_line.endswith(b"\n"):
+                        break
+                    try:
+                        records.append(json.loads(raw_line, \
+                                                  object_hook=object_hook))
+                    except ValueError:
+                        break
+                    good_offset += len(raw_line)
+                end_offset = raw_journal.seek(0, os.SEEK_END)
+                record_io(bytes_read=end_offset, file_opens=1)
+        # If no journal exists, there is nothing to replay
+        except FileNotFoundError:
+            return records
+        # Remove any partial record so later appends start on a clean line
+        if good_offset != end_offset and repair is True:
+            with open(self.filename, "r+b") as raw_journal:
+                raw_journal.truncate(good_offset)
+        self.pending = len(records)
+        return records
+
+    # Empties the journal: called once a full snapshot has been written
+    @instrument("patient_journal.truncate")
+    def truncate(self):
+        self.close()
+        started = time.perf_counter()
+        with open(self.filename, "wb") as raw_journal:
+            os.fsync(raw_journal.fileno())
+        record_io(file_opens=1, fsyncs=1, seconds=time.perf_counter() - \
+                  started)
+        self.pending = 0
+        self.unsynced = 0
+
+    # Syncs any outstanding records and releases the file handle
+    def close(self):
+        if self.journal_file is not None:
+            self._sync()
+            self.journal_file.close()
+            self.journal_file = None
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'patient_journal.py'")
+
+if __name__ == "__main__":
+    main()
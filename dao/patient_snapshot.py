@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'patient_snapshot.py':
+
+A binary snapshot of everything 'PatientDAOJSON' holds in memory (patients,
+their search indexes, and any note stores that are loaded), written on a
+clean shutdown so the next start can skip decoding 'patients.json' and
+rebuilding the indexes.
+
+The file is a magic string, a format version and a SHA-256 checksum, followed
+by the pickled state. The state also records the size and modification time
+of the source files it was taken from; the DAO compares those against the
+files on disk, and ignores the snapshot if anything has changed since. A
+missing, damaged, or outdated snapshot is never an error: the caller simply
+loads from the JSON (and pickle) sources as usual.
+
+Bump SNAPSHOT_VERSION whenever the pickled classes change shape.
+
+============================================================================ """
+
+# IMPORTS:
+import hashlib
+import os
+import pickle
+import struct
+import time
+from clinic.metrics import record_io, record_serialization
+
+MAGIC = b"CLINSNAP"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct(">8sI32s")
+
+# Returns a file's (modification time, size), or None if it does not exist
+def file_stamp(filename):
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def save_snapshot(filename, state):
+    """
+    Accepts 'filename' and 'state', a dictionary of picklable objects, and
+    writes them out as a snapshot. The file is replaced in one step, so a
+    crash never leaves half a snapshot behind. Returns the bytes written.
+    """
+    started = time.perf_counter()
+    payload = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, \
+                         hashlib.sha256(payload).digest())
+    encoded = time.perf_counter()
+    record_serialization(encoded - started, len(payload))
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as raw_snapshot:
+        raw_snapshot.write(header)
+        raw_snapshot.write(payload)
+    os.replace(temp_filename, filename)
+    record_io(bytes_written=HEADER.size + len(payload), file_opens=1, \
+              seconds=time.perf_counter() - encoded)
+    return HEADER.size + len(payload)
+
+def load_snapshot(filename):
+    """
+    Accepts 'filename', and returns the state dictionary saved there. Returns
+    None if the file is missing, from another format version, or fails its
+    checksum.
+    """
+    started = time.perf_counter()
+    try:
+        with open(filename, "rb") as raw_snapshot:
+            data = raw_snapshot.read()
+    except OSError:
+        return None
+    read = time.perf_counter()
+    record_io(bytes_read=len(data), file_opens=1, seconds=read - started)
+    if len(data) < HEADER.size:
+        return None
+    magic, version, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    payload = memoryview(data)[HEADER.size:]
+    if hashlib.sha256(payload).digest() != checksum:
+        return None
+    try:
+        state = pickle.loads(payload)
+    except Exception:
+        return None
+    record_serialization(time.perf_counter() - read, len(payload))
+    return state
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'patient_snapshot.py'")
+
+if __name__ == "__main__":
+    main()
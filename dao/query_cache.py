@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'query_cache.py':
+
+A bounded, least-recently-used cache of query results, used by 'Controller'
+so that repeating an identical 'retrieve_patients', 'list_patients',
+'retrieve_notes' or 'list_notes' call (as the GUI and CLI views often do)
+does not redo the search when nothing has changed.
+
+Results are keyed by a tuple of the operation's name and its arguments.
+Rather than emptying the whole cache on every change, the caller passes
+'invalidate' a test that picks out exactly the entries a change could have
+affected. Hits, misses and invalidations are counted, to help size the cache.
+
+The cache's bookkeeping is done under a lock, so it can be shared between
+threads; queries themselves run outside it.
+
+============================================================================ """
+
+# IMPORTS:
+import threading
+from collections import OrderedDict
+
+class QueryCache:
+    def __init__(self, capacity = 256):
+        self.capacity = capacity
+        self.entries = OrderedDict()        # (operation, *arguments) -> result
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"Capacity: {self.capacity}, Entries: {len(self.entries)}, Hits: {self.hits}, Misses: {self.misses}"
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fetch(self, key, compute):
+        """
+        Accepts a query 'key' and 'compute', a function that runs the query.
+        Returns a copy of the cached result for 'key' if there is one, else
+        runs 'compute' and caches its result.
+        """
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return list(result)
+            self.misses += 1
+        result = compute()
+        if self.capacity > 0:
+            # Keep a private copy, so callers can change the list they get
+            with self.lock:
+                self.entries[key] = list(result)
+                self.evict()
+        return result
+
+    def invalidate(self, affected):
+        """
+        Accepts 'affected', a function taking a key and returning True if a
+        change may have altered that entry's result. Drops every such entry,
+        and returns how many were dropped.
+        """
+        with self.lock:
+            stale = [key for key in self.entries if affected(key)]
+            for key in stale:
+                del self.entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    # Helper method- drop the least recently used entries until in bounds.
+    # Called with the lock held
+    def evict(self):
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    # Changes the capacity, evicting straight away if it shrank
+    def resize(self, capacity):
+        with self.lock:
+            self.capacity = capacity
+            self.evict()
+
+    # Returns the counters as a dictionary
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, \
+                    "invalidations": self.invalidations, \
+                    "entries": len(self.entries), "capacity": self.capacity}
+
+    # Empties the cache, keeping the counters
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'query_cache.py'")
+
+if __name__ == "__main__":
+    main()
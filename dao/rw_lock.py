@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'rw_lock.py':
+
+Locks for serving several sessions from one process (see 'Controller' with
+concurrent=True).
+
+'ReadWriteLock' lets any number of readers in at once, or a single writer on
+its own. Waiting writers are preferred, so a steady stream of searches cannot
+starve an update. Both sides are reentrant within a thread, and the writer may
+also take the read side (but a reader may not upgrade to writing).
+
+'KeyedLocks' hands out one lock per key (here, per patient PHN), so that
+changes to different patients' notes can go ahead in parallel while changes
+to the same patient's notes queue up.
+
+'NullLock' has the same interface and does nothing; it stands in when the
+controller is used by a single caller, so the locking costs nothing there.
+
+============================================================================ """
+
+# IMPORTS:
+import threading
+from contextlib import contextmanager
+
+class ReadWriteLock:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0            # Threads currently holding the read side
+        self.writer = None          # Thread holding the write side, if any
+        self.write_depth = 0        # Times the writer has re-entered
+        self.waiting_writers = 0
+        self.local = threading.local()
+
+    def __str__(self):
+        return f"Readers: {self.readers}, Writer: {self.writer is not None}, Waiting writers: {self.waiting_writers}"
+
+    # Helper method- how many times this thread holds the read side
+    def _read_depth(self):
+        return getattr(self.local, "depth", 0)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = self._read_depth()
+        # Re-entering (or reading while writing) never waits
+        if depth > 0 or self.writer == me:
+            self.local.depth = depth + 1
+            return
+        with self.condition:
+            while self.writer is not None or self.waiting_writers > 0:
+                self.condition.wait()
+            self.readers += 1
+        self.local.depth = 1
+
+    def release_read(self):
+        depth = self._read_depth() - 1
+        self.local.depth = depth
+        # Reads taken inside a write section were never counted
+        if depth > 0 or self.writer == threading.get_ident():
+            return
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self.condition:
+            if self.writer == me:
+                self.write_depth += 1
+                return
+            if self._read_depth() > 0:
+                raise RuntimeError("Error: cannot upgrade a read lock to write")
+            self.waiting_writers += 1
+            while self.writer is not None or self.readers > 0:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = me
+            self.write_depth = 1
+
+    def release_write(self):
+        with self.condition:
+            self.write_depth -= 1
+            if self.write_depth == 0:
+                self.writer = None
+                self.condition.notify_all()
+
+    # Context manager for the shared (read) side
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    # Context manager for the exclusive (write) side
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class KeyedLocks:
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.locks = {}             # key -> RLock
+
+    def __str__(self):
+        return f"Locks: {len(self.locks)}"
+
+    # Returns the lock for 'key', making it on first use
+    def get(self, key):
+        with self.mutex:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = threading.RLock()
+            return lock
+
+    # Drops the lock for 'key' (for example, once the patient is deleted)
+    def discard(self, key):
+        with self.mutex:
+            self.locks.pop(key, None)
+
+class NullLock:
+    def __str__(self):
+        return "NullLock"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+    # Same interface as 'ReadWriteLock' and 'KeyedLocks'
+    def read(self):
+        return self
+
+    def write(self):
+        return self
+
+    def get(self, key):
+        return self
+
+    def discard(self, key):
+        pass
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'rw_lock.py'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'sqlite_database.py':
+
+Shared setup for the SQLite backends. 'open_database' creates (or opens) the
+clinic database used by 'PatientDAOSQLite' and 'NoteDAOSQLite': a 'patients'
+table keyed by PHN with an index on name, a 'notes' table unique by PHN and
+note index, and FTS5 trigram indexes over patient names and note text.
+
+Notes have an explicit 'id' primary key for the note text index to refer to:
+implicit rowids may be renumbered by VACUUM, which would leave the index
+pointing at the wrong notes. Patients also carry normalized 'phone_key' and
+'email_key' columns (filled in with the normalizers from 'field_index.py'),
+which are indexed along with birth dates for exact-match lookups. Databases
+made before these columns existed are upgraded when opened.
+
+The database runs in WAL mode, so readers are not blocked by a writer and each
+change is a small append to the write-ahead log.
+
+============================================================================ """
+
+# IMPORTS:
+import sqlite3
+from clinic.dao.field_index import normalize_phone, normalize_email
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    phn INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth_date TEXT,
+    phone TEXT,
+    email TEXT,
+    address TEXT,
+    phone_key TEXT,
+    email_key TEXT,
+    note_position INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS patients_name ON patients(name);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    phn INTEGER NOT NULL REFERENCES patients(phn)
+        ON UPDATE CASCADE ON DELETE CASCADE,
+    note_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    UNIQUE (phn, note_index)
+);
+"""
+
+# Rebuilds a 'notes' table from before it had an 'id', dropping its old text
+# index (keyed by implicit rowids) so that FTS_SCHEMA makes a fresh one
+UPGRADE_NOTES = """
+DROP TRIGGER IF EXISTS notes_fts_insert;
+DROP TRIGGER IF EXISTS notes_fts_delete;
+DROP TRIGGER IF EXISTS notes_fts_update;
+DROP TABLE IF EXISTS notes_fts;
+ALTER TABLE notes RENAME TO old_notes;
+""" + SCHEMA + """
+INSERT INTO notes (phn, note_index, text, timestamp)
+    SELECT phn, note_index, text, timestamp FROM old_notes
+    ORDER BY phn, note_index;
+DROP TABLE old_notes;
+"""
+
+# Exact-match lookup indexes, created once the key columns are known to exist
+KEY_SCHEMA = """
+CREATE INDEX IF NOT EXISTS patients_phone_key ON patients(phone_key);
+CREATE INDEX IF NOT EXISTS patients_email_key ON patients(email_key);
+CREATE INDEX IF NOT EXISTS patients_birth_date ON patients(birth_date, phn);
+"""
+
+# Trigram full-text tables, kept in sync with their base tables by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    name, content='patients', content_rowid='phn', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS patients_fts_insert AFTER INSERT ON patients BEGIN
+    INSERT INTO patients_fts(rowid, name) VALUES (new.phn, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_delete AFTER DELETE ON patients BEGIN
+    INSERT INTO patients_fts(patients_fts, rowid, name)
+        VALUES ('delete', old.phn, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_update AFTER UPDATE ON patients
+WHEN old.phn != new.phn OR old.name != new.name BEGIN
+    INSERT INTO patients_fts(patients_fts, rowid, name)
+        VALUES ('delete', old.phn, old.name);
+    INSERT INTO patients_fts(rowid, name) VALUES (new.phn, new.name);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    text, content='notes', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF text ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+# Trigram queries need at least this many characters to use the index
+TRIGRAM_LENGTH = 3
+
+# Inserts one patient row, as built by 'patient_row'
+INSERT_PATIENT = "INSERT INTO patients (phn, name, birth_date, phone, email, " \
+                 "address, phone_key, email_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Returns the values for 'INSERT_PATIENT', including the normalized keys
+def patient_row(phn, name, birth_date, phone, email, address):
+    return (phn, name, birth_date, phone, email, address, \
+            normalize_phone(phone), normalize_email(email))
+
+def open_database(filename):
+    """
+    Accepts 'filename', a database path (or ':memory:'), as input. Returns an
+    open connection with the clinic schema in place, plus True if the FTS5
+    trigram indexes are available, else False.
+    """
+    # Autocommit mode: transactions are opened explicitly where needed
+    connection = sqlite3.connect(filename, isolation_level=None, \
+                                 check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(SCHEMA)
+    upgrade_keys(connection)
+    notes_upgraded = upgrade_notes(connection)
+    connection.executescript(KEY_SCHEMA)
+    try:
+        connection.executescript(FTS_SCHEMA)
+        # A fresh index over existing notes starts out empty
+        if notes_upgraded is True:
+            connection.execute("INSERT INTO notes_fts(notes_fts) VALUES " \
+                               "('rebuild')")
+        return connection, True
+    # Older SQLite builds lack FTS5 or its trigram tokenizer
+    except sqlite3.OperationalError:
+        return connection, False
+
+# Helper method- adds and fills the key columns in an older database
+def upgrade_keys(connection):
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(" \
+                                                    "patients)")}
+    if "phone_key" in columns:
+        return
+    connection.create_function("normalize_phone", 1, normalize_phone, \
+                               deterministic=True)
+    connection.create_function("normalize_email", 1, normalize_email, \
+                               deterministic=True)
+    connection.execute("BEGIN")
+    connection.execute("ALTER TABLE patients ADD COLUMN phone_key TEXT")
+    connection.execute("ALTER TABLE patients ADD COLUMN email_key TEXT")
+    connection.execute("UPDATE patients SET phone_key = normalize_phone(" \
+                       "phone), email_key = normalize_email(email)")
+    connection.execute("COMMIT")
+
+# Helper method- gives an older 'notes' table its 'id'; returns True if it did
+def upgrade_notes(connection):
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(" \
+                                                    "notes)")}
+    if "id" in columns:
+        return False
+    connection.executescript("BEGIN;" + UPGRADE_NOTES + "COMMIT;")
+    return True
+
+# Quotes a search string so FTS5 treats it as a literal phrase
+def fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'sqlite_database.py'")
+
+if __name__ == "__main__":
+    main()
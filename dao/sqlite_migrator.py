@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'sqlite_migrator.py':
+
+A one-shot migration from the JSON/pickle storage ('clinic/patients.json',
+any pending 'patients.journal' changes, and 'clinic/records/*.dat') into the
+SQLite database used by 'PatientDAOSQLite'. Existing patients are read through
+'PatientDAOJSON' so the same decoding rules apply, and everything is written
+in a single transaction: the migration either fully succeeds or leaves the
+database untouched. The source files are only read, never changed: a pending
+journal is not folded in, and no note index is written.
+
+Run it from the directory that contains 'clinic/':
+    python -m clinic.dao.sqlite_migrator
+
+============================================================================ """
+
+# EXCEPTIONS:
+from clinic.exception.illegal_operation_exception import IllegalOperationException
+
+# IMPORTS:
+from clinic.dao.patient_dao_json import PatientDAOJSON
+from clinic.dao.note_dao_pickle import NoteDAOPickle
+from clinic.dao.sqlite_database import open_database
+from clinic.dao.field_index import normalize_phone, normalize_email
+
+def migrate(filename = "clinic/clinic.db"):
+    """
+    Copies every patient and note from the JSON/pickle files into the
+    database at 'filename'. Returns a (patient count, note count) tuple.
+    Refuses to run against a database that already holds patients.
+    """
+    connection, has_fts = open_database(filename)
+    try:
+        if connection.execute("SELECT COUNT(*) FROM patients").fetchone()[0]:
+            raise IllegalOperationException("Error: database already has patients")
+        patient_dao = PatientDAOJSON(autosave=False)
+        patient_dao.load_patients(read_only=True)
+        patient_count = 0
+        note_count = 0
+        connection.execute("BEGIN")
+        try:
+            for patient in patient_dao.list_patients():
+                # Read the patient's notes straight from their .dat file
+                note_dao = NoteDAOPickle(patient.get_phn(), autosave=False)
+                note_dao.load_notes(read_only=True)
+                connection.execute("INSERT INTO patients (phn, name, " \
+                                   "birth_date, phone, email, address, " \
+                                   "phone_key, email_key, note_position) " \
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", \
+                                   (patient.get_phn(), patient.get_name(), \
+                                   patient.get_birthdate(), \
+                                   patient.get_phone(), patient.get_email(), \
+                                   patient.get_address(), \
+                                   normalize_phone(patient.get_phone()), \
+                                   normalize_email(patient.get_email()), \
+                                   note_dao.position))
+                connection.executemany("INSERT INTO notes (phn, note_index, " \
+                                       "text, timestamp) VALUES (?, ?, ?, ?)",\
+                                       [(patient.get_phn(), note.get_index(), \
+                                         note.get_text(), \
+                                         note.get_timestamp().isoformat()) \
+                                        for note in note_dao.notes.values()])
+                patient_count += 1
+                note_count += len(note_dao.notes)
+            connection.execute("COMMIT")
+        except:
+            connection.execute("ROLLBACK")
+            raise
+    finally:
+        connection.close()
+    return patient_count, note_count
+
+# ==============================================================================
+
+def main():
+    patient_count, note_count = migrate()
+    print(f"Migrated {patient_count} patients and {note_count} notes to 'clinic/clinic.db'")
+
+if __name__ == "__main__":
+    main()
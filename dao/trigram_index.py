@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'trigram_index.py':
+
+An in-memory trigram index over patient names, used by 'PatientDAOJSON' to
+answer 'retrieve_patients' without scanning every patient. Each name is split
+into its overlapping three-character substrings ('trigrams'), and each trigram
+maps to the set of PHNs whose name contains it. Any name containing the search
+string must contain all of the search string's trigrams, so intersecting those
+sets gives a small list of candidates, which are then confirmed with 'find'.
+
+Search strings shorter than a trigram have nothing to look up, so callers
+fall back to a plain scan for those.
+
+============================================================================ """
+
+GRAM_SIZE = 3
+
+# Returns the set of distinct trigrams found in 'text'
+def trigrams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+class TrigramIndex:
+    def __init__(self):
+        self.postings = {}          # trigram -> set of PHNs
+
+    def __str__(self):
+        return f"Trigrams: {len(self.postings)}"
+
+    def add(self, phn, name):
+        """
+        Accepts a patient's PHN and name as input, and indexes the name's
+        trigrams under that PHN.
+        """
+        for gram in trigrams(name):
+            phns = self.postings.get(gram)
+            if phns is None:
+                self.postings[gram] = {phn}
+            else:
+                phns.add(phn)
+
+    def remove(self, phn, name):
+        """
+        Accepts a patient's PHN and the name they were indexed under, and
+        removes them from the index. Empty trigram entries are discarded.
+        """
+        for gram in trigrams(name):
+            phns = self.postings.get(gram)
+            if phns is not None:
+                phns.discard(phn)
+                if not phns:
+                    del self.postings[gram]
+
+    def candidates(self, text):
+        """
+        Accepts 'text', a search string at least GRAM_SIZE characters long.
+        Returns the set of PHNs whose names contain every trigram of 'text':
+        a superset of the actual matches.
+        """
+        posting_sets = []
+        for gram in trigrams(text):
+            phns = self.postings.get(gram)
+            # A missing trigram means nothing can possibly match
+            if phns is None:
+                return set()
+            posting_sets.append(phns)
+        # Intersect starting from the rarest trigram to keep the work small
+        posting_sets.sort(key=len)
+        matches = set(posting_sets[0])
+        for phns in posting_sets[1:]:
+            matches.intersection_update(phns)
+            if not matches:
+                break
+        return matches
+
+    # Returns the size of the rarest posting set of 'text's trigrams: an
+    # upper bound on the patients 'candidates' could return, found cheaply
+    def match_bound(self, text):
+        return min(len(self.postings.get(gram, ())) for gram in trigrams(text))
+
+    # Empties the index
+    def clear(self):
+        self.postings.clear()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'trigram_index.py'")
+
+if __name__ == "__main__":
+    main()
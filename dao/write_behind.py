@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'write_behind.py':
+
+Write-behind persistence for the patient and note stores. Normally every
+change blocks until it has been written to disk. In write-behind mode a store
+only records the change in memory and marks itself dirty here; a background
+thread then flushes every dirty store once per 'interval' seconds, or sooner
+if 'threshold' changes pile up. A burst of edits to the same store is written
+out in a single flush.
+
+Any store with a 'flush' method can be registered. 'flush' is also called on
+demand (for example by 'Controller.flush' and on logout) and once more when
+the interpreter exits.
+
+Each 'Controller' made with write_behind=True owns its own flusher and hands
+it to the stores it loads, so a controller that did not ask for write-behind
+never has its writes deferred. Once a flusher is closed, a store marked dirty
+is flushed straight away, making its writes synchronous again.
+
+============================================================================ """
+
+# IMPORTS:
+import atexit
+import threading
+from clinic.metrics import instrument
+
+class WriteBehind:
+    def __init__(self, interval = 1.0, threshold = 100):
+        self.interval = interval
+        self.threshold = threshold
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()  # Flushes never run side by side
+        self.dirty = {}                     # id(store) -> store
+        self.changes = 0                    # Changes since the last flush
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, daemon=True, \
+                                       name="clinic-write-behind")
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __str__(self):
+        return f"Interval: {self.interval}, Threshold: {self.threshold}, Dirty: {len(self.dirty)}"
+
+    def mark_dirty(self, store):
+        """
+        Accepts 'store', which has just changed in memory, and schedules it
+        to be flushed. Wakes the flusher early once enough changes pile up.
+        """
+        with self.condition:
+            stopped = self.stopped
+            if not stopped:
+                self.dirty[id(store)] = store
+                self.changes += 1
+                if self.changes >= self.threshold:
+                    self.condition.notify()
+        if stopped:
+            store.flush()
+
+    @instrument("write_behind.flush")
+    def flush(self):
+        """
+        Writes out every dirty store straight away, in the calling thread.
+        Returns the number of stores flushed. A store whose flush fails stays
+        dirty, to be tried again, and the first such error is raised once
+        every other store has been flushed.
+        """
+        with self.flush_lock:
+            with self.condition:
+                stores = list(self.dirty.items())
+                self.changes = 0
+            errors = []
+            for key, store in stores:
+                # Taken off just before its flush, so a change made during
+                # the flush marks the store dirty again
+                with self.condition:
+                    self.dirty.pop(key, None)
+                try:
+                    store.flush()
+                except Exception as error:
+                    with self.condition:
+                        self.dirty[key] = store
+                        self.changes += 1
+                    errors.append(error)
+            if errors:
+                raise errors[0]
+            return len(stores)
+
+    # Helper method- the background thread's loop. A failed flush is logged
+    # and retried on the next round, rather than ending the thread
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.stopped and self.changes < self.threshold:
+                    self.condition.wait(self.interval)
+                stopped = self.stopped
+            try:
+                self.flush()
+            except Exception:
+                import logging
+                logging.getLogger("clinic.write_behind").exception(\
+                    "Error: write-behind flush failed; will retry")
+            if stopped:
+                return
+
+    # Stops the background thread after one final flush. Anything that final
+    # flush could not write is tried again here, so its error reaches the
+    # caller instead of only the log
+    def close(self):
+        with self.condition:
+            if self.stopped:
+                return
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+        atexit.unregister(self.close)
+        if self.dirty:
+            self.flush()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'write_behind.py'")
+
+if __name__ == "__main__":
+    main()
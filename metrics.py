@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'metrics.py':
+
+Built-in instrumentation for the clinic. Every user story in 'Controller'
+and the persistence methods of the DAOs are marked with '@instrument', and
+the places that touch files report what they did through 'record_io'. Once
+enabled, the shared 'metrics' registry keeps, per operation:
+
+    - calls and errors
+    - a latency histogram (counts per bucket of BUCKETS seconds, and a sum)
+    - bytes read and written, file opens and fsyncs done during the call
+    - time spent encoding and decoding ('record_serialization') apart from
+      time spent in file I/O, and the bytes encoded or decoded
+
+Usage is credited to every instrumented operation under way in the thread,
+so the bytes 'save_patients' writes also count towards the 'create_patient'
+that caused it; totals across the process are kept as well. SQLite does its
+own file I/O, which is not counted, though its methods are still timed.
+Listeners (see 'add_listener') are handed each finished call with its usage,
+which is how 'slow_log.py' spots slow user stories.
+
+Metrics are off by default. While they are off and nothing is listening, an
+instrumented call costs one flag check, and 'record_io' returns straight
+away. 'snapshot' returns everything as a dictionary, and 'export' writes it
+to a file as JSON or in the Prometheus text format. Setting CLINIC_METRICS
+to a file name (or '-' for the terminal) when running 'python -m clinic'
+enables metrics and exports them on exit, in Prometheus format if the name
+ends in '.prom'.
+
+============================================================================ """
+
+# IMPORTS:
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency histogram's buckets, in seconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, \
+           0.5, 1.0, 5.0, 10.0)
+# What each call adds up, besides its own latency
+USAGE_FIELDS = ("bytes_read", "bytes_written", "file_opens", "fsyncs", \
+                "serialized_bytes", "serialize_seconds", "io_seconds")
+DESCRIPTIONS = {"bytes_read": "Bytes read", \
+                "bytes_written": "Bytes written", \
+                "file_opens": "Files opened", \
+                "fsyncs": "Fsyncs", \
+                "serialized_bytes": "Bytes encoded or decoded", \
+                "serialize_seconds": "Seconds spent encoding and decoding", \
+                "io_seconds": "Seconds spent reading, writing and syncing"}
+
+class CallFrame:
+    __slots__ = ("name", "arguments", "keywords", "seconds", "failed") + \
+                USAGE_FIELDS
+
+    def __init__(self, name, arguments, keywords):
+        self.name = name
+        self.arguments = arguments
+        self.keywords = keywords
+        self.seconds = 0.0
+        self.failed = False
+        for field in USAGE_FIELDS:
+            setattr(self, field, 0)
+
+    def __str__(self):
+        return f"Operation: {self.name}, Seconds: {self.seconds}, Failed: {self.failed}"
+
+class OperationMetrics:
+    __slots__ = ("calls", "errors", "seconds", "buckets") + USAGE_FIELDS
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)     # The last is +Inf
+        for field in USAGE_FIELDS:
+            setattr(self, field, 0)
+
+    def __str__(self):
+        return f"Calls: {self.calls}, Errors: {self.errors}, Seconds: {self.seconds}"
+
+    # Adds one finished call
+    def add(self, frame, include_usage = True):
+        self.calls += 1
+        self.errors += frame.failed
+        self.seconds += frame.seconds
+        self.buckets[bisect_left(BUCKETS, frame.seconds)] += 1
+        if include_usage is True:
+            for field in USAGE_FIELDS:
+                setattr(self, field, getattr(self, field) + \
+                        getattr(frame, field))
+
+    # Returns the metrics as a dictionary
+    def as_dict(self):
+        return {"calls": self.calls, "errors": self.errors, "seconds": \
+                self.seconds, "buckets": list(self.buckets), **{field: \
+                getattr(self, field) for field in USAGE_FIELDS}}
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False                # Collecting the figures below
+        self.listeners = []                 # Called with each finished call
+        self.active = False                 # Either of the above
+        self.operations = {}                # name -> OperationMetrics
+        self.totals = dict.fromkeys(USAGE_FIELDS, 0)
+        self.lock = threading.Lock()
+        # Each thread's stack of instrumented calls under way
+        self.local = threading.local()
+
+    def __str__(self):
+        return f"Enabled: {self.enabled}, Listeners: {len(self.listeners)}, Operations: {len(self.operations)}"
+
+    def enable(self):
+        self.enabled = True
+        self.active = True
+
+    def disable(self):
+        self.enabled = False
+        self.active = bool(self.listeners)
+
+    def add_listener(self, listener):
+        """
+        Accepts 'listener', a function called with the CallFrame of every
+        instrumented call once it finishes, in the calling thread. Calls are
+        tracked while any listener is registered, even if metrics are off.
+        """
+        self.listeners = self.listeners + [listener]
+        self.active = True
+
+    def remove_listener(self, listener):
+        self.listeners = [other for other in self.listeners if other != \
+                          listener]
+        self.active = self.enabled or bool(self.listeners)
+
+    # Forgets everything recorded so far
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+            self.totals = dict.fromkeys(USAGE_FIELDS, 0)
+
+    # Helper method- the thread's stack of calls under way
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    # Helper method- the metrics for 'name', made on first use
+    def _operation(self, name):
+        operation = self.operations.get(name)
+        if operation is None:
+            operation = self.operations[name] = OperationMetrics()
+        return operation
+
+    def call(self, name, function, arguments, keywords):
+        """
+        Runs 'function' with 'arguments' and 'keywords' as the operation
+        'name', recording its latency, whether it raised, and the usage
+        reported while it ran. Returns (or raises) whatever the function does.
+        """
+        stack = self._stack()
+        frame = CallFrame(name, arguments, keywords)
+        stack.append(frame)
+        failed = True
+        start = time.perf_counter()
+        try:
+            result = function(*arguments, **keywords)
+            failed = False
+            return result
+        finally:
+            frame.seconds = time.perf_counter() - start
+            frame.failed = failed
+            stack.pop()
+            if self.enabled is True:
+                # A call nested in one of the same name is already covered
+                outermost = all(outer.name != name for outer in stack)
+                with self.lock:
+                    self._operation(name).add(frame, outermost)
+            for listener in self.listeners:
+                listener(frame)
+
+    # Helper method- adds usage to the totals and every call under way
+    def _add_usage(self, amounts):
+        for frame in self._stack():
+            for field, amount in amounts:
+                setattr(frame, field, getattr(frame, field) + amount)
+        if self.enabled is True:
+            with self.lock:
+                for field, amount in amounts:
+                    self.totals[field] += amount
+
+    def record_io(self, bytes_read = 0, bytes_written = 0, file_opens = 0, \
+                  fsyncs = 0, seconds = 0.0):
+        """
+        Records file I/O taking 'seconds' against the process totals and
+        every call under way in this thread. Does nothing while inactive.
+        """
+        if self.active is True:
+            self._add_usage((("bytes_read", bytes_read), ("bytes_written", \
+                             bytes_written), ("file_opens", file_opens), \
+                             ("fsyncs", fsyncs), ("io_seconds", seconds)))
+
+    # Records the encoding or decoding of 'size' bytes, taking 'seconds'
+    def record_serialization(self, seconds, size = 0):
+        if self.active is True:
+            self._add_usage((("serialize_seconds", seconds), \
+                             ("serialized_bytes", size)))
+
+    # Returns everything recorded so far, as a dictionary
+    def snapshot(self):
+        with self.lock:
+            return {"buckets": list(BUCKETS), "totals": dict(self.totals), \
+                    "operations": {name: operation.as_dict() for name, \
+                                   operation in sorted(\
+                                   self.operations.items())}}
+
+    # Returns everything recorded so far, in the Prometheus text format
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        def family(name, kind, description):
+            lines.append(f"# HELP clinic_{name} {description}")
+            lines.append(f"# TYPE clinic_{name} {kind}")
+        family("operation_calls_total", "counter", "Calls per operation.")
+        for name, operation in snapshot["operations"].items():
+            lines.append(f'clinic_operation_calls_total{{operation="{name}"}} {operation["calls"]}')
+        family("operation_errors_total", "counter", "Calls that raised, per operation.")
+        for name, operation in snapshot["operations"].items():
+            lines.append(f'clinic_operation_errors_total{{operation="{name}"}} {operation["errors"]}')
+        family("operation_seconds", "histogram", "Latency per operation.")
+        for name, operation in snapshot["operations"].items():
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), operation["buckets"]):
+                cumulative += count
+                lines.append(f'clinic_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'clinic_operation_seconds_sum{{operation="{name}"}} {operation["seconds"]}')
+            lines.append(f'clinic_operation_seconds_count{{operation="{name}"}} {operation["calls"]}')
+        for field in USAGE_FIELDS:
+            family(f"operation_{field}_total", "counter", f"{DESCRIPTIONS[field]} during each operation.")
+            for name, operation in snapshot["operations"].items():
+                lines.append(f'clinic_operation_{field}_total{{operation="{name}"}} {operation[field]}')
+            family(f"{field}_total", "counter", f"{DESCRIPTIONS[field]} by the whole process.")
+            lines.append(f"clinic_{field}_total {snapshot['totals'][field]}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename, prometheus = False):
+        """
+        Writes everything recorded so far to 'filename' ('-' for standard
+        output), as JSON or, if 'prometheus' is True, in the Prometheus text
+        format. A file is replaced in one step, so a scraper never reads half
+        of one.
+        """
+        if prometheus is True:
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        if filename == "-":
+            print(text, end="")
+            return
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "w") as raw_metrics:
+            raw_metrics.write(text)
+        os.replace(temp_filename, filename)
+
+# Shared by the whole process
+metrics = Metrics()
+
+def instrument(name):
+    """
+    Decorates a function or method so that, while metrics are enabled or a
+    listener is registered, each call is recorded as the operation 'name'.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def instrumented(*arguments, **keywords):
+            if metrics.active is not True:
+                return function(*arguments, **keywords)
+            return metrics.call(name, function, arguments, keywords)
+        return instrumented
+    return decorate
+
+# Records file I/O on the shared registry; see 'Metrics.record_io'
+def record_io(bytes_read = 0, bytes_written = 0, file_opens = 0, fsyncs = 0, \
+              seconds = 0.0):
+    if metrics.active is True:
+        metrics.record_io(bytes_read, bytes_written, file_opens, fsyncs, \
+                          seconds)
+
+# Records encoding or decoding; see 'Metrics.record_serialization'
+def record_serialization(seconds, size = 0):
+    if metrics.active is True:
+        metrics.record_serialization(seconds, size)
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'metrics.py'")
+
+if __name__ == "__main__":
+    main()
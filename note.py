@@ -13,17 +13,55 @@ the note method is to initialize note objects. Note objects are used to store a
 note about a patient: they are held inside of a dictionary stored in the class 
 'note_dao_pickle'.
 
+Notes use __slots__ and keep their timestamp as a whole number of microseconds
+since the epoch rather than a full 'datetime', which keeps large records
+compact. 'timestamp' still reads and writes a 'datetime', and notes pickled
+before this change still unpickle.
+
 ============================================================================ """
 
 # IMPORTS:
 from datetime import datetime
+import time
+
+# Returns the current time in microseconds since the epoch
+def now_stamp():
+    return time.time_ns() // 1000
 
 class Note:
+    __slots__ = ("note_index", "text", "stamp")
+
     def __init__(self, note_index, text):
         # Initialize note objects with an index and a string
         self.note_index = note_index
         self.text = text
-        self.timestamp = datetime.now()
+        self.stamp = now_stamp()
+
+    # The timestamp as a (local) datetime, converted from 'stamp'
+    @property
+    def timestamp(self):
+        seconds, microseconds = divmod(self.stamp, 1000000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=microseconds)
+
+    # Accepts either a datetime or a stamp in microseconds
+    @timestamp.setter
+    def timestamp(self, value):
+        if isinstance(value, datetime):
+            value = round(value.timestamp() * 1000000)
+        self.stamp = value
+
+    # Pickles as a compact tuple rather than a dictionary
+    def __getstate__(self):
+        return (self.note_index, self.text, self.stamp)
+
+    def __setstate__(self, state):
+        # Notes pickled before __slots__ stored a dictionary with a datetime
+        if isinstance(state, dict):
+            self.note_index = state["note_index"]
+            self.text = state["text"]
+            self.timestamp = state["timestamp"]
+        else:
+            self.note_index, self.text, self.stamp = state
         
     def __str__(self):
         return f"\nTimestamp: {self.timestamp} \nNote index: {self.note_index} \nText: {self.text}"
@@ -50,11 +88,14 @@ class Note:
     
     def get_timestamp(self):
         return self.timestamp
+
+    def get_stamp(self):
+        return self.stamp
     
     # Updates the text in a 'note' object
     def revise_note(self, text):
         self.text = text
-        self.timestamp = datetime.now()
+        self.stamp = now_stamp()
         return
 
 # ==============================================================================
@@ -13,23 +13,56 @@ method is a constructor of an object that represents a patient within this
 framework. Patients are stored inside 'PatientDAOJSON' instances, and they 
 contain a 'PatientRecord' to store notes. 
 
+Patients use __slots__ to stay small in large registries, and birth dates
+(which repeat a great deal) are interned so equal dates share one string.
+'autosave' is read from the patient's record rather than stored twice.
+
 ============================================================================ """
 
 # IMPORTS:
 from clinic.patient_record import PatientRecord
+import sys
+
+# Interns 'value' if it is a string, so repeats share a single copy
+def intern(value):
+    if type(value) is str:
+        return sys.intern(value)
+    return value
 
 class Patient:
-    def __init__(self, phn, name, birth_date, phone, email, address, autosave = False):
+    __slots__ = ("phn", "name", "birth_date", "phone", "email", "address", \
+                 "record")
+
+    def __init__(self, phn, name, birth_date, phone, email, address, autosave = False, record = None, cache = None):
         # Initialize the given values
         self.phn = int(phn)
         self.name = name
-        self.birth_date = birth_date
+        self.birth_date = intern(birth_date)
         self.phone = phone
         self.email = email
         self.address = address
-        self.autosave = autosave        
-        # Assign the patient a patient_record
-        self.record = PatientRecord(self.phn, self.autosave)
+        # Assign the patient a patient_record, unless a DAO supplied one. Its
+        # notes are held in 'cache', or the shared note cache if None
+        if record is None:
+            record = PatientRecord(self.phn, autosave, cache)
+        self.record = record
+
+    # Whether the patient's notes are persisted, as held by their record
+    @property
+    def autosave(self):
+        return self.record.autosave
+
+    # Pickles the slot values as a dictionary
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        # Patients pickled before __slots__ also carried their own 'autosave'
+        state = dict(state)
+        state.pop("autosave", None)
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self.birth_date = intern(self.birth_date)
         
     def __str__(self):
         return f"\nPHN: {self.phn} \nName: {self.name} \nBirthdate: {self.birth_date} \nPhone: {self.phone} \nEmail: {self.email} \nAddress: {self.address}"
@@ -68,7 +101,7 @@ class Patient:
     def change_patient(self, phn, name, birth_date, phone, email, address): 
         self.phn = phn
         self.name = name
-        self.birth_date = birth_date
+        self.birth_date = intern(birth_date)
         self.phone = phone
         self.email = email
         self.address = address
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'patient_importer.py':
+
+Bulk patient import, used when onboarding a clinic. Calling 'create_patient'
+once per row rewrites the whole patient store every time; instead, this reads
+a .csv or .jsonl file as a stream, checks PHNs a batch at a time (for bad
+values, repeats within the file, and patients already registered), and hands
+every valid row to the DAO's 'create_patients' in one go, so the store is
+written exactly once at the end.
+
+CSV files need a header row naming the columns phn, name, birth_date, phone,
+email and address; JSONL files hold one object per line with the same keys.
+
+Usage (from the directory that contains 'clinic/'):
+    python -m clinic import patients.csv
+
+============================================================================ """
+
+# IMPORTS:
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+COLUMNS = ("phn", "name", "birth_date", "phone", "email", "address")
+
+class PatientImporter:
+    def __init__(self, patient_dao, batch_size = 10000):
+        self.patient_dao = patient_dao
+        self.batch_size = batch_size
+        self.rejected = []          # (line number, phn, reason) tuples
+        self.created = 0
+
+    def __str__(self):
+        return f"Created: {self.created}, Rejected: {len(self.rejected)}"
+
+    def read_rows(self, filename):
+        """
+        Accepts the name of a .csv or .jsonl file, and yields a (line number,
+        row) tuple for each patient in it. JSONL lines that are not valid
+        JSON are kept in 'rejected' instead.
+        """
+        with open(filename, "r", newline="") as raw_file:
+            if filename.endswith(".jsonl"):
+                for line_number, line in enumerate(raw_file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError as error:
+                        self.rejected.append((line_number, None, \
+                                              f"malformed JSON ({error.msg})"))
+                        continue
+                    yield line_number, row
+            elif filename.endswith(".csv"):
+                # Line 1 is the header, so data starts on line 2
+                for line_number, row in enumerate(csv.DictReader(raw_file), 2):
+                    yield line_number, row
+            else:
+                raise ValueError("Error: import files must be .csv or .jsonl")
+
+    # Helper method- checks a single row, returning its PHN or a reason
+    def _check_row(self, row):
+        if not isinstance(row, dict):
+            return None, "row is not an object"
+        for column in COLUMNS:
+            if row.get(column) is None:
+                return None, f"missing '{column}'"
+        # Anything else would only fail once the batch is half created
+        for column in COLUMNS[1:]:
+            if not isinstance(row[column], str):
+                return None, f"'{column}' is not text"
+        # Reject fractional PHNs rather than silently truncating them
+        if isinstance(row["phn"], (bool, float)):
+            return None, "PHN is not an integer"
+        try:
+            phn = int(row["phn"])
+        except (TypeError, ValueError):
+            return None, "PHN is not an integer"
+        return phn, None
+
+    def validate(self, numbered_rows):
+        """
+        Accepts (line number, row) tuples, and yields a patient tuple for
+        every valid row. Rows are checked in batches, so that registered PHNs
+        can be looked up together; rejected rows are kept in 'rejected'.
+        """
+        seen = set()
+        numbered_rows = iter(numbered_rows)
+        while True:
+            batch = list(islice(numbered_rows, self.batch_size))
+            if not batch:
+                return
+            checked = []
+            for line_number, row in batch:
+                phn, reason = self._check_row(row)
+                if reason is not None:
+                    self.rejected.append((line_number, row.get("phn") if \
+                                          isinstance(row, dict) else None, \
+                                          reason))
+                elif phn in seen:
+                    self.rejected.append((line_number, phn, "duplicate PHN in file"))
+                else:
+                    seen.add(phn)
+                    checked.append((line_number, phn, row))
+            # One lookup per batch for PHNs that are already registered
+            existing = self.patient_dao.existing_phns([phn for line_number, \
+                                                       phn, row in checked])
+            for line_number, phn, row in checked:
+                if phn in existing:
+                    self.rejected.append((line_number, phn, "PHN already registered"))
+                else:
+                    yield (phn, row["name"], row["birth_date"], row["phone"], \
+                           row["email"], row["address"])
+
+    def import_file(self, filename):
+        """
+        Accepts the name of a .csv or .jsonl file, and imports every valid
+        patient in it. Returns the number of patients created.
+        """
+        patients = self.validate(self.read_rows(filename))
+        self.created = self.patient_dao.create_patients(patients)
+        return self.created
+
+# ==============================================================================
+
+def main(filename = None, backend = "json"):
+    # Imported here, so that reading this module stays cheap
+    from clinic.dao.patient_dao_json import PatientDAOJSON
+    from clinic.dao.patient_dao_sqlite import PatientDAOSQLite
+    if filename is None:
+        filename = sys.argv[1]
+    if backend == "sqlite":
+        patient_dao = PatientDAOSQLite(autosave=True)
+    else:
+        patient_dao = PatientDAOJSON(autosave=True)
+    importer = PatientImporter(patient_dao)
+    start = time.perf_counter()
+    created = importer.import_file(filename)
+    elapsed = time.perf_counter() - start
+    print(f"Imported {created} patients in {elapsed:.2f}s " \
+          f"({created / max(elapsed, 1e-9):.0f} patients/s)")
+    if importer.rejected:
+        print(f"Rejected {len(importer.rejected)} rows:")
+        importer.rejected.sort(key=lambda rejection: rejection[0])
+        for line_number, phn, reason in importer.rejected[:20]:
+            print(f"  line {line_number}: PHN {phn}: {reason}")
+        if len(importer.rejected) > 20:
+            print(f"  ... and {len(importer.rejected) - 20} more")
+
+if __name__ == "__main__":
+    main()
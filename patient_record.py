@@ -17,19 +17,101 @@ must be included.
 If Patients had other data collections rather than just 'Note' objects
 (which are stored in NoteDAOPickle), this is where they would go I suppose. 
 
+Notes are loaded lazily: the 'NoteDAOPickle' (and its .dat file) is only read
+the first time a note operation touches the record. Loaded records are kept in
+a bounded 'NoteCache', which may unload idle ones again.
+
 ============================================================================ """
 
 # IMPORTS:
-from clinic.dao.note_dao_pickle import NoteDAOPickle
+from clinic.dao.note_dao_pickle import NoteDAOPickle, note_filename
+from clinic.dao.note_log import NoteLog
+from clinic.dao.note_cache import note_cache
 from clinic.note import Note
 
 class PatientRecord:
-    def __init__(self, phn, autosave = False):        
+    __slots__ = ("phn", "autosave", "cache", "_note_dao_pickle", "pinned")
+
+    def __init__(self, phn, autosave = False, cache = None, note_dao = None):        
         # Basically this just passes parameters to NoteDAOPickle
         self.phn = phn
         self.autosave = autosave
-        self.note_dao_pickle = NoteDAOPickle(self.phn, self.autosave)
+        self.cache = cache if cache is not None else note_cache
+        # The note store is built on first use, see 'note_dao_pickle'. Other
+        # backends may hand over their own note DAO, which is kept for good
+        self._note_dao_pickle = note_dao
+        self.pinned = note_dao is not None
+
+    # Loads the note store on demand, marking it as recently used
+    @property
+    def note_dao_pickle(self):
+        note_dao = self._note_dao_pickle
+        if note_dao is None:
+            note_dao = NoteDAOPickle(self.phn, self.autosave, \
+                                     flusher=self.cache.flusher)
+            self._note_dao_pickle = note_dao
+        # Only persistent stores can be safely dropped and re-read later
+        if self.autosave is True and self.pinned is False:
+            self.cache.touch(self)
+        return note_dao
+
+    # Returns True if the note store is currently in memory
+    def is_loaded(self):
+        return self._note_dao_pickle is not None
+
+    # Forces the note store to be loaded ahead of the first note operation
+    def load(self):
+        return self.note_dao_pickle
+
+    # Hands over a note store that is already loaded (from a snapshot, say)
+    def restore(self, note_dao):
+        note_dao.flusher = self.cache.flusher
+        self._note_dao_pickle = note_dao
+        if self.autosave is True and self.pinned is False:
+            self.cache.touch(self)
+
+    # Drops the note store: it will be re-read from disk when next needed
+    def unload(self):
+        if self.autosave is True and self.pinned is False:
+            # Write out anything write-behind mode is still holding first,
+            # waiting for any note change that is still under way
+            note_dao = self._note_dao_pickle
+            if note_dao is not None:
+                with note_dao.lock:
+                    note_dao.flush()
+                    note_dao.retired = True
+                    # Another thread may have unloaded it and loaded afresh
+                    if self._note_dao_pickle is note_dao:
+                        self._note_dao_pickle = None
+            self.cache.forget(self)
         
+    # Pickles without the shared cache; persisted notes are re-read from disk
+    def __getstate__(self):
+        note_dao = self._note_dao_pickle
+        if self.autosave is True and self.pinned is False:
+            note_dao = None
+        return (self.phn, self.autosave, note_dao, self.pinned)
+
+    def __setstate__(self, state):
+        # Records pickled before __slots__ stored a plain dictionary
+        if isinstance(state, dict):
+            state = (state["phn"], state["autosave"], \
+                     state.get("note_dao_pickle"), False)
+        self.phn, self.autosave, self._note_dao_pickle, self.pinned = state
+        self.cache = note_cache
+
+    def note_summary(self):
+        """
+        Returns a (note count, latest note stamp) tuple. A persisted record
+        that is not loaded answers from the summary in its log's header,
+        without loading (or writing) anything.
+        """
+        if self._note_dao_pickle is not None:
+            return self._note_dao_pickle.note_summary()
+        if self.autosave is True:
+            return NoteLog(note_filename(self.phn)).summary()
+        return (0, 0)
+
     def __str__(self):
         return f"note_dao_pickle: {self.note_dao_pickle}"
     
@@ -47,8 +129,8 @@ class PatientRecord:
     def create_note(self, text):
         return self.note_dao_pickle.create_note(text)
         
-    def retrieve_notes(self, text):
-        return self.note_dao_pickle.retrieve_notes(text)
+    def retrieve_notes(self, text, ranked = False, limit = None, cursor = None):
+        return self.note_dao_pickle.retrieve_notes(text, ranked, limit, cursor)
         
     def search_note(self, note_index):
         return self.note_dao_pickle.search_note(note_index)
@@ -59,8 +141,11 @@ class PatientRecord:
     def delete_note(self, note_index):
         return self.note_dao_pickle.delete_note(note_index)
     
-    def list_notes(self):
-        return self.note_dao_pickle.list_notes()
+    def list_notes(self, limit = None, cursor = None):
+        return self.note_dao_pickle.list_notes(limit, cursor)
+
+    def iter_notes(self, cursor = None):
+        return self.note_dao_pickle.iter_notes(cursor)
      
 # ==============================================================================
 
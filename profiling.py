@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'profiling.py':
+
+Profiling modes for the program's entry points, so a slow clinic can be
+diagnosed without changing any code:
+
+    python -m clinic cli --profile out.prof
+    python -m clinic gui --profile out.txt --profiler sample
+    python -m clinic cli --memprofile memory.txt
+
+'profile' runs a whole session under a profiler, writing the result when it
+ends. The default 'cprofile' profiler is exact and writes a pstats file (open
+it with 'python -m pstats out.prof', or snakeviz); 'sample' has far less
+overhead, taking the main thread's stack every SAMPLE_INTERVAL seconds, and
+writes the stacks in the collapsed format read by flamegraph.pl and
+speedscope.
+
+'MemoryProfiler' traces allocations with tracemalloc and, at each logout and
+at exit, appends a report of the memory still held, split by subsystem (see
+SUBSYSTEMS), with the top allocation sites in each. An allocation belongs to
+the innermost clinic frame that made it, so memory decoded by 'json' for the
+patients DAO is counted there. Logouts are spotted through 'metrics.py', as
+'slow_log.py' spots slow stories.
+
+============================================================================ """
+
+# IMPORTS:
+import os
+import sys
+import threading
+import time
+from clinic.metrics import metrics
+
+PROFILERS = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005                     # Seconds
+TRACE_FRAMES = 16
+TOP_SITES = 10
+# Subsystems by path within the package; the first match wins
+SUBSYSTEMS = (("patients DAO", ("dao/patient_", "dao/field_index.py", \
+                                "dao/trigram_index.py", \
+                                "dao/fuzzy_index.py", "dao/sqlite_", \
+                                "patient.py")), \
+              ("note DAOs", ("dao/note_", "note.py", "patient_record.py")), \
+              ("GUI models", ("gui/",)), \
+              ("other clinic", ("",)))
+PACKAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+class SamplingProfiler:
+    def __init__(self, interval = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.thread_id = threading.get_ident()   # The thread to sample
+        self.stacks = {}                         # stack -> samples
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.sampler = None
+
+    def __str__(self):
+        return f"Interval: {self.interval}, Samples: {self.samples}"
+
+    def start(self):
+        self.sampler = threading.Thread(target=self._run, daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+    # Helper method- the sampling thread's loop
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = tuple(reversed(stack))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    # Writes the samples as collapsed stacks, one "a;b;c count" per line
+    def write(self, filename):
+        with open(filename, "w") as raw_stacks:
+            for stack, count in sorted(self.stacks.items(), key=lambda \
+                                       item: -item[1]):
+                raw_stacks.write(";".join(stack) + f" {count}\n")
+
+def run_profiled(function, filename, profiler = "cprofile"):
+    """
+    Runs 'function' under 'profiler' ("cprofile" or "sample"), writing the
+    profile to 'filename' once it returns, raises or exits. Returns what the
+    function returns.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Error: profiler must be one of {PROFILERS}")
+    if profiler == "cprofile":
+        import cProfile
+        active = cProfile.Profile()
+        active.enable()
+    else:
+        active = SamplingProfiler()
+        active.start()
+    try:
+        return function()
+    finally:
+        if profiler == "cprofile":
+            active.disable()
+            active.dump_stats(filename)
+        else:
+            active.stop()
+            active.write(filename)
+        print(f"Profile written to {filename}", file=sys.stderr)
+
+# Returns the subsystem a file of the package belongs to, or None
+def subsystem_of(filename):
+    if not filename.startswith(PACKAGE_DIRECTORY + os.sep):
+        return None
+    path = os.path.relpath(filename, PACKAGE_DIRECTORY).replace(os.sep, "/")
+    for subsystem, prefixes in SUBSYSTEMS:
+        if path.startswith(prefixes):
+            return subsystem
+    return None
+
+class MemoryProfiler:
+    def __init__(self, filename, top = TOP_SITES, frames = TRACE_FRAMES):
+        self.filename = filename
+        self.top = top
+        self.frames = frames
+        self.reports = 0
+
+    def __str__(self):
+        return f"Report: {self.filename}, Reports: {self.reports}"
+
+    # Starts tracing allocations, and reporting at every logout
+    def start(self):
+        import tracemalloc
+        tracemalloc.start(self.frames)
+        metrics.add_listener(self.observe)
+        return self
+
+    # Writes a final report, then stops tracing
+    def close(self):
+        import tracemalloc
+        metrics.remove_listener(self.observe)
+        if tracemalloc.is_tracing():
+            self.report("exit")
+            tracemalloc.stop()
+
+    # Called with each finished call; reports after a successful logout
+    def observe(self, frame):
+        if frame.name in ("controller.logout", "controller.close_session") \
+           and frame.failed is False:
+            self.report(frame.name.split(".")[1])
+
+    def sites(self):
+        """
+        Returns {subsystem: {site: [bytes, blocks]}} for the memory traced
+        right now, where a site is the "file:line" of the innermost package
+        frame that allocated it. Allocations made outside the package, while
+        importing modules, or by the profiler are left out.
+        """
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot().filter_traces((\
+                   tracemalloc.Filter(False, tracemalloc.__file__), \
+                   tracemalloc.Filter(False, __file__), \
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap>",\
+                                      all_frames=True)))
+        sites = {}
+        for statistic in snapshot.statistics("traceback"):
+            # Tracebacks list the oldest frame first
+            for trace_frame in reversed(statistic.traceback):
+                subsystem = subsystem_of(trace_frame.filename)
+                if subsystem is not None:
+                    site = f"{os.path.relpath(trace_frame.filename, PACKAGE_DIRECTORY)}:{trace_frame.lineno}"
+                    totals = sites.setdefault(subsystem, {}).setdefault(\
+                             site, [0, 0])
+                    totals[0] += statistic.size
+                    totals[1] += statistic.count
+                    break
+        return sites
+
+    def report(self, when):
+        """
+        Appends a report of the memory traced now to the report file ('-' for
+        standard error), naming 'when' it was taken.
+        """
+        import tracemalloc
+        sites = self.sites()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"=== Memory at {when}, {time.strftime('%Y-%m-%d %H:%M:%S')}: "
+                 f"{current / 1024:.1f} KiB traced, {peak / 1024:.1f} KiB peak"]
+        for subsystem, _ in SUBSYSTEMS:
+            subsystem_sites = sites.get(subsystem, {})
+            size = sum(totals[0] for totals in subsystem_sites.values())
+            blocks = sum(totals[1] for totals in subsystem_sites.values())
+            lines.append(f"{subsystem}: {size / 1024:.1f} KiB in {blocks} blocks")
+            ranked = sorted(subsystem_sites.items(), key=lambda item: \
+                            -item[1][0])
+            for site, (site_size, site_blocks) in ranked[:self.top]:
+                lines.append(f"  {site_size / 1024:>10.1f} KiB {site_blocks:>9} blocks  {site}")
+        text = "\n".join(lines) + "\n\n"
+        if self.filename == "-":
+            print(text, end="", file=sys.stderr)
+        else:
+            with open(self.filename, "a") as raw_report:
+                raw_report.write(text)
+        self.reports += 1
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'profiling.py'")
+
+if __name__ == "__main__":
+    main()
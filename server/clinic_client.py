@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'clinic_client.py':
+
+A thin client for 'ClinicServer'. It offers the same user stories as
+'Controller' (so 'ClinicCLI' can run on top of it, see 'python -m clinic
+client'), but each call is sent over the server's Unix domain socket, so
+starting a client never loads the data set itself.
+
+'call_many' pipelines several calls: every request is sent before any
+response is read, so a batch costs a single round trip.
+
+============================================================================ """
+
+# IMPORTS:
+from clinic.server.protocol import DEFAULT_SOCKET, HEADER, METHODS, encode, \
+                                   decode, frame_length, remote_exception
+import functools
+import socket
+
+class ClinicClient:
+    def __init__(self, path = DEFAULT_SOCKET):
+        self.path = path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.stream = self.socket.makefile("rb")
+        self.next_id = 0
+        # Mirrors what the server holds for this connection's session
+        self.logged_in = False
+        self.current_patient = None
+
+    def __str__(self):
+        return f"Socket: {self.path}, Logged in: {self.logged_in}, Current patient: {self.current_patient}"
+
+    # Any other user story is forwarded as it is
+    def __getattr__(self, name):
+        if name in METHODS:
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    # Helper method- reads exactly 'size' bytes of the server's replies
+    def _read(self, size):
+        data = self.stream.read(size)
+        if len(data) < size:
+            raise ConnectionError("Error: the clinic server closed the connection")
+        return data
+
+    def call(self, method, *params, **kwargs):
+        """
+        Accepts a user story's name and its arguments. Returns its result,
+        or raises the exception the server's Controller raised.
+        """
+        return self.call_many([(method, params, kwargs)])[0]
+
+    def call_many(self, calls):
+        """
+        Accepts a list of (method, params, kwargs) tuples, and sends them all
+        at once. Returns their results in order, or raises the first error
+        once every response has been read.
+        """
+        frames = []
+        for method, params, kwargs in calls:
+            self.next_id += 1
+            frames.append(encode({"id": self.next_id, "method": method, \
+                                  "params": list(params), "kwargs": kwargs}))
+        self.socket.sendall(b"".join(frames))
+        results = []
+        failure = None
+        for _ in calls:
+            response = decode(self._read(frame_length(self._read(HEADER.size))))
+            if "error" in response:
+                failure = failure or remote_exception(response["error"])
+                results.append(None)
+            else:
+                results.append(response["result"])
+        if failure is not None:
+            raise failure
+        return results
+
+    # USER STORY 1
+    def login(self, username, password):
+        self.call("login", username, password)
+        print("Logging in.")
+        self.logged_in = True
+        return True
+
+    # USER STORY 2
+    def logout(self):
+        self.call("logout")
+        print("Logging out.")
+        self.logged_in = False
+        self.current_patient = None
+        return True
+
+    # USER STORY 9
+    def set_current_patient(self, phn):
+        self.current_patient = self.call("set_current_patient", phn)
+        return self.current_patient
+
+    def unset_current_patient(self):
+        self.call("unset_current_patient")
+        self.current_patient = None
+        return True
+
+    def get_current_patient(self):
+        self.current_patient = self.call("get_current_patient")
+        return self.current_patient
+
+    # Hangs up; the server then closes this client's session
+    def close(self):
+        self.stream.close()
+        self.socket.close()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'clinic_client.py'")
+
+if __name__ == "__main__":
+    main()
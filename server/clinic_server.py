@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'clinic_server.py':
+
+A local daemon ('python -m clinic serve') that keeps one Controller, and so
+one loaded copy of the patients and notes, resident for every client. It
+listens on a Unix domain socket (readable by its owner only) and answers the
+framed JSON requests described in 'protocol.py'.
+
+Each connection gets its own session: 'login' opens it, 'logout' or hanging
+up closes it, and every other request acts for it. Requests are served by an
+'AsyncController' on an asyncio event loop, so many clients can be connected
+at once; a slow disk write or search for one does not hold up the others, and
+their changes share flushes. Each connection's requests are answered in order.
+The patients are loaded before the server starts listening, and a snapshot
+is saved when it stops, so that restarting it is quick.
+
+============================================================================ """
+
+# EXCEPTIONS:
+from clinic.exception.duplicate_login_exception import DuplicateLoginException
+from clinic.exception.invalid_logout_exception import InvalidLogoutException
+from clinic.exception.illegal_access_exception import IllegalAccessException
+from clinic.exception.illegal_operation_exception import IllegalOperationException
+
+# IMPORTS:
+from clinic.async_controller import AsyncController
+from clinic.server.protocol import DEFAULT_SOCKET, HEADER, METHODS, encode, \
+                                   decode_request, frame_length, \
+                                   error_response
+import asyncio
+import os
+import socket
+
+class ClinicServer:
+    def __init__(self, path = DEFAULT_SOCKET, clinic = None, **options):
+        # Serve the persistent data set, unless told otherwise
+        if clinic is None:
+            options.setdefault("autosave", True)
+            options.setdefault("snapshot", options["autosave"])
+            clinic = AsyncController(**options)
+        self.clinic = clinic
+        self.path = path
+        self.server = None
+        self.connections = 0                # Currently connected clients
+
+    def __str__(self):
+        return f"Socket: {self.path}, Connections: {self.connections}"
+
+    async def start(self):
+        """
+        Starts listening on the socket. Raises an OSError if another server
+        is already listening there.
+        """
+        self._remove_stale_socket()
+        # Load the patients before the first client, not during its login
+        await self.clinic.call("load")
+        self.server = await asyncio.start_unix_server(self.handle, self.path)
+        os.chmod(self.path, 0o600)
+
+    # Runs until cancelled (for example by Ctrl-C), then shuts down cleanly
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    # Stops listening, writes out any held back changes (and a snapshot, if
+    # enabled), removes the socket
+    async def close(self):
+        if self.server is None:
+            return
+        self.server.close()
+        self.server = None
+        await self.clinic.flush()
+        await self.clinic.call("shutdown")
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    # Helper method- removes a socket file left behind by a dead server
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.remove(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(f"Error: a clinic server is already listening on {self.path}")
+
+    async def handle(self, reader, writer):
+        """
+        Serves one client connection: reads requests frame by frame, and
+        writes each response back in order, until the client hangs up.
+        """
+        self.connections += 1
+        session = None
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                    body = await reader.readexactly(frame_length(header))
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+                # A frame that is not a request is answered with an error,
+                # like any other failed call; the next frame is still read
+                try:
+                    request = decode_request(body)
+                except ValueError as error:
+                    response = error_response(None, error)
+                else:
+                    response, session = await self.dispatch(request, session)
+                writer.write(encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Closing a session only touches memory, and every change has
+            # already been flushed, so this is safe even while shutting down
+            self.connections -= 1
+            if session is not None:
+                self.clinic.controller.close_session(session)
+            writer.close()
+
+    async def dispatch(self, request, session):
+        """
+        Accepts a decoded request and the connection's session (None before
+        login). Returns the response, and the session from then on.
+        """
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params", [])
+        kwargs = request.get("kwargs", {})
+        kwargs.pop("session", None)
+        try:
+            if method == "login":
+                if session is not None:
+                    raise DuplicateLoginException("Error: already logged in.")
+                session = await self.clinic.open_session(*params)
+                result = True
+            elif method == "logout":
+                if session is None:
+                    raise InvalidLogoutException("Error: not logged in, cannot log out")
+                result = await self.clinic.close_session(session)
+                session = None
+            elif method in METHODS:
+                if session is None:
+                    raise IllegalAccessException("Error: not logged in")
+                result = await getattr(self.clinic, method)(*params, \
+                                                            session=session, \
+                                                            **kwargs)
+            else:
+                raise IllegalOperationException(f"Error: unknown method '{method}'")
+        except Exception as error:
+            return error_response(request_id, error), session
+        return {"id": request_id, "result": result}, session
+
+# ==============================================================================
+
+def main(path = DEFAULT_SOCKET):
+    print("Loading the clinic...")
+    server = ClinicServer(path)
+    async def serve():
+        await server.start()
+        print(f"Serving on {path} (Ctrl-C to stop)")
+        await server.serve_forever()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'protocol.py':
+
+The wire format shared by 'ClinicServer' and 'ClinicClient'. Each message is
+a frame: a 4 byte big-endian length, then that many bytes of UTF-8 JSON.
+
+    request:  {"id": 7, "method": "create_note", "params": ["..."],
+               "kwargs": {}}
+    response: {"id": 7, "result": ...}
+           or {"id": 7, "error": {"type": "IllegalOperationException",
+                                  "message": "Error: ..."}}
+
+A client may send many requests before reading any responses (pipelining);
+the server answers each connection's requests in the order they were sent.
+A frame that is not a well-formed request is answered with an error whose
+"id" is null, and the connection carries on.
+Patients and notes travel as tagged objects, through 'PatientEncoder' and its
+"__type__" convention, and errors are re-raised on the client as the same
+exception classes 'Controller' raised.
+
+============================================================================ """
+
+# EXCEPTIONS:
+from clinic.exception.invalid_login_exception import InvalidLoginException
+from clinic.exception.invalid_logout_exception import InvalidLogoutException
+from clinic.exception.duplicate_login_exception import DuplicateLoginException
+from clinic.exception.illegal_access_exception import IllegalAccessException
+from clinic.exception.illegal_operation_exception import IllegalOperationException
+from clinic.exception.no_current_patient_exception import NoCurrentPatientException
+
+# IMPORTS:
+from clinic.dao.patient_encoder import PatientEncoder
+from clinic.note import Note
+from clinic.patient import Patient
+import json
+import struct
+
+DEFAULT_SOCKET = "clinic/clinic.sock"
+HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+
+# User stories a logged in client may call ('login' and 'logout' aside)
+METHODS = frozenset(["search_patient", "create_patient", "retrieve_patients", \
+                     "retrieve_patients_fuzzy", "retrieve_patients_by_phone", \
+                     "retrieve_patients_by_email", \
+                     "retrieve_patients_by_birth_date", "update_patient", \
+                     "delete_patient", "list_patients", \
+                     "get_current_patient", "set_current_patient", \
+                     "unset_current_patient", "create_note", \
+                     "retrieve_notes", "search_note", "update_note", \
+                     "delete_note", "list_notes"])
+
+# Exceptions that are re-raised as themselves on the client
+EXCEPTIONS = {exception.__name__: exception for exception in \
+              [InvalidLoginException, InvalidLogoutException, \
+               DuplicateLoginException, IllegalAccessException, \
+               IllegalOperationException, NoCurrentPatientException, \
+               ValueError, TypeError, KeyError]}
+
+# Adds notes (and NumPy numbers, from cohort reports) to 'PatientEncoder'
+class ProtocolEncoder(PatientEncoder):
+    def default(self, obj):
+        if isinstance(obj, Note):
+            return {"__type__": "Note", "note_index": obj.note_index, \
+                    "text": obj.text, "stamp": obj.stamp}
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        return super().default(obj)
+
+# Rebuilds tagged objects. Patients arrive without a note store of their own
+def object_hook(dct):
+    kind = dct.get("__type__")
+    if kind == "Patient":
+        return Patient(dct["phn"], dct["name"], dct["birth_date"], \
+                       dct["phone"], dct["email"], dct["address"])
+    elif kind == "Note":
+        note = Note(dct["note_index"], dct["text"])
+        note.timestamp = dct["stamp"]
+        return note
+    return dct
+
+# Returns 'message' as a complete frame
+def encode(message):
+    body = json.dumps(message, cls=ProtocolEncoder, \
+                      separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+# Returns the message in a frame's body
+def decode(body):
+    return json.loads(body.decode("utf-8"), object_hook=object_hook)
+
+def decode_request(body):
+    """
+    Accepts a frame's body, and returns the request it holds. Raises a
+    ValueError if it is not valid JSON or not a well-formed request.
+    """
+    try:
+        request = decode(body)
+    except (ValueError, KeyError, TypeError) as error:
+        raise ValueError(f"Error: malformed request ({error})")
+    if not isinstance(request, dict):
+        raise ValueError("Error: a request must be a JSON object")
+    if not isinstance(request.get("params", []), list) or \
+       not isinstance(request.get("kwargs", {}), dict):
+        raise ValueError("Error: 'params' must be a list and 'kwargs' an object")
+    return request
+
+# Returns the body length from a frame's header, refusing absurd sizes
+def frame_length(header):
+    length = HEADER.unpack(header)[0]
+    if length > MAX_FRAME:
+        raise ValueError(f"Error: frame of {length} bytes is too large")
+    return length
+
+# Builds the error response for 'exception'
+def error_response(request_id, exception):
+    return {"id": request_id, "error": {"type": type(exception).__name__, \
+                                        "message": str(exception)}}
+
+# Returns the exception an error response stands for
+def remote_exception(error):
+    exception = EXCEPTIONS.get(error["type"])
+    if exception is None:
+        return RuntimeError(f"{error['type']}: {error['message']}")
+    return exception(error["message"])
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'protocol.py'")
+
+if __name__ == "__main__":
+    main()
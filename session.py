@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'session.py':
+
+A Session is one user's view of a shared 'Controller': who logged in, and
+which patient they currently have selected. 'Controller.open_session' hands
+one out per login, so a single loaded data set (patients, notes and caches)
+can serve many workstations at once; every user story accepts the session
+to act for as 'session='.
+
+A controller also keeps a default session, used whenever no session is
+passed, so 'login', 'logout' and the rest behave exactly as before for a
+single user. In concurrent mode the default session keeps its selected
+patient per thread; 'current_patients' still sees every thread's, so no
+thread can change a patient another has selected.
+
+============================================================================ """
+
+# IMPORTS:
+import secrets
+import threading
+
+class Session:
+    __slots__ = ("session_id", "username", "logged_in", "per_thread", \
+                 "patients")
+
+    def __init__(self, username = None, per_thread = False):
+        # A random, unguessable handle, for callers who refer to it by name
+        self.session_id = secrets.token_hex(16)
+        self.username = username
+        self.logged_in = username is not None
+        # Selected patients by thread, or under None if not per thread
+        self.per_thread = per_thread
+        self.patients = {}
+
+    def __str__(self):
+        return f"Session: {self.session_id}, Username: {self.username}, Logged in: {self.logged_in}, Current patient: {self.current_patient}"
+
+    # Helper method- the key of the calling thread's selection
+    def _key(self):
+        return threading.current_thread() if self.per_thread else None
+
+    # The patient this session (or this thread of it) has selected, if any
+    @property
+    def current_patient(self):
+        return self.patients.get(self._key())
+
+    @current_patient.setter
+    def current_patient(self, patient):
+        if patient is None:
+            self.patients.pop(self._key(), None)
+        else:
+            self.patients[self._key()] = patient
+
+    # Returns every patient selected in this session, by any thread
+    def current_patients(self):
+        # Threads that have ended no longer hold their selection
+        for thread in list(self.patients):
+            if thread is not None and not thread.is_alive():
+                self.patients.pop(thread, None)
+        return list(self.patients.values())
+
+    # Drops every thread's selected patient, as on logging out
+    def forget_patients(self):
+        self.patients.clear()
+
+    # Returns the session's user name
+    def get_username(self):
+        return self.username
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'session.py'")
+
+if __name__ == "__main__":
+    main()
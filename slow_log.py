@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'slow_log.py':
+
+Logs every 'Controller' user story that takes longer than its threshold, so
+a slow 'update_patient' or 'create_note' is on record before anyone has to
+complain about it. Listens to the calls tracked by 'metrics.py', so nothing
+needs wrapping:
+
+    slow_log = SlowOperationLog("clinic/slow.log").start()
+    ...
+    slow_log.close()
+
+Each slow call becomes one line of JSON after a timestamp:
+
+    2026-10-18 14:02:11,348 {"op": "update_patient", "ms": 2412.5,
+     "threshold_ms": 250.0, "failed": false, "user": "user",
+     "args": ["int", "int", "str[11]", ...], "kwargs": {}, "patients":
+     200000, "notes": null, "serialize_ms": 1801.2, "io_ms": 590.3,
+     "other_ms": 21.0, "serialized_bytes": 41234567, ...}
+
+Arguments are only described by type and length (see 'describe'), never
+written out, so the log holds no patient information. 'patients' is the
+patient count and 'notes' the notes of the selected patient, if loaded. The
+time spent encoding and decoding, the time spent in file I/O and the rest
+come from the DAOs' reports to 'metrics.py', with the bytes involved.
+
+Lines go through a queue to a background thread that writes them to a
+rotating file, so a slow call is never made slower by its own logging. The
+logging machinery is only set up when the first slow call happens, keeping
+start up quick.
+
+Thresholds default to DEFAULT_THRESHOLD seconds, with the longer ones in
+THRESHOLDS for stories that load or return everything. 'parse_thresholds'
+reads overrides such as "0.5,update_patient=0.1,create_note=0.05".
+
+============================================================================ """
+
+# IMPORTS:
+import json
+import threading
+from clinic.metrics import metrics
+
+DEFAULT_FILENAME = "clinic/slow.log"
+DEFAULT_THRESHOLD = 0.25                    # Seconds
+# Stories that load every patient, or can return them all
+THRESHOLDS = {"login": 2.0, "open_session": 2.0, "load": 2.0, \
+              "shutdown": 2.0, "list_patients": 1.0, "retrieve_cohort": 1.0}
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+PREFIX = "controller."
+
+def describe(value):
+    """
+    Accepts any argument, and returns its shape: its type, with the length
+    of strings and containers. PHNs and names are never included.
+    """
+    if isinstance(value, (str, bytes, list, tuple, set, frozenset, dict)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def parse_thresholds(text):
+    """
+    Accepts text such as "0.5,update_patient=0.1", and returns a (default
+    threshold, {story: threshold}) tuple, in seconds; the default is None if
+    not given. Raises a ValueError if the text is malformed.
+    """
+    default = None
+    thresholds = {}
+    for part in text.split(","):
+        story, _, seconds = part.strip().rpartition("=")
+        try:
+            seconds = float(seconds)
+        except ValueError:
+            raise ValueError(f"Error: bad threshold {part.strip()!r}")
+        if story:
+            thresholds[story.strip()] = seconds
+        else:
+            default = seconds
+    return default, thresholds
+
+class SlowOperationLog:
+    def __init__(self, filename = DEFAULT_FILENAME, threshold = \
+                 DEFAULT_THRESHOLD, thresholds = None, max_bytes = MAX_BYTES,\
+                 backup_count = BACKUP_COUNT):
+        self.filename = filename
+        self.threshold = threshold
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.logged = 0                     # Slow calls logged so far
+        self.logger = None                  # Made on the first slow call
+        self.queue_listener = None
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"Log: {self.filename}, Threshold: {self.threshold}, Logged: {self.logged}"
+
+    # Returns the threshold for a story, in seconds
+    def threshold_for(self, story):
+        return self.thresholds.get(story, self.threshold)
+
+    # Starts watching user stories; returns the log itself
+    def start(self):
+        metrics.add_listener(self.observe)
+        return self
+
+    def close(self):
+        """
+        Stops watching, and waits for every line so far to be written.
+        """
+        metrics.remove_listener(self.observe)
+        with self.lock:
+            if self.queue_listener is not None:
+                self.queue_listener.stop()
+                for handler in self.queue_listener.handlers:
+                    handler.close()
+                self.logger.removeHandler(self.queue_handler)
+                self.queue_listener = None
+                self.logger = None
+
+    # Helper method- sets up the queue and its writer thread
+    def _get_logger(self):
+        with self.lock:
+            if self.logger is None:
+                import logging
+                import logging.handlers
+                import queue
+                log_queue = queue.SimpleQueue()
+                file_handler = logging.handlers.RotatingFileHandler(\
+                               self.filename, maxBytes=self.max_bytes, \
+                               backupCount=self.backup_count, delay=True)
+                file_handler.setFormatter(logging.Formatter(\
+                                          "%(asctime)s %(message)s"))
+                self.queue_handler = logging.handlers.QueueHandler(log_queue)
+                self.queue_listener = logging.handlers.QueueListener(\
+                                      log_queue, file_handler)
+                self.queue_listener.start()
+                logger = logging.getLogger("clinic.slow_operations")
+                logger.setLevel(logging.WARNING)
+                logger.propagate = False
+                logger.addHandler(self.queue_handler)
+                self.logger = logger
+            return self.logger
+
+    # Called with each finished call; logs the user stories that were slow
+    def observe(self, frame):
+        if not frame.name.startswith(PREFIX):
+            return
+        story = frame.name[len(PREFIX):]
+        if frame.seconds < self.threshold_for(story):
+            return
+        self._get_logger().warning(json.dumps(self.details(story, frame)))
+        self.logged += 1
+
+    def details(self, story, frame):
+        """
+        Accepts a story's name and its finished CallFrame, and returns what
+        is logged about it, as a dictionary.
+        """
+        controller, *arguments = frame.arguments
+        # Not even the length of a password is given away
+        if story in ("login", "open_session"):
+            arguments = arguments[:1]
+        keywords = dict(frame.keywords)
+        session = keywords.pop("session", None)
+        serialize_seconds = frame.serialize_seconds
+        io_seconds = frame.io_seconds
+        entry = {"op": story, "ms": round(frame.seconds * 1000, 3), \
+                 "threshold_ms": round(self.threshold_for(story) * 1000, 3), \
+                 "failed": frame.failed, "user": None, \
+                 "args": [describe(argument) for argument in arguments], \
+                 "kwargs": {key: describe(value) for key, value in \
+                            keywords.items()}, "patients": None, \
+                 "notes": None, \
+                 "serialize_ms": round(serialize_seconds * 1000, 3), \
+                 "io_ms": round(io_seconds * 1000, 3), \
+                 "other_ms": round((frame.seconds - serialize_seconds - \
+                                    io_seconds) * 1000, 3), \
+                 "serialized_bytes": frame.serialized_bytes, \
+                 "bytes_read": frame.bytes_read, \
+                 "bytes_written": frame.bytes_written, \
+                 "file_opens": frame.file_opens, "fsyncs": frame.fsyncs}
+        # The sizes involved are a help, but never worth failing the call over
+        try:
+            session = session or controller.session
+            entry["user"] = session.username
+            entry["patients"] = controller.patient_count()
+            patient = session.current_patient
+            if patient is not None and patient.record.is_loaded():
+                entry["notes"] = patient.record.note_summary()[0]
+        except Exception:
+            pass
+        return entry
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'slow_log.py'")
+
+if __name__ == "__main__":
+    main()
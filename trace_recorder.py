@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+""" ============================================================================
+
+SENG 265 -- Assignment 5
+Matthew Laforce
+V01019219
+Created Oct 18, 2026
+
+'trace_recorder.py':
+
+Records the operations made on a 'Controller' to a JSONL trace, which
+'benchmarks/replay.py' can play back later, for example to check a change
+against a real workload before rolling it out. Wrap the controller and use
+the wrapper in its place:
+
+    controller = TraceRecorder(Controller(autosave=True), "clinic/trace.jsonl")
+    ClinicCLI(controller)
+
+Each user story call becomes one line:
+
+    {"at": 1.234, "op": "create_note", "args": ["..."], "kwargs": {},
+     "session": "s2", "digest": "5d41...", "size": 1}
+
+'at' is the seconds since recording began, 'session' labels the session
+acted for (omitted for the default one), and 'digest' is a hash of the
+result (see 'result_digest'), with 'size' its length for lists. A call that
+raised records "error" (the exception's class name) instead. Passwords are
+never written: replays log in with credentials of their own. Nor are session
+ids, which would let anyone holding the trace act for that user; sessions are
+labelled "s1", "s2", ... in the order they first appear. Names and other
+arguments are written as given, so anonymize traces before sharing.
+
+============================================================================ """
+
+# IMPORTS:
+from clinic.server.protocol import METHODS, ProtocolEncoder
+import hashlib
+import json
+import threading
+import time
+
+# Every operation a trace records: the user stories, logins and cohorts
+RECORDED = METHODS | {"login", "logout", "open_session", "close_session", \
+                      "count_cohort", "retrieve_cohort", \
+                      "birth_year_histogram", "age_bands"}
+# Fields that differ from run to run, so are left out of result digests
+VOLATILE = ("stamp", "autosave")
+
+# Writes anything else (dates, say) as text rather than failing
+class TraceEncoder(ProtocolEncoder):
+    def default(self, obj):
+        try:
+            return super().default(obj)
+        except TypeError:
+            return str(obj)
+
+# Helper method- drops the volatile fields from an encoded result
+def _strip(value):
+    if isinstance(value, dict):
+        return {key: _strip(item) for key, item in value.items() \
+                if key not in VOLATILE}
+    if isinstance(value, list):
+        return [_strip(item) for item in value]
+    return value
+
+def normalize(value):
+    """
+    Accepts a result, and returns it as plain JSON data (patients and notes
+    as tagged dictionaries), without the fields that vary between runs.
+    """
+    return _strip(json.loads(json.dumps(value, cls=TraceEncoder)))
+
+# Returns a short hash of a normalized result, for comparing replays
+def result_digest(value):
+    text = json.dumps(normalize(value), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+class TraceRecorder:
+    def __init__(self, controller, filename):
+        self.controller = controller
+        self.filename = filename
+        self.trace_file = open(filename, "a", buffering=1)
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.labels = {}                    # session_id -> label in the trace
+
+    def __str__(self):
+        return f"Recording: {self.controller}, Trace: {self.filename}"
+
+    # Recorded operations are wrapped; everything else passes straight through
+    def __getattr__(self, name):
+        attribute = getattr(self.controller, name)
+        if name not in RECORDED:
+            return attribute
+        def recorded(*arguments, **keywords):
+            return self.call(name, attribute, arguments, keywords)
+        return recorded
+
+    # Helper method- runs one operation, then writes its line
+    def call(self, name, method, arguments, keywords):
+        line = {"at": round(time.perf_counter() - self.start, 6), "op": name}
+        session = keywords.get("session")
+        if name == "close_session" and arguments:
+            session = arguments[0]
+        if name in ("login", "open_session"):
+            line["args"] = [arguments[0] if arguments else None]
+        else:
+            line["args"] = [argument for argument in arguments if argument \
+                            is not session]
+        line["kwargs"] = {key: value for key, value in keywords.items() \
+                          if key != "session"}
+        try:
+            result = method(*arguments, **keywords)
+        except Exception as error:
+            line["error"] = type(error).__name__
+            self._write(line, session)
+            raise
+        if name == "open_session":
+            session = result
+        else:
+            line["digest"] = result_digest(result)
+            if isinstance(result, list):
+                line["size"] = len(result)
+        self._write(line, session)
+        return result
+
+    # Helper method- appends a line to the trace
+    def _write(self, line, session):
+        with self.lock:
+            if session is not None and session is not self.controller.session:
+                label = self.labels.get(session.session_id)
+                if label is None:
+                    label = f"s{len(self.labels) + 1}"
+                    self.labels[session.session_id] = label
+                line["session"] = label
+            text = json.dumps(line, cls=TraceEncoder, separators=(",", ":"))
+            self.trace_file.write(text + "\n")
+
+    # Stops recording
+    def close(self):
+        with self.lock:
+            self.trace_file.close()
+
+# ==============================================================================
+
+def main():
+    print("Main file called as 'trace_recorder.py'")
+
+if __name__ == "__main__":
+    main()